@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+自适应并发控制器（AIMD）
+功能: 控制对 DeepSeek/Qwen 的并发请求数，成功时线性增加并发窗口，
+     遇到 429、5xx、超时时按比例缩小窗口；同时按每分钟token预算（TPM）限流，
+     token数根据提示长度估算，请求结束后按实际用量校正
+
+通过环境变量控制（llm_client 按服务商各创建一个）:
+    RESUME_LLM_CONCURRENCY=4        初始并发窗口
+    RESUME_LLM_MAX_CONCURRENCY=16   并发窗口上限
+    RESUME_LLM_TPM=0                每分钟token预算，0表示不限制
+    RESUME_LANE_RESERVED_LLM=1      为 interactive 通道保留的并发名额（见 priority_lanes.py）
+    RESUME_LANE_AGING=30            低优先级请求的老化周期（秒）
+"""
+
+import os
+import time
+import threading
+from collections import deque
+
+import metrics
+import priority_lanes
+
+WINDOW = metrics.REGISTRY.gauge('resume_llm_concurrency_window', '自适应并发窗口', ('provider',))
+ERROR_RATE = metrics.REGISTRY.gauge('resume_llm_recent_error_rate', '最近请求的错误率', ('provider',))
+THROTTLED = metrics.REGISTRY.counter('resume_llm_throttled_total', '被限流或拥塞信号触发的窗口收缩次数', ('provider', 'reason'))
+
+# 需要收缩窗口的错误类型
+CONGESTION_OUTCOMES = ('throttle', 'server', 'timeout')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的token数：中文约0.6 token/字，其他字符约0.3 token/字符
+    """
+    cjk = sum(1 for ch in text if '一' <= ch <= '鿿')
+    return int(cjk * 0.6 + (len(text) - cjk) * 0.3) + 1
+
+
+def classify_error(exc: BaseException) -> str:
+    """
+    把调用异常归类为 throttle（429）、server（5xx）、timeout、client（其他4xx）或 other
+    """
+    status = getattr(exc, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    name = type(exc).__name__
+    if status == 429 or name == 'RateLimitError':
+        return 'throttle'
+    if 'Timeout' in name or isinstance(exc, TimeoutError):
+        return 'timeout'
+    if (status is not None and status >= 500) or name in ('InternalServerError', 'APIConnectionError'):
+        return 'server'
+    if status is not None and 400 <= status < 500:
+        return 'client'
+    return 'other'
+
+
+def retry_after_seconds(exc: BaseException) -> float:
+    """读取429响应的 Retry-After（秒），没有时返回0"""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None) or {}
+    try:
+        return max(0.0, float(headers.get('retry-after', 0)))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class TokenBudget:
+    """每分钟token预算（令牌桶，容量为一分钟的预算）"""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        """还需等待多久才能扣除 tokens（单次请求超过容量时按容量计）"""
+        self._refill(now)
+        needed = min(tokens, self.capacity)
+        return 0.0 if self.available >= needed else (needed - self.available) / self.rate
+
+    def consume(self, tokens: int):
+        self.available -= tokens
+
+    def refund(self, tokens: int):
+        self.available = min(self.capacity, self.available + tokens)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD 并发控制器
+
+    - 成功: 窗口 += increase / 窗口（约每完成一个窗口的请求加1）
+    - 429/5xx/超时: 窗口 *= decrease，同一波拥塞只收缩一次；429带 Retry-After 时暂停发送
+    - 延迟明显高于基线（latency_tolerance 倍）时视为排队信号，窗口不再增加
+    - 优先级（0最高）: 本控制器中有最高优先级的请求在等待或在途时，其他请求最多使用 窗口 - reserved 个名额
+      （至少1个），没有时使用整个窗口；有更高优先级（或同级但更早）的请求在等待时让行；
+      等待超过 aging 秒的请求每个周期提升一级
+    """
+
+    def __init__(self, name: str = 'llm', initial: float = 4, min_window: float = 1, max_window: float = 16,
+                 tokens_per_minute: int = 0, increase: float = 1.0, decrease: float = 0.5,
+                 latency_tolerance: float = 2.0, adaptive: bool = True, error_window: int = 100,
+                 reserved: int = 0, aging: float = 0):
+        self.name = name
+        self.min_window = float(min_window)
+        self.max_window = float(max_window)
+        self.window = min(max(float(initial), self.min_window), self.max_window)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.adaptive = adaptive
+        self.budget = TokenBudget(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.reserved = max(0, int(reserved))
+        self.aging = aging
+
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._baseline_latency = None
+        self._latency_ewma = None
+        self._outcomes = deque(maxlen=error_window)
+        self._waiters = []
+        self._top_in_flight = 0
+        self.stats = {'acquired': 0, 'ok': 0, 'errors': 0, 'decreases': 0, 'wait_seconds': 0.0}
+        WINDOW.set(self.window, provider=name)
+
+    @classmethod
+    def from_env(cls, name: str) -> 'AdaptiveLimiter':
+        """按环境变量创建"""
+        return cls(
+            name=name,
+            initial=float(os.getenv('RESUME_LLM_CONCURRENCY', '4')),
+            max_window=float(os.getenv('RESUME_LLM_MAX_CONCURRENCY', '16')),
+            tokens_per_minute=int(os.getenv('RESUME_LLM_TPM', '0')),
+            reserved=priority_lanes.reserved_llm_slots(),
+            aging=priority_lanes.aging_seconds(),
+        )
+
+    def _top_active(self) -> bool:
+        """是否有最高优先级（interactive）的请求在途或在等待"""
+        return self._top_in_flight > 0 or any(waiter[0] == 0 for waiter in self._waiters)
+
+    def _capacity(self, rank: int) -> int:
+        """该优先级可使用的并发名额；保留名额只在有最高优先级请求时生效，纯批量运行使用整个窗口"""
+        window = int(self.window)
+        if rank == 0 or not self.reserved or not self._top_active():
+            return window
+        return max(1, window - self.reserved)
+
+    def _outranked(self, waiter: list, rank: int, now: float) -> bool:
+        """是否有（老化后）优先级更高、或优先级相同但等待更久的请求在等待"""
+        return any(other is not waiter
+                   and (priority_lanes.effective_rank(other[0], now - other[1], self.aging), other[1]) < (rank, waiter[1])
+                   for other in self._waiters)
+
+    def acquire(self, estimated_tokens: int = 0, timeout: float = None, priority: int = 1) -> 'Ticket':
+        """
+        等待一个并发名额和足够的token预算
+
+        Args:
+            priority: 请求优先级（priority_lanes.lane_rank，0为 interactive）
+
+        Raises:
+            TimeoutError: 超过 timeout 仍未获得名额
+        """
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        waiter = [priority, start]
+        with self._cond:
+            self._waiters.append(waiter)
+            try:
+                while True:
+                    now = time.monotonic()
+                    rank = priority_lanes.effective_rank(priority, now - start, self.aging)
+                    wait = self._paused_until - now
+                    if wait <= 0 and (self.in_flight >= self._capacity(rank) or self._outranked(waiter, rank, now)):
+                        # 被占满或让行时，到下一次老化提升时重新检查
+                        wait = self.aging - (now - start) % self.aging if rank > 0 and self.aging > 0 else None
+                    elif wait <= 0 and self.budget is not None:
+                        wait = self.budget.wait_time(estimated_tokens, now)
+                    if wait is not None and wait <= 0:
+                        break
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            raise TimeoutError(f"{self.name}: 等待并发名额超时")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(waiter)
+                if self._waiters:
+                    # 让行的低优先级请求需要重新检查
+                    self._cond.notify_all()
+
+            if self.budget is not None:
+                self.budget.consume(estimated_tokens)
+            self.in_flight += 1
+            if priority == 0:
+                self._top_in_flight += 1
+            self.stats['acquired'] += 1
+            self.stats['wait_seconds'] += time.monotonic() - start
+        return Ticket(self, estimated_tokens, priority)
+
+    def release(self, ticket: 'Ticket', outcome: str = 'ok', latency: float = None,
+                actual_tokens: int = None, retry_after: float = 0.0):
+        """
+        归还名额并根据结果调整窗口
+
+        Args:
+            outcome: 'ok'、classify_error 的结果，或 'cancelled'（对冲请求被放弃，不影响窗口和错误率）
+            latency: 请求耗时（秒）
+            actual_tokens: 实际消耗的token数，用于校正预算
+            retry_after: 429响应要求的等待秒数
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if ticket.priority == 0:
+                self._top_in_flight -= 1
+            now = time.monotonic()
+            if self.budget is not None and actual_tokens is not None:
+                diff = ticket.estimated_tokens - actual_tokens
+                if diff > 0:
+                    self.budget.refund(diff)
+                else:
+                    self.budget.consume(-diff)
+
+            if outcome == 'cancelled':
+                self._cond.notify_all()
+                return
+            self._outcomes.append(outcome != 'ok')
+            if outcome == 'ok':
+                self.stats['ok'] += 1
+                self._on_success(latency)
+            else:
+                self.stats['errors'] += 1
+                if outcome in CONGESTION_OUTCOMES:
+                    self._on_congestion(outcome, now, retry_after)
+
+            WINDOW.set(self.window, provider=self.name)
+            ERROR_RATE.set(round(self.error_rate(), 4), provider=self.name)
+            self._cond.notify_all()
+
+    def _on_success(self, latency: float):
+        if latency is not None:
+            self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+            if self._baseline_latency is None or latency < self._baseline_latency:
+                self._baseline_latency = latency
+            else:
+                # 基线缓慢上漂，避免一次偶然的极快响应永久压低基线
+                self._baseline_latency += (latency - self._baseline_latency) * 0.01
+        if not self.adaptive:
+            return
+        if (self._latency_ewma is not None and self._baseline_latency
+                and self._latency_ewma > self._baseline_latency * self.latency_tolerance):
+            return
+        self.window = min(self.max_window, self.window + self.increase / max(self.window, 1.0))
+
+    def _on_congestion(self, outcome: str, now: float, retry_after: float):
+        if retry_after > 0:
+            self._paused_until = max(self._paused_until, now + retry_after)
+        if not self.adaptive:
+            return
+        # 同一波拥塞中多个在途请求会同时失败，只在间隔超过一个典型延迟后再次收缩
+        cooldown = self._latency_ewma or 0.1
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+        self.window = max(self.min_window, self.window * self.decrease)
+        self.stats['decreases'] += 1
+        THROTTLED.inc(provider=self.name, reason=outcome)
+
+    def error_rate(self) -> float:
+        """最近 error_window 个请求的错误率"""
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def snapshot(self) -> dict:
+        """当前状态：窗口、在途请求数、最近错误率、剩余token预算等"""
+        with self._cond:
+            snapshot = {
+                'window': round(self.window, 2),
+                'in_flight': self.in_flight,
+                'recent_error_rate': round(self.error_rate(), 4),
+                'latency_ewma_ms': round(self._latency_ewma * 1000, 1) if self._latency_ewma else None,
+                'baseline_latency_ms': round(self._baseline_latency * 1000, 1) if self._baseline_latency else None,
+                'paused_for': round(max(0.0, self._paused_until - time.monotonic()), 2),
+                'waiting': len(self._waiters),
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in self.stats.items()},
+            }
+            if self.budget is not None:
+                self.budget._refill(time.monotonic())
+                snapshot['tokens_available'] = int(self.budget.available)
+            return snapshot
+
+
+class Ticket:
+    """一次 acquire 的凭证"""
+
+    __slots__ = ('limiter', 'estimated_tokens', 'priority', 'start')
+
+    def __init__(self, limiter: AdaptiveLimiter, estimated_tokens: int, priority: int = 1):
+        self.limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.priority = priority
+        self.start = time.perf_counter()
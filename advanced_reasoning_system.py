@@ -5,18 +5,160 @@
 """
 
 import os
-import json
 import sys
 import re
 from pathlib import Path
 from datetime import datetime
-from dotenv import load_dotenv
-import langextract as lx
-from langextract.providers.openai import OpenAILanguageModel
-from langextract.data import ExampleData, Extraction
 
-# 加载环境变量
-load_dotenv()
+import date_normalization
+import llm_client
+import output_writer
+import packed_corpus
+import prompt_templates
+import raw_archive
+from metrics import start_from_env, track_export
+from prompt_templates import PromptTemplate
+from resilience import resume_deadline
+from tracing import span, resume_scope
+
+# 结构化信息提取的schema、示例和系统提示（导入时构建一次，所有简历共享）
+STRUCTURED_TEMPLATE = prompt_templates.register(PromptTemplate(
+    name="advanced_reasoning.structured",
+    schema={
+        "基础信息": {
+            "姓名": "string - 候选人真实姓名",
+            "性别": "string - 男/女",
+            "年龄": "string - 具体年龄",
+            "联系方式": {
+                "手机": "string - 11位手机号",
+                "邮箱": "string - 邮箱地址"
+            }
+        },
+        "教育背景": {
+            "最高学历": "string - 博士/硕士/本科/专科",
+            "毕业院校": "string - 学校名称",
+            "专业": "string - 专业名称"
+        },
+        "工作经历": {
+            "当前职位": "string - 最新职位名称",
+            "工作年限": "string - 总工作年数",
+            "核心职责": "string - 主要工作职责描述",
+            "管理经验": "string - 团队管理相关经验",
+            "技术深度": "string - 技术专业程度描述"
+        },
+        "技能体系": {
+            "核心技术": "string - 最擅长的技术领域",
+            "技术广度": "string - 涉及的技术范围",
+            "工具平台": "string - 使用的开发工具和平台",
+            "项目经验": "string - 重要项目经历"
+        },
+        "能力特征": {
+            "创新能力": "string - 创新相关的经历和成果",
+            "学习能力": "string - 学习新技术的能力体现",
+            "沟通协作": "string - 团队协作和沟通能力",
+            "问题解决": "string - 解决复杂问题的能力"
+        }
+    },
+    example_text="""任街平 - 高级Python开发工程师简历
+
+个人信息：
+姓名：任街平
+性别：男
+年龄：32岁
+手机：19113247892
+邮箱：r414164729@163.com
+
+教育背景：
+某理工大学 计算机科学与技术 本科 2014年毕业
+
+工作经历：
+2018年至今 - 某科技公司 高级Python开发工程师
+• 负责后端系统架构设计和开发
+• 主导微服务架构改造，提升系统性能30%
+• 带领3人小团队完成核心业务模块开发
+• 参与技术选型和架构决策
+
+2016-2018 - 某互联网公司 Python开发工程师
+• 负责数据处理和分析系统开发
+• 优化算法性能，处理效率提升50%
+
+技能专长：
+• 精通Python、Flask、Django框架
+• 熟练使用MySQL、Redis、MongoDB
+• 掌握Docker、Kubernetes容器技术
+• 具备机器学习和数据分析经验
+
+项目经验：
+新闻智能拆条项目：
+- 基于深度学习算法，实现新闻自动分割
+- 技术栈：Python + PyTorch + Flask
+- 项目成果：处理效率提升3倍
+
+数据标注平台：
+- 机器学习模型训练数据标注系统
+- 支持多种数据类型的标注和质量控制
+- 用户体验优化，标注效率提升40%
+""",
+    extractions=[
+        # 基础信息
+        ("基础信息_姓名", "任街平"),
+        ("基础信息_性别", "男"),
+        ("基础信息_年龄", "32岁"),
+        ("基础信息_联系方式_手机", "19113247892"),
+        ("基础信息_联系方式_邮箱", "r414164729@163.com"),
+
+        # 教育背景
+        ("教育背景_最高学历", "本科"),
+        ("教育背景_毕业院校", "某理工大学"),
+        ("教育背景_专业", "计算机科学与技术"),
+
+        # 工作经历
+        ("工作经历_当前职位", "高级Python开发工程师"),
+        ("工作经历_工作年限", "8年"),
+        ("工作经历_核心职责", "后端系统架构设计和开发，微服务架构改造，技术选型和架构决策"),
+        ("工作经历_管理经验", "带领3人小团队完成核心业务模块开发"),
+        ("工作经历_技术深度", "主导微服务架构改造，提升系统性能30%，优化算法性能"),
+
+        # 技能体系
+        ("技能体系_核心技术", "Python后端开发，微服务架构"),
+        ("技能体系_技术广度", "Python, Flask, Django, MySQL, Redis, MongoDB, Docker, Kubernetes, 机器学习"),
+        ("技能体系_工具平台", "Docker, Kubernetes, PyTorch, Flask"),
+        ("技能体系_项目经验", "新闻智能拆条项目，数据标注平台，机器学习算法优化"),
+
+        # 能力特征
+        ("能力特征_创新能力", "算法性能优化，系统架构改造，处理效率提升"),
+        ("能力特征_学习能力", "掌握机器学习和深度学习技术，快速适应新技术"),
+        ("能力特征_沟通协作", "带领团队，参与技术决策，跨部门协作"),
+        ("能力特征_问题解决", "系统性能优化，架构改造，复杂业务问题解决")
+    ],
+    system_prompt="""你是一位资深的人才评估专家，具备深厚的技术背景和丰富的人才识别经验。
+
+请从简历中深度分析并提取以下信息：
+
+1. 基础信息分析：
+   - 准确识别个人基本信息
+   - 评估教育背景的含金量
+
+2. 工作经历深度分析：
+   - 分析职业发展轨迹和成长性
+   - 识别管理经验的深度和广度
+   - 评估技术深度和专业程度
+
+3. 技能体系评估：
+   - 识别核心技术竞争力
+   - 评估技术栈的广度和深度
+   - 分析项目经验的复杂度和价值
+
+4. 能力特征洞察：
+   - 创新能力：从项目成果和技术改进中识别
+   - 学习能力：从技术演进和新领域探索中评估
+   - 协作能力：从团队工作和跨部门合作中分析
+   - 问题解决：从复杂项目和技术挑战中提取
+
+请基于简历内容进行深度分析，不要简单罗列，要体现专业的人才评估视角。
+""",
+))
+
 
 class AdvancedReasoningSystem:
     """高级推理系统 - 匹配演示数据复杂度"""
@@ -53,172 +195,44 @@ class AdvancedReasoningSystem:
         print(f"使用高级推理系统分析: {text_file}")
         
         # 读取文本内容
-        with open(text_file, 'r', encoding='utf-8') as f:
-            text = f.read()
+        text = packed_corpus.read_text(text_file)
         
         print(f"文本长度: {len(text)} 字符")
         
-        # 第一步：使用AI提取结构化信息
-        structured_data = self._extract_structured_data_with_ai(text)
-        
-        # 第二步：基于结构化数据进行高级推理
-        reasoning_results = self._perform_advanced_reasoning(text, structured_data)
-        
-        # 第三步：生成最终Excel格式
-        final_excel_data = self._generate_final_excel_format(structured_data, reasoning_results)
+        resume_id = Path(text_file).stem.replace("_extracted", "")
+        with resume_scope(resume_id, stage="advanced_reasoning"), resume_deadline():
+            # 第一步：使用AI提取结构化信息
+            structured_data = self._extract_structured_data_with_ai(text)
+            
+            # 第二步：基于结构化数据进行高级推理
+            with span("format.tags"):
+                reasoning_results = self._perform_advanced_reasoning(text, structured_data)
+                
+                # 第三步：生成最终Excel格式
+                final_excel_data = self._generate_final_excel_format(structured_data, reasoning_results)
+            
+            # 归档原始数据（推理规则同时使用原文，一并保存），调整规则后可用 retag.py 重新生成
+            with span("output.write_raw"):
+                try:
+                    raw_archive.save_raw("advanced_reasoning", resume_id, {
+                        "source": text_file,
+                        "prompt": STRUCTURED_TEMPLATE.fingerprint,
+                        "schema_version": STRUCTURED_TEMPLATE.schema_version,
+                        "fields": list(STRUCTURED_TEMPLATE.fields),
+                        "text": text,
+                        "structured_data": structured_data,
+                        "result": final_excel_data,
+                    })
+                except OSError as e:
+                    print(f"⚠️  原始分析数据归档失败: {e}")
         
         return final_excel_data
 
     def _extract_structured_data_with_ai(self, text: str) -> dict:
         """使用AI提取结构化数据"""
         
-        # 更精确的schema，完全匹配演示数据需求
-        schema = {
-            "基础信息": {
-                "姓名": "string - 候选人真实姓名",
-                "性别": "string - 男/女",
-                "年龄": "string - 具体年龄",
-                "联系方式": {
-                    "手机": "string - 11位手机号",
-                    "邮箱": "string - 邮箱地址"
-                }
-            },
-            "教育背景": {
-                "最高学历": "string - 博士/硕士/本科/专科",
-                "毕业院校": "string - 学校名称",
-                "专业": "string - 专业名称"
-            },
-            "工作经历": {
-                "当前职位": "string - 最新职位名称",
-                "工作年限": "string - 总工作年数",
-                "核心职责": "string - 主要工作职责描述",
-                "管理经验": "string - 团队管理相关经验",
-                "技术深度": "string - 技术专业程度描述"
-            },
-            "技能体系": {
-                "核心技术": "string - 最擅长的技术领域",
-                "技术广度": "string - 涉及的技术范围",
-                "工具平台": "string - 使用的开发工具和平台",
-                "项目经验": "string - 重要项目经历"
-            },
-            "能力特征": {
-                "创新能力": "string - 创新相关的经历和成果",
-                "学习能力": "string - 学习新技术的能力体现",
-                "沟通协作": "string - 团队协作和沟通能力",
-                "问题解决": "string - 解决复杂问题的能力"
-            }
-        }
-        
-        # 创建高质量示例，完全匹配演示数据风格
-        example_text = """
-        任街平 - 高级Python开发工程师简历
-        
-        个人信息：
-        姓名：任街平
-        性别：男
-        年龄：32岁
-        手机：19113247892
-        邮箱：r414164729@163.com
-        
-        教育背景：
-        某理工大学 计算机科学与技术 本科 2014年毕业
-        
-        工作经历：
-        2018年至今 - 某科技公司 高级Python开发工程师
-        • 负责后端系统架构设计和开发
-        • 主导微服务架构改造，提升系统性能30%
-        • 带领3人小团队完成核心业务模块开发
-        • 参与技术选型和架构决策
-        
-        2016-2018 - 某互联网公司 Python开发工程师
-        • 负责数据处理和分析系统开发
-        • 优化算法性能，处理效率提升50%
-        
-        技能专长：
-        • 精通Python、Flask、Django框架
-        • 熟练使用MySQL、Redis、MongoDB
-        • 掌握Docker、Kubernetes容器技术
-        • 具备机器学习和数据分析经验
-        
-        项目经验：
-        新闻智能拆条项目：
-        - 基于深度学习算法，实现新闻自动分割
-        - 技术栈：Python + PyTorch + Flask
-        - 项目成果：处理效率提升3倍
-        
-        数据标注平台：
-        - 机器学习模型训练数据标注系统
-        - 支持多种数据类型的标注和质量控制
-        - 用户体验优化，标注效率提升40%
-        """
-        
-        # 创建精确的提取示例
-        extractions = [
-            # 基础信息
-            Extraction(extraction_class="基础信息_姓名", extraction_text="任街平"),
-            Extraction(extraction_class="基础信息_性别", extraction_text="男"),
-            Extraction(extraction_class="基础信息_年龄", extraction_text="32岁"),
-            Extraction(extraction_class="基础信息_联系方式_手机", extraction_text="19113247892"),
-            Extraction(extraction_class="基础信息_联系方式_邮箱", extraction_text="r414164729@163.com"),
-            
-            # 教育背景
-            Extraction(extraction_class="教育背景_最高学历", extraction_text="本科"),
-            Extraction(extraction_class="教育背景_毕业院校", extraction_text="某理工大学"),
-            Extraction(extraction_class="教育背景_专业", extraction_text="计算机科学与技术"),
-            
-            # 工作经历
-            Extraction(extraction_class="工作经历_当前职位", extraction_text="高级Python开发工程师"),
-            Extraction(extraction_class="工作经历_工作年限", extraction_text="8年"),
-            Extraction(extraction_class="工作经历_核心职责", extraction_text="后端系统架构设计和开发，微服务架构改造，技术选型和架构决策"),
-            Extraction(extraction_class="工作经历_管理经验", extraction_text="带领3人小团队完成核心业务模块开发"),
-            Extraction(extraction_class="工作经历_技术深度", extraction_text="主导微服务架构改造，提升系统性能30%，优化算法性能"),
-            
-            # 技能体系
-            Extraction(extraction_class="技能体系_核心技术", extraction_text="Python后端开发，微服务架构"),
-            Extraction(extraction_class="技能体系_技术广度", extraction_text="Python, Flask, Django, MySQL, Redis, MongoDB, Docker, Kubernetes, 机器学习"),
-            Extraction(extraction_class="技能体系_工具平台", extraction_text="Docker, Kubernetes, PyTorch, Flask"),
-            Extraction(extraction_class="技能体系_项目经验", extraction_text="新闻智能拆条项目，数据标注平台，机器学习算法优化"),
-            
-            # 能力特征
-            Extraction(extraction_class="能力特征_创新能力", extraction_text="算法性能优化，系统架构改造，处理效率提升"),
-            Extraction(extraction_class="能力特征_学习能力", extraction_text="掌握机器学习和深度学习技术，快速适应新技术"),
-            Extraction(extraction_class="能力特征_沟通协作", extraction_text="带领团队，参与技术决策，跨部门协作"),
-            Extraction(extraction_class="能力特征_问题解决", extraction_text="系统性能优化，架构改造，复杂业务问题解决")
-        ]
-        
-        examples = [ExampleData(text=example_text, extractions=extractions)]
-        
-        # 高级系统提示，强调推理分析
-        system_prompt = """
-        你是一位资深的人才评估专家，具备深厚的技术背景和丰富的人才识别经验。
-        
-        请从简历中深度分析并提取以下信息：
-        
-        1. 基础信息分析：
-           - 准确识别个人基本信息
-           - 评估教育背景的含金量
-        
-        2. 工作经历深度分析：
-           - 分析职业发展轨迹和成长性
-           - 识别管理经验的深度和广度
-           - 评估技术深度和专业程度
-        
-        3. 技能体系评估：
-           - 识别核心技术竞争力
-           - 评估技术栈的广度和深度
-           - 分析项目经验的复杂度和价值
-        
-        4. 能力特征洞察：
-           - 创新能力：从项目成果和技术改进中识别
-           - 学习能力：从技术演进和新领域探索中评估
-           - 协作能力：从团队工作和跨部门合作中分析
-           - 问题解决：从复杂项目和技术挑战中提取
-        
-        请基于简历内容进行深度分析，不要简单罗列，要体现专业的人才评估视角。
-        """
-        
         # 调用API进行结构化提取
-        result = self._call_api(text, schema, examples, system_prompt)
+        result = self._call_api(text, STRUCTURED_TEMPLATE)
         
         # 转换为结构化数据
         structured_data = {}
@@ -547,32 +561,14 @@ class AdvancedReasoningSystem:
 
     def _extract_years(self, years_str: str) -> int:
         """提取年数"""
-        if not years_str:
-            return 5
-        
-        import re
-        match = re.search(r'(\d+)', years_str)
-        if match:
-            return int(match.group(1))
-        
-        return 5
+        return date_normalization.extract_int(years_str, default=5)
 
     def _calculate_birth_date(self, age_str: str) -> str:
         """计算出生日期"""
         if not age_str:
             return ""
         
-        try:
-            import re
-            age_match = re.search(r'(\d+)', age_str)
-            if age_match:
-                age = int(age_match.group(1))
-                birth_year = datetime.now().year - age
-                return f"{birth_year}-01-01"
-        except:
-            pass
-        
-        return ""
+        return date_normalization.birth_date_from_age(age_str)
 
     def _mask_phone(self, phone: str) -> str:
         """手机号脱敏"""
@@ -602,29 +598,24 @@ class AdvancedReasoningSystem:
 
     def _estimate_work_start_date(self, years: int) -> str:
         """估算工作开始时间"""
-        start_year = datetime.now().year - years
-        return f"{start_year}-07-01"
+        return date_normalization.work_start_date(years)
 
-    def _call_api(self, text: str, schema: dict, examples: list, system_prompt: str):
+    def _call_api(self, text: str, template: PromptTemplate):
         """调用API"""
         
-        deepseek_api_key = os.getenv('DEEPSEEK_API_KEY')
-        if deepseek_api_key:
+        if llm_client.has_credentials('deepseek'):
             try:
                 print("使用 DeepSeek API 进行高级推理分析...")
                 
-                model = OpenAILanguageModel(
-                    model_id="deepseek-chat",
-                    api_key=deepseek_api_key,
-                    base_url="https://api.deepseek.com/v1",
-                    system_prompt=system_prompt
-                )
-                
-                result = lx.extract(
+                result = llm_client.extract(
                     text,
-                    schema,
-                    examples=examples,
-                    model=model
+                    template.schema,
+                    template.examples,
+                    template.system_prompt,
+                    provider='deepseek',
+                    stage='advanced_reasoning',
+                    fingerprint=template.fingerprint,
+                    validate_examples=False
                 )
                 
                 print("✓ DeepSeek API 高级推理分析成功")
@@ -639,16 +630,18 @@ class AdvancedReasoningSystem:
 
 def main():
     """主函数"""
-    if len(sys.argv) != 2:
+    if len(sys.argv) != 2 or sys.argv[1] in ('-h', '--help'):
         print("使用方法: python advanced_reasoning_system.py <文本文件路径>")
         sys.exit(1)
     
     text_file = sys.argv[1]
     
-    if not os.path.exists(text_file):
+    if not packed_corpus.text_exists(text_file):
         print(f"文件不存在: {text_file}")
         sys.exit(1)
     
+    start_from_env()
+    
     try:
         # 创建高级推理系统
         reasoning_system = AdvancedReasoningSystem()
@@ -663,10 +656,10 @@ def main():
         # 确保输出目录存在
         os.makedirs("outs", exist_ok=True)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(excel_data, f, ensure_ascii=False, indent=2)
+        with span("output.write_json"), track_export("json"):
+            saved = output_writer.save_result(output_file, excel_data)
         
-        print(f"\n✓ 高级推理分析结果已保存到: {output_file}")
+        print(f"\n✓ 高级推理分析结果已保存到: {saved}")
         
         # 显示结果预览
         print("\n=== 高级推理分析结果 ===")
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+紧凑的分析结果记录
+功能: 用 __slots__ 记录代替22个中文键的字典保存一行Excel结果，内存中同时持有大量简历（排序、导出）时显著减少占用:
+     - 5个标签字段拆成标签ID元组，标签文本存放在共享的标签词表中，相同的标签组合共用同一个元组
+     - 所属组织、性别、职级等取值有限的字段驻留（sys.intern），相同取值共用同一个字符串
+     - 与现有的字典/JSON结构无损互转：字段缺失、多出的字段、非字符串的值都原样保留
+
+使用方法:
+    records = analysis_record.load_results(glob.glob('outs/*_final_comprehensive.json'))
+    records.sort(key=lambda r: int(r.get('工作经验(年)') or 0), reverse=True)
+    rows = [r.to_dict() for r in records]
+
+内存占用对比见 benchmark_analysis_record.py
+"""
+
+import sys
+import json
+
+# Excel 的22列（字段名, 属性名），顺序与演示数据一致
+FIELDS = (
+    ("员工工号", "employee_id"),
+    ("姓名", "name"),
+    ("所属组织", "organization"),
+    ("性别", "gender"),
+    ("出生日期", "birth_date"),
+    ("身份证", "id_card"),
+    ("手机号", "phone"),
+    ("邮箱", "email"),
+    ("毕业院校", "school"),
+    ("最高学历", "education"),
+    ("担任岗位", "position"),
+    ("职级", "job_level"),
+    ("参加工作时间", "work_start_date"),
+    ("入司日期", "join_date"),
+    ("工作经验(年)", "years"),
+    ("绩效等级", "performance"),
+    ("职业资质", "qualifications"),
+    ("技术能力标签", "tech_tags"),
+    ("管理能力标签", "management_tags"),
+    ("业务能力标签", "business_tags"),
+    ("潜力标签", "potential_tags"),
+    ("风险标签", "risk_tags"),
+)
+COLUMNS = tuple(field for field, _ in FIELDS)
+ATTRIBUTES = dict(FIELDS)
+TAG_FIELDS = ("技术能力标签", "管理能力标签", "业务能力标签", "潜力标签", "风险标签")
+TAG_SEPARATOR = ";"
+
+# 每份简历各不相同的字段不驻留，其余字符串字段驻留
+UNIQUE_FIELDS = ("员工工号", "姓名", "手机号", "邮箱", "身份证")
+
+# 字段缺失（与空字符串区分）
+_MISSING = object()
+
+# 字段的保存方式：原样 / 驻留 / 标签ID
+_KEEP, _INTERN, _TAGS = 0, 1, 2
+_LAYOUT = tuple((field, attribute, _TAGS if field in TAG_FIELDS else _KEEP if field in UNIQUE_FIELDS else _INTERN)
+                for field, attribute in FIELDS)
+
+
+class TagVocabulary:
+    """标签词表：标签文本 <-> 整数ID；相同的标签组合返回同一个ID元组"""
+
+    def __init__(self, tags: list = ()):
+        self.tags = []
+        self._ids = {}
+        self._combinations = {}
+        for tag in tags:
+            self.tag_id(tag)
+
+    def tag_id(self, tag: str) -> int:
+        tag_id = self._ids.get(tag)
+        if tag_id is None:
+            tag_id = self._ids[tag] = len(self.tags)
+            self.tags.append(sys.intern(tag))
+        return tag_id
+
+    def encode(self, value: str) -> tuple:
+        """'后端开发-专家级;架构设计-高级' -> (3, 7)；空字符串为 ()"""
+        ids = self._combinations.get(value)
+        if ids is None:
+            ids = tuple(self.tag_id(tag) for tag in value.split(TAG_SEPARATOR)) if value else ()
+            ids = self._combinations.setdefault(ids, ids)
+            self._combinations[value] = ids
+        return ids
+
+    def decode(self, ids: tuple) -> str:
+        return TAG_SEPARATOR.join(self.tags[i] for i in ids)
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+
+VOCABULARY = TagVocabulary()
+
+
+class AnalysisRecord:
+    """一行Excel结果（22个字段）"""
+
+    __slots__ = tuple(attribute for _, attribute in FIELDS) + ('extra', 'vocabulary')
+
+    def __init__(self, vocabulary: TagVocabulary = None, **values):
+        self.vocabulary = VOCABULARY if vocabulary is None else vocabulary
+        self.extra = None
+        for field, attribute, kind in _LAYOUT:
+            setattr(self, attribute, self._pack(kind, values.pop(attribute, _MISSING)))
+        if values:
+            raise ValueError(f"未知的字段: {', '.join(values)}")
+
+    def _pack(self, kind: int, value):
+        if kind == _KEEP or value.__class__ is not str:
+            return value
+        return self.vocabulary.encode(value) if kind == _TAGS else sys.intern(value)
+
+    @classmethod
+    def from_dict(cls, data: dict, vocabulary: TagVocabulary = None) -> 'AnalysisRecord':
+        """从现有的字典结构创建；22列以外的字段保存在 extra 中"""
+        record = cls.__new__(cls)
+        record.vocabulary = vocabulary = VOCABULARY if vocabulary is None else vocabulary
+        encode, intern, get = vocabulary.encode, sys.intern, data.get
+        for field, attribute, kind in _LAYOUT:
+            value = get(field, _MISSING)
+            if value.__class__ is str and kind != _KEEP:
+                value = encode(value) if kind == _TAGS else intern(value)
+            setattr(record, attribute, value)
+        record.extra = {key: value for key, value in data.items() if key not in ATTRIBUTES} or None
+        return record
+
+    def get(self, field: str, default=None):
+        """按字段名读取（标签字段还原为 ';' 连接的字符串）"""
+        attribute = ATTRIBUTES.get(field)
+        if attribute is None:
+            return (self.extra or {}).get(field, default)
+        value = getattr(self, attribute)
+        if value is _MISSING:
+            return default
+        if field in TAG_FIELDS and isinstance(value, tuple):
+            return self.vocabulary.decode(value)
+        return value
+
+    def __getitem__(self, field: str):
+        value = self.get(field, _MISSING)
+        if value is _MISSING:
+            raise KeyError(field)
+        return value
+
+    def tags(self, field: str) -> list:
+        """某个标签字段的标签列表"""
+        if field not in TAG_FIELDS:
+            raise ValueError(f"不是标签字段: {field}")
+        value = getattr(self, ATTRIBUTES[field])
+        if isinstance(value, tuple):
+            return [self.vocabulary.tags[i] for i in value]
+        return [] if value is _MISSING or not value else str(value).split(TAG_SEPARATOR)
+
+    def to_dict(self) -> dict:
+        """还原为原来的字典结构（22列按Excel顺序，之后是 extra 中的字段）"""
+        data = {}
+        for field, _ in FIELDS:
+            value = self.get(field, _MISSING)
+            if value is not _MISSING:
+                data[field] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, **kwargs)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, AnalysisRecord) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"AnalysisRecord({self.get('姓名')!r}, {self.get('员工工号')!r})"
+
+    def __reduce__(self):
+        # 标签ID只在本进程的词表中有效，跨进程传递时用字典
+        return (AnalysisRecord.from_dict, (self.to_dict(),))
+
+
+def load_results(paths: list, vocabulary: TagVocabulary = None) -> list:
+    """
+    读取一批结果JSON文件（outs/*_final_comprehensive.json 等）
+
+    Raises:
+        ValueError: 文件内容不是结果对象
+    """
+    records = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"不是分析结果: {path}")
+        records.append(AnalysisRecord.from_dict(data, vocabulary))
+    return records
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+按大小调度批处理（最长处理时间优先 + 工作窃取）
+功能: 估算每份简历的处理成本（PDF按页数，取不到页数时按字节数；文本按长度），
+     按成本从大到小（LPT）分配给各工作线程，空闲的线程从其他线程的队列尾部窃取剩余任务，
+     避免最后提交的大文件让其他线程空等
+
+通过环境变量控制:
+    RESUME_BATCH_ORDER=lpt     批处理顺序：lpt（默认，大的先处理）/ input（按输入顺序）
+
+使用方法:
+    python batch_scheduler.py final_comprehensive middles/*_extracted.txt [--workers 4] [--order lpt|input]
+                              [--lane backfill] [--output-dir outs | --ndjson outs/results.ndjson|-]
+    默认与各格式化器相同，结果保存为 outs/<简历名>_<阶段>.json（设置 RESUME_OUTPUT_NDJSON 时追加到NDJSON流）
+
+与按文件名顺序处理的完成时间（makespan）对比见 benchmark_batch_scheduler.py
+"""
+
+import os
+import sys
+import time
+import heapq
+import argparse
+import threading
+import contextlib
+from collections import deque
+
+import metrics
+import output_writer
+import packed_corpus
+import priority_lanes
+
+# PDF 取不到页数时，按每页约该字节数估算
+BYTES_PER_PAGE = 60 * 1024
+
+# 阶段 -> (模块, 类, 方法)，输入为文本文件
+STAGES = {
+    "final_comprehensive": ("final_comprehensive_formatter", "FinalComprehensiveFormatter", "format_resume_comprehensive"),
+    "advanced_reasoning": ("advanced_reasoning_system", "AdvancedReasoningSystem", "analyze_resume_with_advanced_reasoning"),
+}
+
+
+def result_name(path: str, stage: str) -> str:
+    """一份简历在某阶段的结果文件名（与各格式化器 main() 的输出文件名一致）"""
+    return f"{packed_corpus.resume_id(path)}_{stage}.json"
+
+
+def save_stage_result(path: str, stage: str, result, output_dir: str = 'outs') -> str:
+    """
+    与格式化器 main() 相同的方式保存结果：设置了 RESUME_OUTPUT_NDJSON 时追加到NDJSON流，否则原子写入
+
+    Returns:
+        实际写入的位置
+    """
+    return output_writer.save_result(os.path.join(output_dir, result_name(path, stage)), result)
+
+
+def batch_order() -> str:
+    return os.getenv('RESUME_BATCH_ORDER', 'lpt')
+
+
+def pdf_cost(path: str) -> float:
+    """PDF的处理成本：页数（用最快的可用后端读取页数），失败时按文件大小估算"""
+    import pdf_backends
+    for name in pdf_backends.AUTO_ORDER:
+        backend = pdf_backends.BACKENDS[name]
+        if not backend.available():
+            continue
+        try:
+            return float(backend.page_count(path))
+        except Exception:
+            continue
+    return os.path.getsize(path) / BYTES_PER_PAGE
+
+
+def text_cost(path: str) -> float:
+    """文本的处理成本（LLM阶段）：文本字节数（含打包语料中的文本），与提示长度成正比"""
+    return float(packed_corpus.text_size(path))
+
+
+def estimate_cost(path: str) -> float:
+    """按扩展名选择成本估算；文件不存在时返回0"""
+    try:
+        return pdf_cost(path) if path.lower().endswith('.pdf') else text_cost(path)
+    except OSError:
+        return 0.0
+
+
+def lpt_order(items: list, cost=estimate_cost) -> list:
+    """按成本从大到小排序（成本相同时保持输入顺序）"""
+    costs = [cost(item) for item in items]
+    return [items[i] for i in sorted(range(len(items)), key=lambda i: -costs[i])]
+
+
+def lpt_partition(items: list, bins: int, cost=estimate_cost) -> list:
+    """
+    把任务分成 bins 组，使各组总成本尽量接近（LPT贪心：从大到小依次放入当前总成本最小的组）
+
+    Returns:
+        [[任务, ...], ...]，每组内按成本从大到小
+    """
+    bins = max(1, bins)
+    groups = [[] for _ in range(bins)]
+    heap = [(0.0, index) for index in range(bins)]
+    entries = sorted(((cost(item), position, item) for position, item in enumerate(items)),
+                     key=lambda entry: (-entry[0], entry[1]))
+    for item_cost, _, item in entries:
+        load, index = heapq.heappop(heap)
+        groups[index].append(item)
+        heapq.heappush(heap, (load + item_cost, index))
+    return groups
+
+
+def run_batch(items: list, func, workers: int = 4, cost=estimate_cost, order: str = None, steal: bool = True,
+              lane: str = None, stage: str = 'batch') -> tuple:
+    """
+    用线程批量执行 func(任务)（适合LLM调用等以等待为主的阶段）
+
+    Args:
+        order: lpt（按成本分组，组内从大到小）或 input（按输入顺序轮流分组）；默认取 RESUME_BATCH_ORDER
+        steal: 线程自己的队列空了之后是否从剩余成本最多的队列尾部窃取任务
+        lane: 优先级通道（priority_lanes），批量回填传 backfill；默认取当前通道
+        stage: 排队中的任务数计入 resume_queue_depth 指标的该阶段
+
+    Returns:
+        (结果列表, 统计)；结果按输入顺序，每项为 {"item", "result"/"error", "seconds", "worker"}，
+        统计为 {"makespan", "busy_seconds", "steals", "workers"}
+    """
+    order = order or batch_order()
+    lane = lane or priority_lanes.current_lane()
+    priority_lanes.lane_rank(lane)
+    if order not in ('lpt', 'input'):
+        raise ValueError(f"未知的批处理顺序: {order}（可选 lpt/input）")
+    workers = max(1, min(workers, len(items) or 1))
+    costs = [cost(item) for item in items]
+    indices = list(range(len(items)))
+    if order == 'lpt':
+        groups = lpt_partition(indices, workers, cost=lambda i: costs[i])
+    else:
+        groups = [indices[w::workers] for w in range(workers)]
+
+    queues = [deque(group) for group in groups]
+    remaining = [sum(costs[i] for i in group) for group in groups]
+    lock = threading.Lock()
+    results = [None] * len(items)
+    busy = [0.0] * workers
+    steals = [0]
+
+    def next_task(worker: int):
+        with lock:
+            if queues[worker]:
+                index = queues[worker].popleft()
+                remaining[worker] -= costs[index]
+                metrics.QUEUE_DEPTH.dec(stage=stage)
+                return index
+            if not steal:
+                return None
+            victim = max(range(workers), key=lambda w: remaining[w] if queues[w] else -1)
+            if not queues[victim]:
+                return None
+            # 从队列尾部（对方最后才会处理、成本最小的任务）窃取
+            index = queues[victim].pop()
+            remaining[victim] -= costs[index]
+            steals[0] += 1
+            metrics.QUEUE_DEPTH.dec(stage=stage)
+            return index
+
+    def work(worker: int):
+        with priority_lanes.lane_scope(lane):
+            work_loop(worker)
+
+    def work_loop(worker: int):
+        while True:
+            index = next_task(worker)
+            if index is None:
+                return
+            start = time.perf_counter()
+            record = {"item": items[index], "worker": worker}
+            try:
+                record["result"] = func(items[index])
+            except Exception as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+            record["seconds"] = round(time.perf_counter() - start, 4)
+            busy[worker] += record["seconds"]
+            results[index] = record
+
+    start = time.perf_counter()
+    # 多个批次同时运行时按增减累计
+    metrics.QUEUE_DEPTH.inc(len(items), stage=stage)
+    threads = [threading.Thread(target=work, args=(w,), name=f"batch-{w}", daemon=True) for w in range(workers)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        with lock:
+            metrics.QUEUE_DEPTH.dec(sum(len(queue) for queue in queues), stage=stage)
+    stats = {
+        "makespan": round(time.perf_counter() - start, 4),
+        "busy_seconds": [round(b, 4) for b in busy],
+        "steals": steals[0],
+        "workers": workers,
+    }
+    return results, stats
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="按大小调度的批量简历分析")
+    parser.add_argument('stage', choices=list(STAGES))
+    parser.add_argument('files', nargs='+', help="*_extracted.txt 文本文件")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--order', choices=['lpt', 'input'], default=None, help="默认取 RESUME_BATCH_ORDER")
+    parser.add_argument('--lane', choices=list(priority_lanes.LANES), default=None, help="优先级通道，默认取 RESUME_LANE")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--output-dir', default=None,
+                        help="每份结果原子写入 <目录>/<简历名>_<阶段>.json（默认 outs，且遵循 RESUME_OUTPUT_NDJSON）")
+    output.add_argument('--ndjson', default=None, help="结果逐行写入该NDJSON文件，'-' 为标准输出（进度信息改为输出到标准错误）")
+    args = parser.parse_args()
+
+    metrics.start_from_env()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    module_name, class_name, method_name = STAGES[args.stage]
+    formatter = getattr(__import__(module_name), class_name)()
+    analyze = getattr(formatter, method_name)
+    # 在屏蔽格式化器的打印之前打开输出流，'-' 才能写到真正的标准输出
+    stream = output_writer.NdjsonWriter(args.ndjson) if args.ndjson else None
+    log = sys.stderr if args.ndjson == '-' else sys.stdout
+
+    def process(path: str) -> str:
+        """分析并保存一份简历，返回结果写入的位置"""
+        result = analyze(path)
+        name = result_name(path, args.stage)
+        if stream is not None:
+            stream.write({"output": name, "result": result})
+            return args.ndjson
+        if args.output_dir:
+            return output_writer.write_json(os.path.join(args.output_dir, name), result)
+        return save_stage_result(path, args.stage, result)
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        results, stats = run_batch(args.files, process, args.workers, text_cost, args.order, lane=args.lane,
+                                   stage=args.stage)
+    if stream is not None:
+        stream.close()
+    failed = 0
+    for record in results:
+        name = os.path.basename(record["item"])
+        if "error" in record:
+            failed += 1
+            print(f"✗ {name}: {record['error']}", file=log)
+        else:
+            print(f"✓ {name} ({record['seconds']:.1f}s) -> {record['result']}", file=log)
+    print(f"\n完成 {len(results) - failed}，失败 {failed}，总耗时 {stats['makespan']:.1f}s，"
+          f"{stats['workers']} 个线程，窃取 {stats['steals']} 次", file=log)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+自适应并发控制器基准测试
+功能: 启动限制并发（超过上限返回429）并随机限流的本地桩服务器，
+     用多个线程并发调用 llm_client.extract，对比固定并发窗口和AIMD自适应窗口的
+     吞吐量、429次数、失败数和最终窗口
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+import contextlib
+
+from stub_llm_server import StubConfig, start_stub_server
+from synthetic_corpus import generate_resume
+
+SCHEMA = {"个人信息": {"姓名": "string", "电话": "string"}, "求职信息": {"求职意向": "string"}}
+
+
+def _examples():
+    from langextract.data import ExampleData, Extraction
+    text = "张三\n电话:13800138000\n求职意向：Python开发工程师"
+    return [ExampleData(text=text, extractions=[
+        Extraction(extraction_class="个人信息_姓名", extraction_text="张三"),
+        Extraction(extraction_class="个人信息_电话", extraction_text="13800138000"),
+        Extraction(extraction_class="求职信息_求职意向", extraction_text="Python开发工程师"),
+    ])]
+
+
+def run_mode(name: str, limiter, texts: list, workers: int, stub_config: StubConfig) -> dict:
+    """用给定的并发控制器跑完所有文本"""
+    import llm_client
+
+    server, base_url = start_stub_server(stub_config)
+    os.environ.update({"DEEPSEEK_API_KEY": "stub", "DEEPSEEK_BASE_URL": base_url})
+    llm_client.LIMITERS['deepseek'] = limiter
+    examples = _examples()
+
+    queue = list(enumerate(texts))
+    lock = threading.Lock()
+    failures = {}
+    window_trace = []
+
+    def worker():
+        while True:
+            with lock:
+                if not queue:
+                    return
+                _, text = queue.pop()
+            try:
+                llm_client.extract(text, SCHEMA, examples, stage='bench')
+            except Exception as e:
+                key = llm_client.error_type(e)
+                with lock:
+                    failures[key] = failures.get(key, 0) + 1
+
+    # langextract 的进度条和日志输出到 stdout/stderr，测量期间统一屏蔽
+    devnull = open(os.devnull, 'w')
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for t in threads:
+            t.start()
+        while any(t.is_alive() for t in threads):
+            window_trace.append(round(limiter.window, 2))
+            time.sleep(0.1)
+        for t in threads:
+            t.join()
+    wall = time.perf_counter() - start
+    devnull.close()
+    server.shutdown()
+
+    stub = server.stats.snapshot()
+    result = {
+        "mode": name,
+        "calls": len(texts),
+        "failed": sum(failures.values()),
+        "failures": failures,
+        "wall_seconds": round(wall, 2),
+        "calls_per_second": round((len(texts) - sum(failures.values())) / wall, 2),
+        "stub_requests": stub["requests"],
+        "stub_429": stub["responses"].get("429", 0),
+        "stub_max_in_flight": stub["max_in_flight"],
+        "limiter": limiter.snapshot(),
+        "window_trace": window_trace[::max(1, len(window_trace) // 40)],
+    }
+    print(f"{name:<10} 吞吐 {result['calls_per_second']:>6}/s  失败 {result['failed']:>3}  "
+          f"429 {result['stub_429']:>4}/{result['stub_requests']:<5} 最终窗口 {result['limiter']['window']:>5}  "
+          f"错误率 {result['limiter']['recent_error_rate']}")
+    return result
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="自适应并发控制器基准测试")
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=24, help="并发调用线程数")
+    parser.add_argument('--server-concurrency', type=int, default=6, help="桩服务器并发上限，超过返回429")
+    parser.add_argument('--throttle-rate', type=float, default=0.02)
+    parser.add_argument('--latency-ms', type=float, default=100.0)
+    parser.add_argument('--fixed-window', type=int, default=16)
+    parser.add_argument('--tpm', type=int, default=0, help="每分钟token预算")
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    logging.disable(logging.WARNING)
+    from adaptive_limiter import AdaptiveLimiter
+
+    rng = random.Random(42)
+    texts = [generate_resume(rng, 'small')[:600] for _ in range(args.calls)]
+
+    results = []
+    for name, limiter in (
+        ("fixed", AdaptiveLimiter('deepseek', initial=args.fixed_window, max_window=args.fixed_window,
+                                  tokens_per_minute=args.tpm, adaptive=False)),
+        ("adaptive", AdaptiveLimiter('deepseek', initial=4, max_window=args.fixed_window,
+                                     tokens_per_minute=args.tpm)),
+    ):
+        stub_config = StubConfig(latency_ms=args.latency_ms, jitter_ms=args.latency_ms * 0.3,
+                                 throttle_rate=args.throttle_rate, max_concurrency=args.server_concurrency, seed=7)
+        results.append(run_mode(name, limiter, texts, args.workers, stub_config))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
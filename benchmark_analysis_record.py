@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+分析结果记录内存基准测试
+功能: 生成一批与格式化器输出结构相同的合成结果（标签按规则从标签池中选取后用 ';' 拼接，每份简历都是新字符串），
+     对比以字典保存与以 AnalysisRecord 保存时的内存占用（tracemalloc）和转换耗时，并校验与字典的无损互转
+"""
+
+import gc
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+import analysis_record
+from analysis_record import AnalysisRecord, TagVocabulary
+
+TAG_POOLS = {
+    "技术能力标签": ["后端开发", "前端开发", "架构设计", "数据开发", "运维部署", "编程开发", "测试开发", "算法研究"],
+    "管理能力标签": ["团队协作", "团队管理", "项目管理", "跨部门协调", "技术指导"],
+    "业务能力标签": ["技术实现", "需求分析", "业务理解", "产品设计", "客户沟通"],
+}
+LEVELS = ["初级", "中级", "高级", "专家级"]
+POTENTIAL = ["发展潜力良好", "学习能力强", "技术视野开阔", "成长速度快"]
+RISKS = ["无明显风险", "跳槽频繁", "管理经验不足", "技术栈单一"]
+
+
+def generate_row(rng: random.Random, i: int) -> dict:
+    """一份合成结果；所有字段值都重新构造，与格式化器每次生成新字符串一致"""
+    years = rng.randint(1, 20)
+    row = {
+        "员工工号": f"r{100000 + i}",
+        "姓名": f"候选人{i}",
+        "所属组织": "".join(["技术", "研发部"]),
+        "性别": rng.choice(["男", "女"]) + "",
+        "出生日期": f"{rng.randint(1975, 2001)}-01-01",
+        "身份证": "",
+        "手机号": f"1{rng.randint(30, 99)}****{rng.randint(1000, 9999)}",
+        "邮箱": f"user{i}@example.com",
+        "毕业院校": "",
+        "最高学历": "",
+        "担任岗位": "".join(["高级", rng.choice(["Python", "Java", "Go"]), "开发工程师"]),
+        "职级": f"P{rng.randint(4, 8)}-{rng.choice(LEVELS[1:3])}级",
+        "参加工作时间": f"{2025 - years}-07-01",
+        "入司日期": "",
+        "工作经验(年)": str(years),
+        "绩效等级": "",
+        "职业资质": "",
+    }
+    for field, pool in TAG_POOLS.items():
+        row[field] = ";".join(f"{tag}-{rng.choice(LEVELS)}" for tag in rng.sample(pool, rng.randint(1, 3)))
+    row["潜力标签"] = ";".join(rng.sample(POTENTIAL, rng.randint(1, 2)))
+    row["风险标签"] = ";".join(rng.sample(RISKS, 1))
+    return row
+
+
+def measure(build) -> tuple:
+    """返回 (对象, 分配的字节数, 耗时)；耗时在关闭 tracemalloc 时单独测量"""
+    gc.collect()
+    start = time.perf_counter()
+    build()
+    seconds = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, seconds
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="分析结果记录内存基准测试")
+    parser.add_argument('--count', type=int, default=100000, help="结果数量")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # 以JSON文本为源，两种方式都从解析结果开始构造，与读取 outs/*.json 一致
+    payload = [json.dumps(generate_row(rng, i), ensure_ascii=False) for i in range(args.count)]
+
+    dicts, dict_bytes, dict_seconds = measure(lambda: [json.loads(line) for line in payload])
+    vocabulary = TagVocabulary()
+    records, record_bytes, record_seconds = measure(
+        lambda: [AnalysisRecord.from_dict(json.loads(line), vocabulary) for line in payload])
+
+    start = time.perf_counter()
+    lossless = all(record.to_dict() == row for record, row in zip(records, dicts))
+    back_seconds = time.perf_counter() - start
+
+    results = {
+        "results": args.count,
+        "dict_bytes": dict_bytes,
+        "record_bytes": record_bytes,
+        "bytes_per_result": {"dict": round(dict_bytes / args.count), "record": round(record_bytes / args.count)},
+        "vocabulary_tags": len(vocabulary),
+        "build_seconds": {"dict": round(dict_seconds, 3), "record": round(record_seconds, 3)},
+        "to_dict_seconds": round(back_seconds, 3),
+        "lossless": lossless,
+    }
+    print(f"{args.count} 份结果，标签词表 {len(vocabulary)} 个标签，{len(analysis_record.COLUMNS)} 列")
+    print(f"字典           {dict_bytes / 1024 / 1024:>8.1f}MB  每份 {results['bytes_per_result']['dict']:>5} 字节  "
+          f"构造 {dict_seconds:.2f}s")
+    print(f"AnalysisRecord {record_bytes / 1024 / 1024:>8.1f}MB  每份 {results['bytes_per_result']['record']:>5} 字节  "
+          f"构造 {record_seconds:.2f}s")
+    print(f"\n内存减少 {1 - record_bytes / dict_bytes:.1%}，还原为字典 {back_seconds:.2f}s  "
+          f"{'✓ 无损' if lossless else '✗ 还原结果不一致'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
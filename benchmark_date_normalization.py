@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+日期规范化基准测试
+功能: 用合成的简历日期字符串（中文简历常见格式混合，少量需要 dateutil 兜底）对比:
+     - 原来的做法: 每次调用 from dateutil import parser + parser.parse（时间段先按 "-" 拆分）
+     - date_normalization 预编译正则快速路径（关闭LRU缓存）
+     - date_normalization 快速路径 + LRU缓存
+     - date_normalization 批量接口
+     并检查解析出的年月、时间段月数与生成时一致（dateutil 会把 "2022.07" 当成小数，得到错误的月份）
+"""
+
+import json
+import time
+import random
+import argparse
+from datetime import date, datetime
+
+import date_normalization
+
+DATE_FORMATS = [
+    lambda y, m, d: f"{y}.{m:02d}",
+    lambda y, m, d: f"{y}-{m:02d}-{d:02d}",
+    lambda y, m, d: f"{y}/{m}",
+    lambda y, m, d: f"{y}年{m}月",
+    lambda y, m, d: f"{y}年{m}月{d}日",
+    lambda y, m, d: f"{y}{m:02d}",
+    lambda y, m, d: f"{y}",
+]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def generate_date(rng: random.Random) -> tuple:
+    """返回 (日期字符串, 年, 月)；只有年份的格式月份为1"""
+    y, m, d = rng.randint(1995, 2025), rng.randint(1, 12), rng.randint(1, 28)
+    if rng.random() < 0.05:
+        return f"{MONTHS[m - 1]} {y}", y, m  # 未知格式，走 dateutil 兜底
+    fmt = rng.choice(DATE_FORMATS)
+    return fmt(y, m, d), y, (m if fmt is not DATE_FORMATS[-1] else 1)
+
+
+RANGE_FORMATS = [
+    lambda start, end: f"{start('.')}-{end('.')}",
+    lambda start, end: f"{start('-')}-{end('-')}",
+    lambda start, end: f"{start('-')} - {end('-')}",
+    lambda start, end: f"{start('-')}~{end('-')}",
+    lambda start, end: f"{start('/')}至{end('/')}",
+    lambda start, end: f"{start('年')}月-{end('年')}月",
+]
+
+
+def generate_range(rng: random.Random) -> tuple:
+    """返回 (时间段字符串, 月数)"""
+    y, m = rng.randint(2005, 2022), rng.randint(1, 12)
+    start = lambda sep: f"{y}{sep}{m:02d}"
+    if rng.random() < 0.3:
+        today = date.today()
+        return f"{start('.')}-至今", (today.year - y) * 12 + today.month - m
+    end_y, end_m = y + rng.randint(1, 3), rng.randint(1, 12)
+    end = lambda sep: f"{end_y}{sep}{end_m:02d}"
+    return rng.choice(RANGE_FORMATS)(start, end), (end_y - y) * 12 + end_m - m
+
+
+def legacy_parse_date(text: str):
+    try:
+        from dateutil import parser
+        return parser.parse(text).date()
+    except Exception:
+        return None
+
+
+def legacy_range_months(text: str):
+    try:
+        from dateutil import parser
+        start_str, end_str = text.split("-", 1)
+        if "至今" in end_str:
+            end_str = datetime.now().strftime("%Y.%m")
+        start = parser.parse(start_str.strip().replace(".", "-"))
+        end = parser.parse(end_str.strip().replace(".", "-"))
+        return max(0, (end.year - start.year) * 12 + (end.month - start.month))
+    except Exception:
+        return None
+
+
+def timed(label: str, count: int, func) -> dict:
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    return {"mode": label, "values": count, "seconds": round(seconds, 4),
+            "values_per_second": round(count / seconds) if seconds else 0}
+
+
+def without_cache(dates: list, ranges: list):
+    """直接调用被缓存包装的函数，只测快速路径本身"""
+    parse = date_normalization._parse_cached.__wrapped__
+    split = date_normalization._split_range.__wrapped__
+    for text in dates:
+        parse(text)
+    for text in ranges:
+        split(text)
+
+
+def count_mismatches(expected: dict, parse) -> int:
+    """解析出的年月与生成时不一致（或无法解析）的取值数"""
+    mismatches = 0
+    for text, year_month in expected.items():
+        parsed = parse(text)
+        if parsed is None or (parsed.year, parsed.month) != year_month:
+            mismatches += 1
+    return mismatches
+
+
+def count_range_mismatches(expected: dict, months) -> int:
+    """时间段月数与生成时不一致（或无法解析）的取值数"""
+    return sum(1 for text, value in expected.items() if months(text) != value)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="日期规范化基准测试")
+    parser.add_argument('--count', type=int, default=50000, help="日期和时间段各生成多少条")
+    parser.add_argument('--unique', type=int, default=2000, help="不同取值的数量（模拟批量简历中的重复）")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    generated = [generate_date(rng) for _ in range(args.unique)]
+    expected = {text: (y, m) for text, y, m in generated}
+    date_pool = list(expected)
+    expected_ranges = dict(generate_range(rng) for _ in range(args.unique))
+    range_pool = list(expected_ranges)
+    dates = [rng.choice(date_pool) for _ in range(args.count)]
+    ranges = [rng.choice(range_pool) for _ in range(args.count)]
+    total = len(dates) + len(ranges)
+    print(f"日期 {len(dates)} 条 + 时间段 {len(ranges)} 条，不同取值各 {args.unique} 个")
+
+    results = [
+        timed("dateutil 逐条解析（原做法）", total,
+              lambda: ([legacy_parse_date(t) for t in dates], [legacy_range_months(t) for t in ranges])),
+        timed("快速路径（无缓存）", total, lambda: without_cache(dates, ranges)),
+    ]
+    date_normalization._parse_cached.cache_clear()
+    date_normalization._split_range.cache_clear()
+    results.append(timed("快速路径 + LRU缓存", total,
+                         lambda: ([date_normalization.parse_date(t) for t in dates],
+                                  [date_normalization.range_months(t) for t in ranges])))
+    date_normalization._parse_cached.cache_clear()
+    date_normalization._split_range.cache_clear()
+    results.append(timed("批量接口", total,
+                         lambda: (date_normalization.parse_dates(dates), date_normalization.range_months_batch(ranges))))
+
+    baseline = results[0]["seconds"]
+    for result in results:
+        result["speedup"] = round(baseline / result["seconds"], 1) if result["seconds"] else 0.0
+        print(f"{result['mode']:<24} {result['seconds']:>8.3f}s  {result['values_per_second']:>10} 条/秒  "
+              f"{result['speedup']:>6.1f}x")
+
+    for label, parse in (("dateutil", legacy_parse_date), ("date_normalization", date_normalization.parse_date)):
+        mismatches = count_mismatches(expected, parse)
+        mark = "✓" if not mismatches else "⚠️"
+        print(f"{mark} {label}: {mismatches}/{len(expected)} 个取值年月解析错误")
+    for label, months in (("dateutil", legacy_range_months), ("date_normalization", date_normalization.range_months)):
+        mismatches = count_range_mismatches(expected_ranges, months)
+        mark = "✓" if not mismatches else "⚠️"
+        print(f"{mark} {label}: {mismatches}/{len(expected_ranges)} 个时间段月数计算错误")
+    print(f"缓存: {date_normalization.cache_info()}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+对冲请求基准测试
+功能: 启动带长尾延迟（偶发慢响应）的本地桩服务器，按交互式路径逐份调用 llm_client.extract，
+     对比开启/关闭对冲时的 p50/p95/p99 延迟、额外请求比例以及对冲请求先返回的次数
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import contextlib
+
+from stub_llm_server import StubConfig, start_stub_server
+from synthetic_corpus import generate_resume
+from benchmark_adaptive_limiter import SCHEMA, _examples
+from tracing import percentile
+
+
+def run_mode(name: str, hedge: bool, texts: list, warmup: int, stub_config: StubConfig) -> dict:
+    """逐份调用，返回延迟分位数和对冲统计"""
+    import llm_client
+    import hedging
+
+    server, base_url = start_stub_server(stub_config)
+    os.environ.update({"DEEPSEEK_API_KEY": "stub", "DEEPSEEK_BASE_URL": base_url})
+    llm_client.HEDGERS.pop('deepseek', None)
+    os.environ['RESUME_LLM_HEDGE'] = '1' if hedge else '0'
+    if hedge:
+        llm_client.HEDGERS['deepseek'] = hedging.Hedger('deepseek', tracker=hedging.LatencyTracker(key='bench'))
+    examples = _examples()
+
+    latencies = []
+    devnull = open(os.devnull, 'w')
+    with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        for i, text in enumerate(texts[:warmup] + texts):
+            t0 = time.perf_counter()
+            llm_client.extract(text, SCHEMA, examples, stage='bench')
+            if i >= warmup:
+                latencies.append(time.perf_counter() - t0)
+    devnull.close()
+    server.shutdown()
+
+    hedges = {result: int(hedging.HEDGES.get(provider='deepseek', result=result))
+              for result in ('won', 'lost', 'skipped_budget', 'skipped_capacity', 'failed')}
+    stub = server.stats.snapshot()
+    result = {
+        "mode": name,
+        "calls": len(texts),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+        "stub_requests": stub["requests"],
+        "extra_request_rate": round(stub["requests"] / (len(texts) + warmup) - 1, 3),
+        "hedges": hedges,
+    }
+    print(f"{name:<10} p50 {result['p50_ms']:>8}ms  p95 {result['p95_ms']:>8}ms  p99 {result['p99_ms']:>8}ms  "
+          f"额外请求 {result['extra_request_rate']:.1%}  对冲 {hedges}")
+    return result
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="对冲请求基准测试")
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=30, help="预热请求数（用于积累延迟分位数）")
+    parser.add_argument('--latency-ms', type=float, default=40.0)
+    parser.add_argument('--slow-rate', type=float, default=0.05, help="慢响应概率")
+    parser.add_argument('--slow-ms', type=float, default=600.0, help="慢响应额外延迟")
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    logging.disable(logging.WARNING)
+
+    rng = random.Random(42)
+    texts = [generate_resume(rng, 'small')[:600] for _ in range(args.calls)]
+
+    results = []
+    for name, hedge in (("baseline", False), ("hedged", True)):
+        stub_config = StubConfig(latency_ms=args.latency_ms, jitter_ms=args.latency_ms * 0.2,
+                                 slow_rate=args.slow_rate, slow_ms=args.slow_ms, seed=11)
+        results.append(run_mode(name, hedge, texts, args.warmup, stub_config))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
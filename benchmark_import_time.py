@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+命令行启动时间基准测试
+功能: 用 `python -X importtime` 导入各入口模块，解析导入耗时报告，
+     列出最耗时的导入，检查重量级依赖（langextract、pandas、openai等）是否被提前加载，
+     并测量 `--help` 的冷启动耗时；超过阈值时以非零状态退出，可作为启动时间的回归守卫
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+# 入口脚本 -> 模块名
+ENTRY_POINTS = {
+    "final_comprehensive_formatter.py": "final_comprehensive_formatter",
+    "advanced_reasoning_system.py": "advanced_reasoning_system",
+    "resume_to_excel_format.py": "resume_to_excel_format",
+    "intelligent_reasoning_formatter.py": "intelligent_reasoning_formatter",
+    "bryan_specific_formatter.py": "bryan_specific_formatter",
+    "enhanced_langextract_formatter.py": "enhanced_langextract_formatter",
+}
+
+# 这些模块应当延迟到第一次调用模型/写Excel时才导入
+HEAVY_MODULES = ("langextract", "pandas", "openai", "dotenv", "unstructured", "numpy", "httpx")
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    解析 -X importtime 的输出
+
+    Returns:
+        [{"module", "self_us", "cumulative_us", "depth"}...]，按出现顺序
+    """
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            parts = line[len("import time:"):].split("|")
+            self_us, cumulative_us, name = int(parts[0]), int(parts[1]), parts[2]
+        except (ValueError, IndexError):
+            continue
+        stripped = name.lstrip(" ")
+        records.append({
+            "module": stripped,
+            "self_us": self_us,
+            "cumulative_us": cumulative_us,
+            "depth": (len(name) - len(stripped) - 1) // 2,
+        })
+    return records
+
+
+def module_subtree(records: list, module: str) -> list:
+    """取出由入口模块触发的导入（importtime 先输出子模块，再输出父模块）"""
+    for end in range(len(records) - 1, -1, -1):
+        if records[end]["module"] == module and records[end]["depth"] == 0:
+            start = end
+            while start > 0 and records[start - 1]["depth"] > 0:
+                start -= 1
+            return records[start:end]
+    return []
+
+
+def measure_entry_point(script: str, module: str, repeat: int, top: int) -> dict:
+    """测量一个入口模块的导入耗时和 --help 的整体耗时"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    import_totals, help_totals, records = [], [], []
+
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                capture_output=True, text=True, cwd=root)
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "导入失败"}
+        records = parse_importtime(result.stderr)
+        own = [r for r in records if r["module"] == module]
+        import_totals.append(own[-1]["cumulative_us"] / 1000 if own else 0.0)
+
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, script, "--help"], capture_output=True, cwd=root)
+        help_totals.append((time.perf_counter() - t0) * 1000)
+
+    subtree = module_subtree(records, module)
+    loaded = {r["module"].split(".")[0] for r in subtree}
+    heaviest = sorted(subtree, key=lambda r: r["cumulative_us"], reverse=True)[:top]
+    return {
+        "import_ms": round(statistics.median(import_totals), 2),
+        "help_ms": round(statistics.median(help_totals), 2),
+        "heavy_modules_loaded": sorted(loaded.intersection(HEAVY_MODULES)),
+        "top_imports": [{"module": r["module"], "cumulative_ms": round(r["cumulative_us"] / 1000, 2)}
+                        for r in heaviest],
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="命令行启动时间基准测试")
+    parser.add_argument('--repeat', type=int, default=5, help="每个入口重复次数，取中位数")
+    parser.add_argument('--top', type=int, default=5, help="列出最耗时的导入数量")
+    parser.add_argument('--max-import-ms', type=float, default=150.0, help="入口模块导入耗时上限")
+    parser.add_argument('--max-help-ms', type=float, default=500.0, help="`--help` 整体耗时上限（含解释器启动）")
+    parser.add_argument('--output', default=None, help="结果JSON路径")
+    args = parser.parse_args()
+
+    report, failures = {}, []
+    for script, module in ENTRY_POINTS.items():
+        result = measure_entry_point(script, module, args.repeat, args.top)
+        report[script] = result
+        if "error" in result:
+            failures.append(f"{script}: {result['error']}")
+            print(f"✗ {script}: {result['error']}")
+            continue
+
+        problems = []
+        if result["import_ms"] > args.max_import_ms:
+            problems.append(f"导入 {result['import_ms']}ms > {args.max_import_ms}ms")
+        if result["help_ms"] > args.max_help_ms:
+            problems.append(f"--help {result['help_ms']}ms > {args.max_help_ms}ms")
+        if result["heavy_modules_loaded"]:
+            problems.append(f"提前加载了 {', '.join(result['heavy_modules_loaded'])}")
+
+        marker = "✗" if problems else "✓"
+        print(f"{marker} {script:<38} 导入 {result['import_ms']:>8.2f}ms   --help {result['help_ms']:>8.2f}ms")
+        for item in result["top_imports"]:
+            print(f"      {item['module']:<40}{item['cumulative_ms']:>10.2f}ms")
+        for problem in problems:
+            print(f"  ⚠️  {problem}")
+            failures.append(f"{script}: {problem}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ 结果已保存到: {args.output}")
+
+    if failures:
+        print(f"\n✗ 启动时间检查未通过（{len(failures)} 项）")
+        sys.exit(1)
+    print("\n✓ 启动时间检查通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+行分类器基准测试与一致率报告
+功能: 在同一批简历文本上分别运行 unstructured 的 partition_text 和内置的轻量行分类器
+     （line_classifier），对比导入时间、分区耗时，并报告两者的一致率：
+     - 分段一致率: 两边切出的元素文本能对上的比例
+     - 类型一致率: 对上的元素中，对输出文本影响相同（标题/列表/原样）的比例，附混淆矩阵
+     - 输出一致率: 整理后的文本与 partition_text 完全相同的简历比例
+
+语料: 默认使用合成简历；--pdf-dir 指定PDF目录时用 pdfminer 提取真实简历的原始文本
+"""
+
+import os
+import sys
+import json
+import time
+import glob
+import random
+import difflib
+import argparse
+import statistics
+
+import line_classifier
+from synthetic_corpus import generate_resume
+
+
+def load_corpus(args) -> list:
+    """返回 [(名称, 原始文本)]"""
+    if args.pdf_dir:
+        from pdfminer.high_level import extract_text
+        corpus = []
+        for path in sorted(glob.glob(os.path.join(args.pdf_dir, '*.pdf'))):
+            try:
+                corpus.append((os.path.basename(path), extract_text(path)))
+            except Exception as e:
+                print(f"⚠️ 跳过 {path}: {e}")
+        return corpus
+    rng = random.Random(args.seed)
+    sizes = ['small', 'medium', 'large']
+    return [(f"synthetic_{i:05d}", generate_resume(rng, sizes[i % 3])) for i in range(args.resumes)]
+
+
+def run_lines(texts: list) -> tuple:
+    """返回 (每份简历的元素列表, 每份耗时毫秒)"""
+    outputs, durations = [], []
+    for text in texts:
+        start = time.perf_counter()
+        outputs.append(line_classifier.partition_lines(text))
+        durations.append((time.perf_counter() - start) * 1000)
+    return outputs, durations
+
+
+def run_unstructured(texts: list) -> tuple:
+    """返回 (导入秒数, 每份简历的元素列表, 每份耗时毫秒)；unstructured 不可用时抛出异常"""
+    start = time.perf_counter()
+    from unstructured.partition.text import partition_text
+    import_seconds = time.perf_counter() - start
+
+    outputs, durations = [], []
+    for text in texts:
+        start = time.perf_counter()
+        elements = [(type(element).__name__, str(element).strip()) for element in partition_text(text=text)]
+        durations.append((time.perf_counter() - start) * 1000)
+        outputs.append(elements)
+    return import_seconds, outputs, durations
+
+
+def agreement(reference: list, candidate: list) -> dict:
+    """对比一份简历两边的元素列表"""
+    matcher = difflib.SequenceMatcher(None, [t for _, t in reference], [t for _, t in candidate], autojunk=False)
+    matched = 0
+    same_class = 0
+    confusion = {}
+    for block in matcher.get_matching_blocks():
+        for offset in range(block.size):
+            ref_class = line_classifier.render_class(reference[block.a + offset][0])
+            cand_class = line_classifier.render_class(candidate[block.b + offset][0])
+            matched += 1
+            same_class += ref_class == cand_class
+            key = f"{ref_class}->{cand_class}"
+            confusion[key] = confusion.get(key, 0) + 1
+    return {
+        "elements": max(len(reference), len(candidate)),
+        "matched": matched,
+        "same_class": same_class,
+        "confusion": confusion,
+        "identical_output": line_classifier.render_elements(reference) == line_classifier.render_elements(candidate),
+    }
+
+
+def summarize(durations: list) -> dict:
+    ordered = sorted(durations)
+    return {
+        "total_ms": round(sum(durations), 2),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] if len(ordered) > 1 else ordered[0], 3),
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="行分类器基准测试与一致率报告")
+    parser.add_argument('--resumes', type=int, default=200, help="合成简历数量")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--pdf-dir', default=None, help="用该目录下的PDF作为语料")
+    parser.add_argument('--threshold', type=float, default=0.95, help="建议切换的类型一致率阈值")
+    parser.add_argument('--output', default=None, help="结果JSON文件")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args)
+    if not corpus:
+        print("✗ 语料为空")
+        sys.exit(1)
+    names = [name for name, _ in corpus]
+    texts = [text for _, text in corpus]
+    print(f"语料: {len(texts)} 份简历，共 {sum(len(t) for t in texts)} 字符")
+
+    lines_outputs, lines_durations = run_lines(texts)
+    report = {"resumes": len(texts), "line_classifier": summarize(lines_durations)}
+    print(f"line_classifier  总计 {report['line_classifier']['total_ms']:>9.1f}ms  "
+          f"p50 {report['line_classifier']['p50_ms']:.3f}ms  p95 {report['line_classifier']['p95_ms']:.3f}ms")
+
+    try:
+        import_seconds, reference_outputs, reference_durations = run_unstructured(texts)
+    except Exception as e:
+        # 未安装 unstructured，或其句子切分模型无法下载
+        print(f"⚠️ partition_text 不可用，只报告行分类器耗时: {e}")
+        reference_outputs = None
+    if reference_outputs is not None:
+        report["unstructured"] = dict(summarize(reference_durations), import_seconds=round(import_seconds, 3))
+        print(f"partition_text   总计 {report['unstructured']['total_ms']:>9.1f}ms  "
+              f"p50 {report['unstructured']['p50_ms']:.3f}ms  p95 {report['unstructured']['p95_ms']:.3f}ms  "
+              f"（导入 {import_seconds:.2f}s）")
+
+        totals = {"elements": 0, "matched": 0, "same_class": 0, "identical_output": 0}
+        confusion = {}
+        worst = []
+        for name, reference, candidate in zip(names, reference_outputs, lines_outputs):
+            result = agreement(reference, candidate)
+            for key in ("elements", "matched", "same_class"):
+                totals[key] += result[key]
+            totals["identical_output"] += result["identical_output"]
+            for key, count in result["confusion"].items():
+                confusion[key] = confusion.get(key, 0) + count
+            worst.append((result["same_class"] / result["matched"] if result["matched"] else 0.0, name))
+
+        report["agreement"] = {
+            "segmentation": round(totals["matched"] / totals["elements"], 4) if totals["elements"] else 0.0,
+            "label": round(totals["same_class"] / totals["matched"], 4) if totals["matched"] else 0.0,
+            "identical_output": round(totals["identical_output"] / len(texts), 4),
+            "confusion": dict(sorted(confusion.items(), key=lambda item: -item[1])),
+            "worst": [name for _, name in sorted(worst)[:5]],
+        }
+        agree = report["agreement"]
+        print(f"\n分段一致率 {agree['segmentation']:.1%}  类型一致率 {agree['label']:.1%}  "
+              f"输出完全一致 {agree['identical_output']:.1%}")
+        print("混淆矩阵（partition_text -> line_classifier）:")
+        for key, count in agree["confusion"].items():
+            print(f"    {key:<14} {count}")
+        print(f"一致率最低: {', '.join(agree['worst'])}")
+        if agree["label"] >= args.threshold and agree["segmentation"] >= args.threshold:
+            print(f"✓ 一致率达到 {args.threshold:.0%}，可以设置 RESUME_PARTITIONER=lines")
+        else:
+            print(f"⚠️ 一致率低于 {args.threshold:.0%}，请先检查混淆矩阵中差异最大的类型")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
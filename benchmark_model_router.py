@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+分层模型路由基准测试
+功能: 启动本地桩服务器（fast 层模型按给定概率返回不完整结果），用 FinalComprehensiveFormatter 的AI推理分析
+     逐份处理合成简历，对比只用 strong 层和开启分层路由时的升级率、各层延迟、token用量和估算成本
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import contextlib
+
+from stub_llm_server import StubConfig, start_stub_server
+from synthetic_corpus import generate_resume
+
+
+def run_mode(name: str, routed: bool, texts: list, stub_config: StubConfig) -> dict:
+    """处理所有简历，返回路由器的分层统计"""
+    import model_router
+    from final_comprehensive_formatter import FinalComprehensiveFormatter
+
+    server, base_url = start_stub_server(stub_config)
+    os.environ.update({"DEEPSEEK_API_KEY": "stub", "DEEPSEEK_BASE_URL": base_url,
+                       "QWEN_API_KEY": "stub", "QWEN_BASE_URL": base_url})
+    router = model_router.ModelRouter.from_env()
+    if not routed:
+        # 只用 strong 层：fast 层没有可用的服务商key时路由器直接调用 strong 层
+        os.environ["QWEN_API_KEY"] = ""
+    model_router._router = router
+    os.environ["RESUME_ROUTER"] = "1"
+    formatter = FinalComprehensiveFormatter()
+
+    start = time.perf_counter()
+    devnull = open(os.devnull, 'w')
+    with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        for text in texts:
+            formatter._perform_ai_reasoning_analysis(text, {})
+    devnull.close()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    report = router.report()
+    total_cost = sum(tier['cost_yuan'] for tier in report.values())
+    result = {"mode": name, "resumes": len(texts), "seconds": round(elapsed, 2),
+              "cost_yuan": round(total_cost, 6), "tiers": report}
+    fast = report['fast']
+    print(f"{name:<12} 耗时 {elapsed:>6.2f}s  成本 ¥{total_cost:.4f}  "
+          f"fast调用 {fast['calls']:>4}  升级率 {fast['escalation_rate'] or 0:.1%}  strong调用 {report['strong']['calls']:>4}")
+    return result
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="分层模型路由基准测试")
+    parser.add_argument('--resumes', type=int, default=100)
+    parser.add_argument('--drop-rate', type=float, default=0.2, help="fast 层模型返回不完整结果的概率")
+    parser.add_argument('--latency-ms', type=float, default=10.0)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    logging.disable(logging.WARNING)
+    os.environ.setdefault("RESUME_ROUTER_FAST", "qwen:qwen-turbo")
+    os.environ.setdefault("RESUME_ROUTER_STRONG", "deepseek:deepseek-chat")
+    fast_model = os.environ["RESUME_ROUTER_FAST"].partition(':')[2]
+
+    rng = random.Random(42)
+    texts = [generate_resume(rng, 'medium') for _ in range(args.resumes)]
+
+    results = []
+    for name, routed in (("strong_only", False), ("routed", True)):
+        stub_config = StubConfig(latency_ms=args.latency_ms, jitter_ms=args.latency_ms * 0.2,
+                                 drop_rate=args.drop_rate, drop_models=(fast_model,), seed=5)
+        results.append(run_mode(name, routed, texts, stub_config))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
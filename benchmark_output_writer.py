@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+结果输出吞吐量基准测试
+功能: 用合成的分析结果（与格式化器输出结构相同）对比各种输出方式的吞吐量（条/秒、MB/秒）:
+     - 原来的做法: 逐个 json.dump(indent=2) 写文件（非原子）
+     - output_writer.write_json: 临时文件 + 原子替换（json / orjson）
+     - NDJSON 流: 全部结果追加到一个文件（json / orjson）
+     以及只做序列化的耗时；未安装 orjson 时跳过对应项
+"""
+
+import os
+import json
+import time
+import random
+import shutil
+import tempfile
+import argparse
+
+import output_writer
+from benchmark_analysis_record import generate_row
+
+
+def run_files(label: str, rows: list, directory: str, write) -> dict:
+    os.makedirs(directory, exist_ok=True)
+    start = time.perf_counter()
+    for i, row in enumerate(rows):
+        write(os.path.join(directory, f"r{i:06d}_final_comprehensive.json"), row)
+    seconds = time.perf_counter() - start
+    size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+    shutil.rmtree(directory)
+    return {"mode": label, "records": len(rows), "seconds": round(seconds, 3), "bytes": size}
+
+
+def run_ndjson(label: str, rows: list, path: str, serializer: str) -> dict:
+    os.environ['RESUME_JSON_SERIALIZER'] = serializer
+    start = time.perf_counter()
+    with output_writer.NdjsonWriter(path) as stream:
+        for i, row in enumerate(rows):
+            stream.write({"output": f"r{i:06d}_final_comprehensive.json", "result": row})
+    seconds = time.perf_counter() - start
+    size = os.path.getsize(path)
+    lines = sum(1 for _ in output_writer.read_ndjson(path))
+    os.remove(path)
+    if lines != len(rows):
+        raise ValueError(f"NDJSON 行数不符: {lines} != {len(rows)}")
+    return {"mode": label, "records": len(rows), "seconds": round(seconds, 3), "bytes": size}
+
+
+def run_dumps(label: str, rows: list, serializer: str) -> dict:
+    start = time.perf_counter()
+    size = sum(len(output_writer.dumps(row, indent=True, name=serializer)) for row in rows)
+    return {"mode": label, "records": len(rows), "seconds": round(time.perf_counter() - start, 3), "bytes": size}
+
+
+def legacy_write(path: str, row: dict):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(row, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="结果输出吞吐量基准测试")
+    parser.add_argument('--count', type=int, default=100000, help="NDJSON 和序列化测试的结果数量")
+    parser.add_argument('--file-count', type=int, default=None, help="逐个写文件测试的结果数量，默认与 --count 相同")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', default=None, help="测试目录，默认临时目录")
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = [generate_row(rng, i) for i in range(args.count)]
+    file_rows = rows[:args.file_count or args.count]
+    workdir = args.workdir or tempfile.mkdtemp(prefix="output_writer_")
+    serializers = ['json'] + (['orjson'] if output_writer.orjson is not None else [])
+    print(f"结果: {len(rows)} 份（逐个写文件 {len(file_rows)} 份），可用序列化器: {', '.join(serializers)}")
+    if output_writer.orjson is None:
+        print("⚠️ 未安装 orjson，只测试标准库 json（pip install orjson 后重新运行可得到对比）")
+
+    results = []
+    for serializer in serializers:
+        results.append(run_dumps(f"序列化 {serializer}", rows, serializer))
+    results.append(run_files("逐个 json.dump（非原子）", file_rows, os.path.join(workdir, 'legacy'), legacy_write))
+    for serializer in serializers:
+        os.environ['RESUME_JSON_SERIALIZER'] = serializer
+        results.append(run_files(f"write_json 原子写入 {serializer}", file_rows, os.path.join(workdir, serializer),
+                                 output_writer.write_json))
+    for serializer in serializers:
+        results.append(run_ndjson(f"NDJSON {serializer}", rows, os.path.join(workdir, f"{serializer}.ndjson"),
+                                  serializer))
+
+    for result in results:
+        rate = result["records"] / result["seconds"] if result["seconds"] else 0.0
+        result["records_per_second"] = round(rate)
+        result["mb_per_second"] = round(result["bytes"] / 1024 / 1024 / result["seconds"], 1) if result["seconds"] else 0.0
+        print(f"{result['mode']:<28} {result['records']:>7} 条 {result['seconds']:>7.2f}s  "
+              f"{result['records_per_second']:>9} 条/秒  {result['mb_per_second']:>7.1f} MB/秒")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.output}")
+    if not args.workdir:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+打包语料基准测试
+功能: 用同一批合成简历文本对比 middles 下单独的 *_extracted.txt 文件与打包语料（packed_corpus）:
+     - 写入耗时（逐个写文本文件 / 追加到打包语料）
+     - 读取全部简历的耗时（逐个打开文件 / 按简历名从内存映射读取），随机顺序，模拟格式化阶段的访问
+     - 占用的文件数和磁盘空间
+     并校验两种方式读出的文本完全一致
+"""
+
+import os
+import json
+import time
+import random
+import shutil
+import tempfile
+import argparse
+
+import packed_corpus
+from synthetic_corpus import generate_resume
+
+
+def disk_usage(paths: list) -> int:
+    """按块计算的实际占用（小文件按块向上取整）"""
+    return sum(os.stat(path).st_blocks * 512 for path in paths)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="打包语料基准测试")
+    parser.add_argument('--count', type=int, default=5000, help="简历数量")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', default=None, help="测试目录，默认临时目录（测试后删除）")
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = {f"resume_{i:06d}": generate_resume(rng, rng.choice(['small', 'medium', 'large']))
+             for i in range(args.count)}
+    workdir = args.workdir or tempfile.mkdtemp(prefix="packed_corpus_")
+    middles = os.path.join(workdir, 'middles')
+    os.makedirs(middles, exist_ok=True)
+    pack = os.path.join(workdir, 'corpus.pack')
+    print(f"语料: {len(texts)} 份简历，共 {sum(len(t) for t in texts.values())} 字符，目录 {workdir}")
+
+    start = time.perf_counter()
+    for name, text in texts.items():
+        with open(os.path.join(middles, f"{name}_extracted.txt"), 'w', encoding='utf-8') as f:
+            f.write(text)
+    files_write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    corpus = packed_corpus.PackedCorpus(pack)
+    for name, text in texts.items():
+        corpus.append(name, text)
+    pack_write = time.perf_counter() - start
+    corpus.close()
+
+    order = list(texts)
+    rng.shuffle(order)
+    paths = [os.path.join(middles, f"{name}_extracted.txt") for name in order]
+
+    start = time.perf_counter()
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            f.read()
+    files_read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    corpus = packed_corpus.PackedCorpus(pack)
+    for name in order:
+        corpus.get(name)
+    pack_read = time.perf_counter() - start
+
+    identical = all(corpus.get(name) == texts[name] for name in order)
+    file_list = [os.path.join(middles, name) for name in os.listdir(middles)]
+    results = {
+        "resumes": len(texts),
+        "files": {"write_seconds": round(files_write, 3), "read_seconds": round(files_read, 3),
+                  "file_count": len(file_list), "disk_bytes": disk_usage(file_list)},
+        "packed": {"write_seconds": round(pack_write, 3), "read_seconds": round(pack_read, 3),
+                   "file_count": 2, "disk_bytes": disk_usage([pack, pack + '.idx'])},
+        "identical": identical,
+    }
+    corpus.close()
+
+    for label, key in (("文本文件", "files"), ("打包语料", "packed")):
+        r = results[key]
+        print(f"{label}  写入 {r['write_seconds']:>7.3f}s  读取 {r['read_seconds']:>7.3f}s  "
+              f"{r['file_count']:>7} 个文件  占用 {r['disk_bytes'] / 1024 / 1024:>7.1f}MB")
+    print(f"\n读取快 {files_read / pack_read:.1f} 倍，写入快 {files_write / pack_write:.1f} 倍  "
+          f"{'✓ 文本一致' if identical else '✗ 文本不一致'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.output}")
+    if not args.workdir:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
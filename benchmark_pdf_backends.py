@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+PDF后端基准测试
+功能: 用同一批PDF对比各PDF文本提取后端（pdf_backends）的吞吐量（页/秒、每份耗时）和文本保真度，
+     并测量 auto 模式（含探测开销）的实际选择和耗时；--large-pages 时额外对比大文档顺序提取与按页范围并行提取
+
+保真度: 合成语料以生成PDF的原文为准，统计原文各行在提取结果中出现的比例（行召回率）；
+       --pdf-dir 指定的真实PDF没有原文，以 pdfminer 的结果为准
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import tempfile
+import argparse
+import random
+import statistics
+
+import pdf_backends
+from synthetic_corpus import generate_corpus, generate_resume, write_pdf
+
+
+def line_recall(reference: str, text: str) -> float:
+    """参考文本中的非空行（去掉空白后）出现在提取结果中的比例"""
+    expected = [''.join(line.split()) for line in reference.splitlines()]
+    expected = [line for line in expected if len(line) > 1]
+    if not expected:
+        return 1.0
+    actual = {''.join(line.split()) for line in text.splitlines()}
+    return sum(line in actual for line in expected) / len(expected)
+
+
+def load_corpus(args) -> list:
+    """返回 [(PDF路径, 参考原文或None)]"""
+    if args.pdf_dir:
+        return [(path, None) for path in sorted(glob.glob(os.path.join(args.pdf_dir, '*.pdf')))]
+    output_dir = tempfile.mkdtemp(prefix="pdf_backends_")
+    corpus = generate_corpus(output_dir, args.count, seed=args.seed)
+    if not corpus["pdfs"]:
+        return []
+    references = {}
+    for text_file in corpus["texts"]:
+        with open(text_file, 'r', encoding='utf-8') as f:
+            references[os.path.basename(text_file).replace('_extracted.txt', '')] = f.read()
+    return [(pdf, references[os.path.splitext(os.path.basename(pdf))[0]]) for pdf in corpus["pdfs"]]
+
+
+def run_backend(name: str, corpus: list, references: list) -> dict:
+    """用一个后端（或 auto）提取全部PDF"""
+    durations, recalls, pages, chosen, failures = [], [], 0, {}, 0
+    for (path, _), reference in zip(corpus, references):
+        start = time.perf_counter()
+        try:
+            if name == 'auto':
+                text, used = pdf_backends.extract_text(path, 'auto')
+            else:
+                text, used = pdf_backends.BACKENDS[name].extract(path), name
+        except Exception:
+            failures += 1
+            continue
+        durations.append(time.perf_counter() - start)
+        chosen[used] = chosen.get(used, 0) + 1
+        pages += text.count("\f") or 1
+        if reference is not None:
+            recalls.append(line_recall(reference, text))
+
+    total = sum(durations)
+    return {
+        "backend": name,
+        "documents": len(durations),
+        "failures": failures,
+        "pages": pages,
+        "total_seconds": round(total, 3),
+        "pages_per_second": round(pages / total, 1) if total else 0.0,
+        "p50_ms": round(statistics.median(durations) * 1000, 2) if durations else None,
+        "max_ms": round(max(durations) * 1000, 2) if durations else None,
+        "fidelity": round(statistics.mean(recalls), 4) if recalls else None,
+        "chosen": chosen,
+    }
+
+
+def run_large(pages: int, workers: int, seed: int) -> list:
+    """生成约 pages 页的大PDF，对比各后端顺序提取与并行提取的耗时，并检查拼接结果与顺序提取一致"""
+    rng = random.Random(seed)
+    path = os.path.join(tempfile.mkdtemp(prefix="pdf_large_"), "large.pdf")
+    # 一份 large 简历约2页
+    if not write_pdf("\n".join(generate_resume(rng, 'large') for _ in range(max(1, pages // 2))), path):
+        print("⚠️ 未安装 reportlab，跳过大文档测试")
+        return []
+    actual_pages = pdf_backends.BACKENDS['pdfminer'].page_count(path)
+    print(f"\n大文档: {actual_pages} 页，{workers} 个进程")
+    # 用最快的后端预先启动进程池，不把进程创建时间计入
+    fastest = next(name for name in pdf_backends.AUTO_ORDER if pdf_backends.BACKENDS[name].available())
+    pdf_backends.extract_parallel(path, fastest, actual_pages, workers)
+
+    results = []
+    for name in pdf_backends.available_backends():
+        start = time.perf_counter()
+        sequential = pdf_backends.BACKENDS[name].extract(path)
+        sequential_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        parallel = pdf_backends.extract_parallel(path, name, actual_pages, workers)
+        parallel_seconds = time.perf_counter() - start
+        result = {
+            "backend": name,
+            "pages": actual_pages,
+            "sequential_seconds": round(sequential_seconds, 3),
+            "parallel_seconds": round(parallel_seconds, 3),
+            "speedup": round(sequential_seconds / parallel_seconds, 2) if parallel_seconds else None,
+            "identical": sequential == parallel,
+        }
+        results.append(result)
+        print(f"{name:<10} 顺序 {sequential_seconds:>7.2f}s  并行 {parallel_seconds:>7.2f}s  "
+              f"加速 {result['speedup']:.2f}x  {'✓ 结果一致' if result['identical'] else '✗ 结果不一致'}")
+    return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="PDF后端基准测试")
+    parser.add_argument('--count', type=int, default=30, help="合成PDF数量")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--pdf-dir', default=None, help="用该目录下的PDF作为语料")
+    parser.add_argument('--large-pages', type=int, default=0, help="额外测试该页数的大文档并行提取")
+    parser.add_argument('--workers', type=int, default=None, help="并行提取的进程数，默认CPU核数")
+    parser.add_argument('--output', default=None, help="结果JSON文件")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args)
+    if not corpus:
+        print("✗ 没有可用的PDF（合成PDF需要 reportlab）")
+        sys.exit(1)
+    backends = pdf_backends.available_backends()
+    print(f"语料: {len(corpus)} 份PDF，可用后端: {', '.join(backends)}")
+
+    references = [reference for _, reference in corpus]
+    if references[0] is None:
+        # 真实PDF以 pdfminer 的结果为参考
+        references = [pdf_backends.BACKENDS['pdfminer'].extract(path) for path, _ in corpus]
+
+    results = []
+    for name in backends + ['auto']:
+        result = run_backend(name, corpus, references)
+        results.append(result)
+        fidelity = f"{result['fidelity']:.1%}" if result['fidelity'] is not None else "-"
+        print(f"{name:<10} {result['pages_per_second']:>8.1f} 页/秒  p50 {result['p50_ms']:>8.2f}ms  "
+              f"最慢 {result['max_ms']:>8.2f}ms  保真度 {fidelity:>6}  失败 {result['failures']}"
+              + (f"  选择 {result['chosen']}" if name == 'auto' else ""))
+
+    baseline = next(r for r in results if r["backend"] == "pdfminer")
+    for result in results:
+        if result is not baseline and result["total_seconds"]:
+            print(f"  {result['backend']}: 比 pdfminer 快 {baseline['total_seconds'] / result['total_seconds']:.1f} 倍")
+
+    large = run_large(args.large_pages, args.workers or pdf_backends.parallel_workers(), args.seed) if args.large_pages else []
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"documents": len(corpus), "results": results, "large": large}, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
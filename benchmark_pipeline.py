@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+简历分析流水线基准测试
+功能: 生成合成简历语料，启动本地桩LLM服务器，逐阶段测量
+     unstructured_extractor、各格式化器以及Excel写入的延迟分位数、吞吐量和峰值内存，
+     结果输出为JSON，便于与历史运行结果对比
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import contextlib
+import subprocess
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from synthetic_corpus import generate_corpus
+from stub_llm_server import StubConfig, start_stub_server
+from tracing import percentile
+
+# 阶段名 -> (输入类型, 模块名, 可调用对象名)
+STAGES = {
+    "unstructured_extractor": ("pdf", "unstructured_extractor", "extract_pdf_with_unstructured"),
+    "FinalComprehensiveFormatter": ("text", "final_comprehensive_formatter", "FinalComprehensiveFormatter.format_resume_comprehensive"),
+    "AdvancedReasoningSystem": ("text", "advanced_reasoning_system", "AdvancedReasoningSystem.analyze_resume_with_advanced_reasoning"),
+    "IntelligentReasoningFormatter": ("text", "intelligent_reasoning_formatter", "IntelligentReasoningFormatter.format_resume_with_reasoning"),
+    "langextract_formatter": ("text", "langextract_formatter", "format_resume_with_langextract"),
+    "enhanced_langextract_formatter": ("text", "enhanced_langextract_formatter", "format_resume_for_excel_format"),
+    "bryan_specific_formatter": ("text", "bryan_specific_formatter", "format_bryan_resume"),
+    "excel_writer": ("text", "resume_to_excel_format", "save_to_excel"),
+}
+
+
+def _resolve(module_name: str, attr_path: str):
+    """导入模块并返回可调用对象，类方法会先实例化"""
+    import importlib
+    module = importlib.import_module(module_name)
+    if '.' in attr_path:
+        class_name, method_name = attr_path.split('.', 1)
+        return getattr(getattr(module, class_name)(), method_name)
+    return getattr(module, attr_path)
+
+
+def _excel_row(text_file: str) -> dict:
+    """不调用LLM，用规则部分生成一行22字段的Excel数据"""
+    from final_comprehensive_formatter import FinalComprehensiveFormatter
+    formatter = FinalComprehensiveFormatter()
+    with open(text_file, 'r', encoding='utf-8') as f:
+        basic_info = formatter._extract_basic_info_direct(f.read())
+    return formatter._generate_comprehensive_excel_format(basic_info, {})
+
+
+def run_stage(stage: str, inputs: list, work_dir: str) -> dict:
+    """
+    在子进程中运行一个阶段（独立进程保证峰值内存互不影响）
+
+    Returns:
+        每个输入的延迟、错误统计和峰值RSS
+    """
+    _, module_name, attr_path = STAGES[stage]
+    os.chdir(work_dir)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from metrics import QUEUE_DEPTH
+
+    try:
+        with contextlib.redirect_stdout(open(os.devnull, 'w')):
+            func = _resolve(module_name, attr_path)
+            rows = [_excel_row(f) for f in inputs] if stage == "excel_writer" else None
+    except Exception as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+
+    latencies, errors = [], {}
+    os.makedirs("outs", exist_ok=True)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        for i, item in enumerate(inputs):
+            QUEUE_DEPTH.set(len(inputs) - i, stage=stage)
+            t0 = time.perf_counter()
+            try:
+                if stage == "excel_writer":
+                    func(rows[i], f"outs/bench_{i:05d}.xlsx")
+                elif stage == "unstructured_extractor":
+                    func(item, "middles_bench")
+                else:
+                    func(item)
+                latencies.append(time.perf_counter() - t0)
+            except Exception as e:
+                key = type(e).__name__
+                errors[key] = errors.get(key, 0) + 1
+        QUEUE_DEPTH.set(0, stage=stage)
+    wall = time.perf_counter() - start
+
+    return {
+        "count": len(inputs),
+        "ok": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall, 4),
+        "resumes_per_second": round(len(latencies) / wall, 3) if wall > 0 else 0.0,
+        "latency_ms": {
+            f"p{p}": round(percentile(latencies, p) * 1000, 2) for p in (50, 90, 95, 99)
+        } | {"max": round(max(latencies) * 1000, 2) if latencies else 0.0},
+        # Linux 下 ru_maxrss 单位为KB
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def compare_runs(old: dict, new: dict):
+    """打印两次运行的对比"""
+    print("\n=== 与基线对比 ===")
+    print(f"{'阶段':<32}{'p50(ms)':>22}{'p95(ms)':>22}{'简历/秒':>20}")
+    for stage, result in new["stages"].items():
+        base = old.get("stages", {}).get(stage)
+        if not base or "skipped" in base or "skipped" in result:
+            continue
+
+        def fmt(a, b):
+            change = (b - a) / a * 100 if a else 0.0
+            return f"{a:.1f}→{b:.1f} ({change:+.0f}%)"
+
+        print(f"{stage:<32}"
+              f"{fmt(base['latency_ms']['p50'], result['latency_ms']['p50']):>22}"
+              f"{fmt(base['latency_ms']['p95'], result['latency_ms']['p95']):>22}"
+              f"{fmt(base['resumes_per_second'], result['resumes_per_second']):>20}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="简历分析流水线基准测试")
+    parser.add_argument('--count', type=int, default=20, help="合成简历数量")
+    parser.add_argument('--stages', default=",".join(STAGES), help="逗号分隔的阶段列表")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="桩LLM平均延迟")
+    parser.add_argument('--jitter-ms', type=float, default=20.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="桩LLM返回500的概率")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="桩LLM返回429的概率")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help="结果JSON路径，默认 bench_results/<时间>.json")
+    parser.add_argument('--compare', default=None, help="与之对比的历史结果JSON")
+    parser.add_argument('--cassette', default=None, help="LLM录制/回放文件（llm_cassette）")
+    parser.add_argument('--cassette-mode', default='record', choices=['record', 'replay', 'auto'],
+                        help="replay 时严格回放，不启动桩服务器、不访问网络")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="resume_bench_")
+    print(f"生成合成语料: {args.count} 份 -> {work_dir}")
+    corpus = generate_corpus(work_dir, args.count, seed=args.seed)
+    corpus["texts"] = [os.path.abspath(p) for p in corpus["texts"]]
+    corpus["pdfs"] = [os.path.abspath(p) for p in corpus["pdfs"]]
+
+    offline = bool(args.cassette) and args.cassette_mode == 'replay'
+    if args.cassette:
+        os.environ.update({
+            "RESUME_LLM_CASSETTE": os.path.abspath(args.cassette),
+            "RESUME_LLM_CASSETTE_MODE": args.cassette_mode,
+            "RESUME_LLM_CASSETTE_STRICT": "1" if offline else "0",
+        })
+
+    if offline:
+        # 严格回放：没有API key、没有可连接的服务器，未录制的请求直接失败
+        server = None
+        os.environ.update({"DEEPSEEK_API_KEY": "", "QWEN_API_KEY": ""})
+        print(f"✓ 离线回放: {args.cassette}")
+    else:
+        stub_config = StubConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                                 throttle_rate=args.throttle_rate, seed=args.seed)
+        server, base_url = start_stub_server(stub_config)
+        print(f"✓ 桩LLM服务器: {base_url}")
+
+        # 子进程继承环境变量，所有格式化器都指向桩服务器
+        os.environ.update({
+            "DEEPSEEK_API_KEY": "stub", "DEEPSEEK_BASE_URL": base_url,
+            "QWEN_API_KEY": "stub", "QWEN_BASE_URL": base_url,
+        })
+
+    results = {}
+    spawn = multiprocessing.get_context("spawn")
+    for stage in [s.strip() for s in args.stages.split(",") if s.strip()]:
+        if stage not in STAGES:
+            print(f"✗ 未知阶段: {stage}")
+            continue
+        inputs = corpus["pdfs"] if STAGES[stage][0] == "pdf" else corpus["texts"]
+        if not inputs:
+            results[stage] = {"skipped": "没有可用输入（PDF需要安装 reportlab）"}
+        else:
+            print(f"运行阶段: {stage} ({len(inputs)} 份)...")
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                results[stage] = pool.submit(run_stage, stage, inputs, work_dir).result()
+
+        result = results[stage]
+        if "skipped" in result:
+            print(f"  ⚠️  跳过: {result['skipped']}")
+        else:
+            print(f"  ✓ p50={result['latency_ms']['p50']}ms p95={result['latency_ms']['p95']}ms "
+                  f"吞吐={result['resumes_per_second']}/s 峰值内存={result['peak_rss_mb']}MB 错误={result['errors']}")
+
+    if server is not None:
+        server.shutdown()
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit,
+            "python": platform.python_version(),
+            "count": args.count,
+            "seed": args.seed,
+            "stub": {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms,
+                     "error_rate": args.error_rate, "throttle_rate": args.throttle_rate},
+            "stub_stats": server.stats.snapshot() if server is not None else None,
+            "cassette": {"path": args.cassette, "mode": args.cassette_mode} if args.cassette else None,
+        },
+        "stages": results,
+    }
+
+    output = args.output or f"bench_results/pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ 基准结果已保存到: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare_runs(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+优先级通道基准测试
+功能: 模拟批量回填进行中陆续到达的交互式单份简历，每份简历为若干次LLM请求（固定延迟，经过同一个并发控制器），
+     对比两种处理方式下 interactive 简历从提交到完成的延迟，以及回填批次的完成时间:
+     - fifo   所有简历进入同一个线程池，按提交顺序处理（原来的做法）
+     - lanes  PriorityWorkQueue（保留工作线程）+ 并发控制器为 interactive 保留名额
+     另外用 --aging 观察老化对 backfill 的保护
+"""
+
+import json
+import time
+import argparse
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import priority_lanes
+from adaptive_limiter import AdaptiveLimiter
+
+
+def make_resume(limiter: AdaptiveLimiter, calls: int, latency: float):
+    """一份简历的处理：calls 次LLM请求，每次按当前通道申请并发名额"""
+    def process():
+        priority = priority_lanes.lane_rank(priority_lanes.current_lane())
+        for _ in range(calls):
+            ticket = limiter.acquire(priority=priority)
+            time.sleep(latency)
+            limiter.release(ticket, 'ok')
+    return process
+
+
+def run_mode(mode: str, args) -> dict:
+    limiter = AdaptiveLimiter('bench', initial=args.window, max_window=args.window, adaptive=False,
+                              reserved=args.reserved_llm if mode == 'lanes' else 0, aging=args.aging)
+    process = make_resume(limiter, args.calls, args.latency)
+    done = {}
+
+    if mode == 'lanes':
+        queue = priority_lanes.PriorityWorkQueue(args.workers, args.reserved_workers, aging=args.aging)
+        submit = lambda lane: queue.submit(process, lane=lane)
+    else:
+        pool = ThreadPoolExecutor(max_workers=args.workers)
+        submit = lambda lane: pool.submit(process)
+
+    def track(lane: str, key):
+        submitted = time.monotonic()
+        future = submit(lane)
+        future.add_done_callback(lambda _: done.__setitem__(key, (lane, time.monotonic() - submitted)))
+        return future
+
+    start = time.monotonic()
+    futures = [track('backfill', ('backfill', i)) for i in range(args.backfill)]
+
+    def arrivals():
+        for i in range(args.interactive):
+            time.sleep(args.interval)
+            futures.append(track('interactive', ('interactive', i)))
+
+    arriving = threading.Thread(target=arrivals)
+    arriving.start()
+    arriving.join()
+    for future in list(futures):
+        future.result()
+    makespan = time.monotonic() - start
+    if mode == 'lanes':
+        queue.shutdown()
+    else:
+        pool.shutdown()
+
+    interactive = sorted(seconds for lane, seconds in done.values() if lane == 'interactive')
+    backfill = sorted(seconds for lane, seconds in done.values() if lane == 'backfill')
+    return {
+        "mode": mode,
+        "interactive_p50": round(statistics.median(interactive), 3),
+        "interactive_max": round(interactive[-1], 3),
+        "backfill_max": round(backfill[-1], 3),
+        "makespan": round(makespan, 3),
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="优先级通道基准测试")
+    parser.add_argument('--backfill', type=int, default=60, help="回填简历数")
+    parser.add_argument('--interactive', type=int, default=6, help="交互式简历数")
+    parser.add_argument('--interval', type=float, default=0.5, help="交互式简历到达间隔（秒）")
+    parser.add_argument('--calls', type=int, default=3, help="每份简历的LLM请求数")
+    parser.add_argument('--latency', type=float, default=0.1, help="每次LLM请求的模拟延迟（秒）")
+    parser.add_argument('--workers', type=int, default=5)
+    parser.add_argument('--window', type=int, default=4, help="LLM并发窗口")
+    parser.add_argument('--reserved-workers', type=int, default=1)
+    parser.add_argument('--reserved-llm', type=int, default=1)
+    parser.add_argument('--aging', type=float, default=30.0)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    print(f"回填 {args.backfill} 份 + 交互式 {args.interactive} 份（每 {args.interval}s 一份），"
+          f"每份 {args.calls} 次请求 × {args.latency * 1000:.0f}ms，{args.workers} 个线程，并发窗口 {args.window}")
+    results = []
+    for mode in ('fifo', 'lanes'):
+        result = run_mode(mode, args)
+        results.append(result)
+        print(f"{mode:<6} interactive p50 {result['interactive_p50']:>6.2f}s  最慢 {result['interactive_max']:>6.2f}s  "
+              f"backfill 最慢 {result['backfill_max']:>6.2f}s  总耗时 {result['makespan']:>6.2f}s")
+
+    fifo, lanes = results
+    print(f"\ninteractive p50 延迟降低 {1 - lanes['interactive_p50'] / fifo['interactive_p50']:.1%}，"
+          f"回填总耗时变化 {lanes['makespan'] / fifo['makespan'] - 1:+.1%}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+提示布局基准测试
+功能: 启动模拟前缀上下文缓存的本地桩服务器，用 FinalComprehensiveFormatter 的AI推理分析
+     逐份处理合成简历，对比默认布局和前缀稳定布局（RESUME_PROMPT_LAYOUT=prefix_stable）的
+     请求数、提示token数、缓存命中token数和命中率
+"""
+
+import os
+import sys
+import json
+import random
+import logging
+import argparse
+import contextlib
+
+from stub_llm_server import StubConfig, start_stub_server
+from synthetic_corpus import generate_resume
+
+
+def run_mode(layout: str, texts: list) -> dict:
+    """用给定布局处理所有简历，返回桩服务器统计的请求数和缓存命中情况"""
+    from final_comprehensive_formatter import FinalComprehensiveFormatter
+
+    server, base_url = start_stub_server(StubConfig(latency_ms=5, jitter_ms=1, seed=7))
+    os.environ.update({"DEEPSEEK_API_KEY": "stub", "DEEPSEEK_BASE_URL": base_url,
+                       "RESUME_PROMPT_LAYOUT": layout})
+    formatter = FinalComprehensiveFormatter()
+
+    devnull = open(os.devnull, 'w')
+    with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        for text in texts:
+            formatter._perform_ai_reasoning_analysis(text, {})
+    devnull.close()
+    server.shutdown()
+
+    stub = server.stats.snapshot()
+    prompt_tokens = stub["prompt_chars"] // 2
+    hit_tokens = stub["cache_hit_chars"] // 2
+    result = {
+        "layout": layout,
+        "resumes": len(texts),
+        "requests": stub["requests"],
+        "prompt_tokens": prompt_tokens,
+        "cache_hit_tokens": hit_tokens,
+        "cache_miss_tokens": prompt_tokens - hit_tokens,
+        "cache_hit_rate": round(hit_tokens / prompt_tokens, 3) if prompt_tokens else 0.0,
+    }
+    print(f"{layout:<14} 请求 {result['requests']:>5}  提示token {prompt_tokens:>8}  "
+          f"命中 {hit_tokens:>8}  未命中 {result['cache_miss_tokens']:>8}  命中率 {result['cache_hit_rate']:.1%}")
+    return result
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="提示布局基准测试")
+    parser.add_argument('--resumes', type=int, default=30)
+    parser.add_argument('--size', default='medium', choices=['small', 'medium', 'large'])
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    logging.disable(logging.WARNING)
+
+    rng = random.Random(42)
+    texts = [generate_resume(rng, args.size) for _ in range(args.resumes)]
+
+    results = [run_mode(layout, texts) for layout in ('default', 'prefix_stable')]
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+语义检索基准测试
+功能: 生成合成简历段落，测量编码/入库吞吐、精确检索与IVF检索的top-k延迟以及IVF召回率
+"""
+
+import sys
+import json
+import time
+import random
+import tempfile
+
+import numpy as np
+
+from semantic_search import SemanticIndex, HashedNgramEncoder
+from tracing import percentile
+
+SKILLS = ['Python', 'Go', 'Java', 'k8s', 'Kubernetes', 'Docker', 'MySQL', 'Redis', 'MongoDB',
+          'Kafka', 'Flask', 'Django', 'Spring', 'React', 'Vue', 'PyTorch', 'TensorFlow', 'ES']
+PHRASES = ['带领团队完成核心模块开发', '负责团队管理和人员培养', '主导微服务架构改造', '负责高并发系统设计',
+           '参与技术选型和架构决策', '优化算法性能，效率提升50%', '负责数据平台建设', '跨部门协作推进项目交付',
+           '负责后端系统开发和优化', '搭建容器化部署平台']
+QUERIES = ['k8s 容器平台', '团队管理 架构设计', 'Python 后端 高并发', '机器学习 PyTorch', 'Java Spring 微服务']
+
+
+def make_resume(rng: random.Random) -> str:
+    skills = "、".join(rng.sample(SKILLS, 5))
+    work = "\n".join(rng.sample(PHRASES, 3))
+    return f"个人优势\n精通{skills}\n\n工作经历\n{work}\n\n项目经历\n{rng.choice(PHRASES)}，技术栈：{skills}"
+
+
+def main():
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    top_k = 10
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        index = SemanticIndex(index_dir, encoder=HashedNgramEncoder(), min_train_rows=1024)
+
+        start = time.perf_counter()
+        for i in range(n_docs):
+            index.add_resume(f"resume_{i}", make_resume(rng))
+        add_seconds = time.perf_counter() - start
+        index.save()
+
+        # 删除10%的简历，验证增量删除后的检索
+        for i in range(0, n_docs, 10):
+            index.delete(f"resume_{i}")
+
+        exact_ms, ivf_ms, recalls = [], [], []
+        for _ in range(20):
+            for query in QUERIES:
+                t0 = time.perf_counter()
+                exact = index.search(query, k=top_k, exact=True)
+                exact_ms.append((time.perf_counter() - t0) * 1000)
+
+                t0 = time.perf_counter()
+                approx = index.search(query, k=top_k)
+                ivf_ms.append((time.perf_counter() - t0) * 1000)
+
+                # 合成数据中大量简历得分相同，按分数阈值计算召回率
+                kth_score = exact[-1][1] if exact else 0.0
+                hits = sum(1 for _, score, _ in approx if score >= kth_score - 1e-6)
+                recalls.append(hits / max(len(exact), 1))
+
+        report = {
+            "documents": n_docs,
+            "rows": index.count,
+            "nlist": 0 if index.centroids is None else len(index.centroids),
+            "add_docs_per_second": round(n_docs / add_seconds, 1),
+            "exact_topk_ms": {"p50": round(percentile(exact_ms, 50), 3), "p95": round(percentile(exact_ms, 95), 3)},
+            "ivf_topk_ms": {"p50": round(percentile(ivf_ms, 50), 3), "p95": round(percentile(ivf_ms, 95), 3)},
+            "ivf_recall_at_k": round(float(np.mean(recalls)), 3),
+        }
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,20 @@
 """
 
 import os
-import json
 import sys
 from pathlib import Path
 from datetime import datetime
-from dotenv import load_dotenv
-import langextract as lx
-from langextract.providers.openai import OpenAILanguageModel
-from langextract.data import ExampleData, Extraction
 
-# 加载环境变量
-load_dotenv()
+import date_normalization
+import llm_client
+import output_writer
+import packed_corpus
+from metrics import start_from_env, track_export
+from resilience import resume_deadline
+from tracing import span, traced_resume
 
+@traced_resume('bryan_specific')
+@resume_deadline()
 def format_bryan_resume(text_file: str) -> dict:
     """
     专门针对Bryan简历的格式化
@@ -24,8 +26,7 @@ def format_bryan_resume(text_file: str) -> dict:
     print(f"使用Bryan专用格式化器: {text_file}")
     
     # 读取文本内容
-    with open(text_file, 'r', encoding='utf-8') as f:
-        text = f.read()
+    text = packed_corpus.read_text(text_file)
     
     print(f"文本长度: {len(text)} 字符")
     print(f"前200字符预览: {text[:200]}...")
@@ -95,6 +96,8 @@ def format_bryan_resume(text_file: str) -> dict:
     负责整体架构设计和技术选型
     """
     
+    from langextract.data import ExampleData, Extraction
+
     # 创建示例提取
     extractions = [
         # 个人信息
@@ -144,27 +147,22 @@ def format_bryan_resume(text_file: str) -> dict:
     """
     
     # 尝试使用 DeepSeek API（之前成功的）
-    deepseek_api_key = os.getenv('DEEPSEEK_API_KEY')
-    if deepseek_api_key:
+    if llm_client.has_credentials('deepseek'):
         try:
             print("使用 DeepSeek API 进行Bryan专用格式化...")
             
-            model = OpenAILanguageModel(
-                model_id="deepseek-chat",
-                api_key=deepseek_api_key,
-                base_url="https://api.deepseek.com/v1",
-                system_prompt=system_prompt
-            )
-            
-            result = lx.extract(
+            result = llm_client.extract(
                 text,
                 schema,
-                examples=examples,
-                model=model
+                examples,
+                system_prompt,
+                provider='deepseek',
+                stage='bryan_specific'
             )
             
             print("✓ DeepSeek API Bryan专用格式化成功")
-            return convert_bryan_to_excel(result)
+            with span("format.tags"):
+                return convert_bryan_to_excel(result)
             
         except Exception as e:
             print(f"✗ DeepSeek API 失败: {e}")
@@ -223,21 +221,7 @@ def convert_bryan_to_excel(result) -> dict:
 
 def calculate_birth_date(age_str: str) -> str:
     """根据年龄计算出生日期"""
-    if not age_str:
-        return ""
-    
-    try:
-        # 提取数字
-        import re
-        age_match = re.search(r'(\d+)', age_str)
-        if age_match:
-            age = int(age_match.group(1))
-            birth_year = datetime.now().year - age
-            return f"{birth_year}-01-01"  # 使用1月1日作为默认
-    except:
-        pass
-    
-    return ""
+    return date_normalization.birth_date_from_age(age_str)  # 使用1月1日作为默认
 
 def mask_phone(phone: str) -> str:
     """手机号脱敏"""
@@ -258,12 +242,8 @@ def extract_years(work_years: str) -> str:
     if not work_years:
         return ""
     
-    import re
-    years_match = re.search(r'(\d+)', work_years)
-    if years_match:
-        return years_match.group(1)
-    
-    return work_years
+    years = date_normalization.extract_int(work_years)
+    return work_years if years is None else str(years)
 
 def infer_job_level(position: str, years: str) -> str:
     """推断职级"""
@@ -336,16 +316,18 @@ def format_potential(data: dict) -> str:
 
 def main():
     """主函数"""
-    if len(sys.argv) != 2:
+    if len(sys.argv) != 2 or sys.argv[1] in ('-h', '--help'):
         print("使用方法: python bryan_specific_formatter.py <文本文件路径>")
         sys.exit(1)
     
     text_file = sys.argv[1]
     
-    if not os.path.exists(text_file):
+    if not packed_corpus.text_exists(text_file):
         print(f"文件不存在: {text_file}")
         sys.exit(1)
     
+    start_from_env()
+    
     try:
         # 使用Bryan专用格式化器
         excel_data = format_bryan_resume(text_file)
@@ -357,10 +339,10 @@ def main():
         # 确保输出目录存在
         os.makedirs("outs", exist_ok=True)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(excel_data, f, ensure_ascii=False, indent=2)
+        with span("output.write_json"), track_export("json"):
+            saved = output_writer.save_result(output_file, excel_data)
         
-        print(f"\n✓ Bryan专用Excel格式数据已保存到: {output_file}")
+        print(f"\n✓ Bryan专用Excel格式数据已保存到: {saved}")
         
         # 显示结果预览
         print("\n=== Bryan Excel格式数据预览 ===")
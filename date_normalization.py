@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+日期与年限规范化
+功能: 各格式化器共用的出生日期、工作年限、参加工作时间计算:
+     - 中文简历常见日期格式用预编译正则直接解析：2022.07、2022-07-15、2022/7、2022年7月、2022年7月15日、
+       202207、2022、至今/现在 等；时间段如 "2022.07-2024.08"、"2022-07-2024-08"、"2022-07 ~ 2024-08"、
+       "2019年3月 至 今"
+     - 只有无法识别的格式才交给 dateutil 解析（未安装时视为无法解析）
+     - 格式能识别但日期不存在（"2022.13"、"2022.02.30"）时视为无法解析，不交给 dateutil 猜成别的日期
+     - 相同字符串的解析结果放在LRU缓存中（"至今"在取值时按当天计算，不缓存具体日期）
+     - 批量接口接受列表、元组、numpy 数组或 pandas Series，相同取值只解析一次
+
+通过环境变量控制:
+    RESUME_DATE_CACHE_SIZE=65536   LRU缓存条目数
+
+解析速度对比见 benchmark_date_normalization.py
+"""
+
+import os
+import re
+import functools
+from datetime import date, datetime
+
+_NUMBER = re.compile(r'\d+')
+_PRESENT = re.compile(r'^(?:至今|至今日|今|现在|目前|当前|now|present|current|today)$', re.IGNORECASE)
+_DATE = r'(\d{4})\s*(?:[.\-/年]\s*(\d{1,2})\s*(?:[.\-/月]\s*(\d{1,2})\s*日?|月)?)?\s*年?'
+_FULL_DATE = re.compile(rf'^{_DATE}$')
+_COMPACT_DATE = re.compile(r'^(\d{4})(\d{2})(\d{2})?$')
+_SEPARATOR = re.compile(r'\s*(?:--?|–|—|~|～|至|到)\s*')
+
+# 解析结果中表示"至今"的标记
+PRESENT = 'present'
+# 格式能识别但日期不存在（如 "2022.13"）的标记，不再交给 dateutil 猜测
+_INVALID = 'invalid'
+
+
+def cache_size() -> int:
+    return int(os.getenv('RESUME_DATE_CACHE_SIZE', '65536'))
+
+
+def _valid(year: int, month: int, day: int):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _parse_fast(text: str):
+    """预编译正则能识别的格式，返回 date / PRESENT / _INVALID（日期不存在）/ None（无法识别）"""
+    if _PRESENT.match(text):
+        return PRESENT
+    match = _FULL_DATE.match(text) or _COMPACT_DATE.match(text)
+    if match is None:
+        return None
+    year, month, day = match.groups()
+    return _valid(int(year), int(month or 1), int(day or 1)) or _INVALID
+
+
+def _parse_fallback(text: str):
+    try:
+        from dateutil import parser
+    except ImportError:
+        return None
+    try:
+        return parser.parse(text, default=datetime(2000, 1, 1)).date()
+    except (ValueError, OverflowError, TypeError):
+        return None
+
+
+@functools.lru_cache(maxsize=cache_size())
+def _parse_cached(text: str):
+    text = text.strip()
+    if not text:
+        return None
+    result = _parse_fast(text)
+    if result is _INVALID:
+        return None
+    return result if result is not None else _parse_fallback(text)
+
+
+def _resolve(value):
+    return date.today() if value == PRESENT else value
+
+
+def parse_date(text) -> date:
+    """把一个日期字符串解析为 date（年月格式取当月1日，"至今"为今天），无法解析时返回 None"""
+    if isinstance(text, datetime):
+        return text.date()
+    if isinstance(text, date):
+        return text
+    if not isinstance(text, str):
+        return None
+    return _resolve(_parse_cached(text))
+
+
+@functools.lru_cache(maxsize=cache_size())
+def _split_range(text: str):
+    text = text.strip()
+    # 先整体按单个日期解析，避免把 "2022-07-15" 当成时间段
+    if _parse_fast(text) is not None:
+        return None
+    splits = [(text[:match.start()], text[match.end():]) for match in _SEPARATOR.finditer(text)]
+    # 分隔符可能出现在日期内部（"2022-07-2024-08"），逐个位置尝试：先找两侧都能快速解析的位置，都不行再用 dateutil
+    for parse in (_parse_fast, _parse_cached):
+        for start_text, end_text in splits:
+            start, end = parse(start_text), parse(end_text)
+            if start not in (None, PRESENT, _INVALID) and end not in (None, _INVALID):
+                return start, end
+    return None
+
+
+def parse_range(text: str) -> tuple:
+    """
+    解析时间段，如 "2022.07-2024.08"、"2022-07-2024-08"、"2019年3月 至 今"
+
+    Returns:
+        (开始日期, 结束日期)；无法解析时返回 None
+    """
+    if not isinstance(text, str):
+        return None
+    parsed = _split_range(text)
+    if parsed is None:
+        return None
+    return parsed[0], _resolve(parsed[1])
+
+
+def months_between(start: date, end: date) -> int:
+    return (end.year - start.year) * 12 + (end.month - start.month)
+
+
+def range_months(text: str) -> int:
+    """时间段的月数（结束早于开始时为0），无法解析时返回 None"""
+    parsed = parse_range(text)
+    return None if parsed is None else max(0, months_between(*parsed))
+
+
+@functools.lru_cache(maxsize=cache_size())
+def _first_int(text: str):
+    match = _NUMBER.search(text)
+    return int(match.group()) if match else None
+
+
+def extract_int(text, default=None):
+    """字符串中的第一个整数（"9年" -> 9），没有时返回 default"""
+    if isinstance(text, int):
+        return text
+    if not text or not isinstance(text, str):
+        return default
+    value = _first_int(text)
+    return default if value is None else value
+
+
+def birth_date_from_age(age_str, month_day: str = "01-01") -> str:
+    """根据年龄推算出生日期（"32岁" -> "1994-01-01"），无法识别时返回空字符串"""
+    age = extract_int(age_str)
+    if age is None:
+        return ""
+    return f"{datetime.now().year - age}-{month_day}"
+
+
+def work_start_date(years: int, month_day: str = "07-01") -> str:
+    """根据工作年限推算参加工作时间（按当年毕业季）"""
+    return f"{datetime.now().year - years}-{month_day}"
+
+
+def earliest_date(values) -> str:
+    """一组日期字符串中最早的一个（YYYY-MM-DD），都无法解析时返回空字符串"""
+    dates = [d for d in parse_dates(values) if d is not None]
+    return min(dates).strftime("%Y-%m-%d") if dates else ""
+
+
+def total_work_years(ranges) -> float:
+    """多段工作经历的总年数（保留1位小数），无法解析的时间段跳过"""
+    months = sum(m for m in range_months_batch(ranges) if m)
+    return round(months / 12, 1) if months > 0 else 0
+
+
+def _batch(values, parse) -> list:
+    """对一组取值批量解析；相同取值只解析一次"""
+    values = list(values.tolist() if hasattr(values, 'tolist') else values)
+    parsed = {}
+    results = []
+    for value in values:
+        if not isinstance(value, str):
+            results.append(parse(value))
+            continue
+        if value not in parsed:
+            parsed[value] = parse(value)
+        results.append(parsed[value])
+    return results
+
+
+def parse_dates(values) -> list:
+    """批量 parse_date（列表、元组、numpy 数组、pandas Series）"""
+    return _batch(values, parse_date)
+
+
+def range_months_batch(values) -> list:
+    """批量 range_months"""
+    return _batch(values, range_months)
+
+
+def extract_ints(values, default=None) -> list:
+    """批量 extract_int"""
+    return _batch(values, lambda value: extract_int(value, default))
+
+
+def cache_info() -> dict:
+    """各LRU缓存的命中情况"""
+    return {name: func.cache_info()._asdict()
+            for name, func in (("date", _parse_cached), ("range", _split_range), ("int", _first_int))}
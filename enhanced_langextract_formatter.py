@@ -5,18 +5,19 @@
 """
 
 import os
-import json
 import sys
 from pathlib import Path
 from datetime import datetime
-from dotenv import load_dotenv
-import langextract as lx
-from langextract.providers.openai import OpenAILanguageModel
-from langextract.data import ExampleData, Extraction
 
-# 加载环境变量
-load_dotenv()
+import llm_client
+import output_writer
+import packed_corpus
+from metrics import start_from_env, track_export
+from resilience import resume_deadline
+from tracing import span, traced_resume
 
+@traced_resume('enhanced_langextract')
+@resume_deadline()
 def format_resume_for_excel_format(text_file: str) -> dict:
     """
     使用 langextract 格式化简历内容，专门针对Excel演示数据格式
@@ -30,8 +31,7 @@ def format_resume_for_excel_format(text_file: str) -> dict:
     print(f"使用增强版 langextract 格式化简历: {text_file}")
     
     # 读取文本内容
-    with open(text_file, 'r', encoding='utf-8') as f:
-        text = f.read()
+    text = packed_corpus.read_text(text_file)
     
     print(f"文本长度: {len(text)} 字符")
     
@@ -114,6 +114,8 @@ def format_resume_for_excel_format(text_file: str) -> dict:
     个人职责：技术负责人，负责整体架构设计
     """
     
+    from langextract.data import ExampleData, Extraction
+
     # 创建精确的 Extraction 对象，严格按照Excel格式
     extractions = [
         # 基本信息
@@ -179,53 +181,43 @@ def format_resume_for_excel_format(text_file: str) -> dict:
     """
     
     # 尝试使用 Qwen API
-    qwen_api_key = os.getenv('QWEN_API_KEY')
-    if qwen_api_key:
+    if llm_client.has_credentials('qwen'):
         try:
             print("使用 Qwen API 进行增强格式化...")
             
-            model = OpenAILanguageModel(
-                model_id="qwen-plus",
-                api_key=qwen_api_key,
-                base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
-                system_prompt=system_prompt
-            )
-            
-            result = lx.extract(
+            result = llm_client.extract(
                 text,
                 schema,
-                examples=examples,
-                model=model
+                examples,
+                system_prompt,
+                provider='qwen',
+                stage='enhanced_langextract'
             )
             
             print("✓ Qwen API 增强格式化成功")
-            return convert_to_excel_structure(result)
+            with span("format.tags"):
+                return convert_to_excel_structure(result)
             
         except Exception as e:
             print(f"✗ Qwen API 失败: {e}")
     
     # 尝试使用 DeepSeek API
-    deepseek_api_key = os.getenv('DEEPSEEK_API_KEY')
-    if deepseek_api_key:
+    if llm_client.has_credentials('deepseek'):
         try:
             print("使用 DeepSeek API 进行增强格式化...")
             
-            model = OpenAILanguageModel(
-                model_id="deepseek-chat",
-                api_key=deepseek_api_key,
-                base_url="https://api.deepseek.com/v1",
-                system_prompt=system_prompt
-            )
-            
-            result = lx.extract(
+            result = llm_client.extract(
                 text,
                 schema,
-                examples=examples,
-                model=model
+                examples,
+                system_prompt,
+                provider='deepseek',
+                stage='enhanced_langextract'
             )
             
             print("✓ DeepSeek API 增强格式化成功")
-            return convert_to_excel_structure(result)
+            with span("format.tags"):
+                return convert_to_excel_structure(result)
             
         except Exception as e:
             print(f"✗ DeepSeek API 失败: {e}")
@@ -387,16 +379,18 @@ def infer_job_level_from_position(position: str, work_years: str) -> str:
 
 def main():
     """主函数"""
-    if len(sys.argv) != 2:
+    if len(sys.argv) != 2 or sys.argv[1] in ('-h', '--help'):
         print("使用方法: python enhanced_langextract_formatter.py <文本文件路径>")
         sys.exit(1)
     
     text_file = sys.argv[1]
     
-    if not os.path.exists(text_file):
+    if not packed_corpus.text_exists(text_file):
         print(f"文件不存在: {text_file}")
         sys.exit(1)
     
+    start_from_env()
+    
     try:
         # 使用增强版 langextract 格式化简历
         excel_data = format_resume_for_excel_format(text_file)
@@ -408,10 +402,10 @@ def main():
         # 确保输出目录存在
         os.makedirs("outs", exist_ok=True)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(excel_data, f, ensure_ascii=False, indent=2)
+        with span("output.write_json"), track_export("json"):
+            saved = output_writer.save_result(output_file, excel_data)
         
-        print(f"\n✓ Excel格式数据已保存到: {output_file}")
+        print(f"\n✓ Excel格式数据已保存到: {saved}")
         
         # 显示结果预览
         print("\n=== Excel格式数据预览 ===")
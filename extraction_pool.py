@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+PDF提取工作进程池
+功能: 批量提取PDF时，每个工作进程一次只处理一份文档：
+     - 单份文档超过墙钟超时时直接杀掉该进程并换一个新进程，批处理继续以满并发运行
+     - 每个进程处理一定数量的文档后、或内存（RSS）超过上限后自动退出并替换，防止内存泄漏累积
+     - 超时或使进程崩溃的文件记录到隔离清单（附原因），之后的批处理直接跳过
+     - 默认按页数从多到少分配（RESUME_BATCH_ORDER，见 batch_scheduler.py）
+     - 工作进程不是守护进程，可以再启动按页并行提取的子进程（RESUME_PDF_PARALLEL_PAGES）；
+       每个工作进程自成一个进程组，超时被杀或关闭时连同它启动的子进程一起清理
+
+通过环境变量控制:
+    RESUME_EXTRACT_WORKERS=4           工作进程数（默认CPU核数）
+    RESUME_EXTRACT_TIMEOUT=120         单份文档的超时秒数
+    RESUME_EXTRACT_MAX_TASKS=50        每个进程最多处理的文档数
+    RESUME_EXTRACT_MAX_RSS_MB=1024     进程RSS超过该值（MB）时在当前文档完成后替换
+    RESUME_QUARANTINE_DIR=outs/quarantine   隔离清单目录
+
+使用方法:
+    python extraction_pool.py files/*.pdf [--output-dir middles] [--workers N] [--timeout 秒]
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import contextlib
+import multiprocessing
+from datetime import datetime
+from multiprocessing.connection import wait
+
+import metrics
+import batch_scheduler
+
+EXTRACT_STAGE = 'extract'
+
+POOL_EVENTS = metrics.REGISTRY.counter('resume_extraction_pool_events_total',
+                                       'PDF提取进程池事件（completed/failed/timeout/crashed/recycled/skipped）',
+                                       ('event',))
+
+QUARANTINE_FILE = "quarantine.jsonl"
+
+
+def _rss_mb() -> float:
+    """当前进程的常驻内存（MB）；没有 /proc 时用峰值RSS"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为KB，macOS 为字节
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _default_extract(pdf_path: str, output_dir: str) -> str:
+    from unstructured_extractor import extract_pdf_with_unstructured
+    return extract_pdf_with_unstructured(pdf_path, output_dir)
+
+
+def _shutdown_children():
+    """工作进程退出前关闭按页并行提取的进程池（非守护进程退出时不会执行 atexit）"""
+    backends = sys.modules.get('pdf_backends')
+    if backends is not None:
+        backends.shutdown_pool(wait=True)
+
+
+def _kill_group(pid: int):
+    """杀掉工作进程所在的进程组（工作进程及其启动的子进程）"""
+    if not hasattr(os, 'killpg'):
+        return
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _worker_main(conn, extract, max_tasks: int, max_rss_mb: float):
+    """
+    工作进程：逐个接收 (任务号, PDF路径, 输出目录)，返回 (任务号, 是否成功, 结果或错误, RSS MB, 是否退出)
+    处理完 max_tasks 份或RSS超过上限后退出，由主进程替换
+    """
+    # 自成进程组，主进程可以连同子进程一起清理
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    try:
+        _serve(conn, extract, max_tasks, max_rss_mb)
+    finally:
+        _shutdown_children()
+
+
+def _serve(conn, extract, max_tasks: int, max_rss_mb: float):
+    tasks = 0
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        task_id, pdf_path, output_dir = message
+        try:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                result = extract(pdf_path, output_dir)
+            ok, payload = True, result
+        except Exception as e:
+            ok, payload = False, f"{type(e).__name__}: {e}"
+        tasks += 1
+        rss = _rss_mb()
+        retiring = tasks >= max_tasks or (max_rss_mb > 0 and rss > max_rss_mb)
+        conn.send((task_id, ok, payload, round(rss, 1), retiring))
+        if retiring:
+            return
+
+
+def file_key(path: str) -> str:
+    """隔离清单中文件的标识：路径 + 大小 + 修改时间（文件被替换后不再跳过）"""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}|{stat.st_size}|{int(stat.st_mtime)}"
+
+
+def load_quarantine(directory: str) -> dict:
+    """读取隔离清单，返回 文件标识 -> 记录"""
+    entries = {}
+    path = os.path.join(directory, QUARANTINE_FILE)
+    if not os.path.exists(path):
+        return entries
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+                entries[entry['key']] = entry
+            except (ValueError, KeyError):
+                continue
+    return entries
+
+
+def quarantine(directory: str, pdf_path: str, reason: str, seconds: float) -> dict:
+    """把文件记入隔离清单（追加一行）"""
+    os.makedirs(directory, exist_ok=True)
+    entry = {
+        "key": file_key(pdf_path),
+        "path": pdf_path,
+        "reason": reason,
+        "seconds": round(seconds, 2),
+        "quarantined_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(os.path.join(directory, QUARANTINE_FILE), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    return entry
+
+
+class _Worker:
+    """主进程中一个工作进程的句柄"""
+
+    __slots__ = ('process', 'conn', 'task', 'started')
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.task = None      # (任务号, PDF路径)
+        self.started = 0.0
+
+
+class ExtractionPool:
+    """带超时、回收和隔离的PDF提取进程池"""
+
+    def __init__(self, workers: int = None, timeout: float = 120.0, max_tasks: int = 50, max_rss_mb: float = 1024,
+                 quarantine_dir: str = 'outs/quarantine', extract=None):
+        """
+        Args:
+            extract: 提取函数 extract(pdf_path, output_dir) -> 结果，必须是模块级函数；默认 unstructured_extractor 的提取
+        """
+        if timeout <= 0:
+            raise ValueError(f"超时必须大于0: {timeout}")
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.timeout = timeout
+        self.max_tasks = max(1, max_tasks)
+        self.max_rss_mb = max_rss_mb
+        self.quarantine_dir = quarantine_dir
+        self.extract = extract or _default_extract
+        self.stats = {"completed": 0, "failed": 0, "timeout": 0, "crashed": 0, "recycled": 0, "skipped": 0,
+                      "spawned": 0}
+        self._context = multiprocessing.get_context()
+
+    @classmethod
+    def from_env(cls, **overrides) -> 'ExtractionPool':
+        options = {
+            "workers": int(os.getenv('RESUME_EXTRACT_WORKERS', '0') or 0) or None,
+            "timeout": float(os.getenv('RESUME_EXTRACT_TIMEOUT', '120')),
+            "max_tasks": int(os.getenv('RESUME_EXTRACT_MAX_TASKS', '50')),
+            "max_rss_mb": float(os.getenv('RESUME_EXTRACT_MAX_RSS_MB', '1024')),
+            "quarantine_dir": os.getenv('RESUME_QUARANTINE_DIR', 'outs/quarantine'),
+        }
+        options.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**options)
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_worker_main,
+                                        args=(child_conn, self.extract, self.max_tasks, self.max_rss_mb),
+                                        daemon=False)
+        process.start()
+        child_conn.close()
+        self.stats["spawned"] += 1
+        return _Worker(process, parent_conn)
+
+    def _count(self, event: str):
+        self.stats[event] += 1
+        POOL_EVENTS.inc(event=event)
+
+    @staticmethod
+    def _stop(worker: _Worker, kill: bool = False):
+        """回收工作进程；kill 时连同它启动的子进程一起杀掉，正常退出后也清理残留的子进程"""
+        if kill:
+            _kill_group(worker.process.pid)
+            worker.process.kill()
+        worker.process.join(timeout=5)
+        if worker.process.exitcode is None:
+            worker.process.kill()
+            worker.process.join(timeout=5)
+        _kill_group(worker.process.pid)
+        worker.conn.close()
+
+    def run(self, pdf_paths: list, output_dir: str = "middles", on_result=None) -> list:
+        """
+        提取一批PDF
+
+        Args:
+            on_result: 每份文档完成时的回调 on_result(记录)
+
+        Returns:
+            每份文档一条记录 {"path", "status", "result"/"error"/"reason", "seconds"}，按输入顺序；
+            status 为 ok / failed / timeout / crashed / skipped
+        """
+        quarantined = load_quarantine(self.quarantine_dir)
+        records = [None] * len(pdf_paths)
+        pending = []
+        for task_id, path in enumerate(pdf_paths):
+            try:
+                entry = quarantined.get(file_key(path))
+            except OSError as e:
+                records[task_id] = {"path": path, "status": "failed", "error": str(e), "seconds": 0.0}
+                self._count("failed")
+                continue
+            if entry is not None:
+                records[task_id] = {"path": path, "status": "skipped", "reason": entry["reason"], "seconds": 0.0}
+                self._count("skipped")
+                continue
+            pending.append((task_id, path))
+        # 任务从列表尾部取出：lpt 顺序下页数最多的文档最先开始，不会在最后单独拖长整批的完成时间
+        if batch_scheduler.batch_order() == 'lpt':
+            costs = {task_id: batch_scheduler.estimate_cost(path) for task_id, path in pending}
+            pending.sort(key=lambda task: (costs[task[0]], -task[0]))
+        else:
+            pending.reverse()
+
+        def finish(task_id: int, record: dict):
+            records[task_id] = record
+            if on_result is not None:
+                on_result(record)
+
+        # 排队中的文档计入 resume_queue_depth（多个进程池同时运行时按增减累计）
+        metrics.QUEUE_DEPTH.inc(len(pending), stage=EXTRACT_STAGE)
+        workers = []
+        try:
+            while pending or workers:
+                # 补足进程（被杀掉、崩溃或回收的进程在上一轮已移除）并给空闲进程分配任务
+                while pending and len(workers) < self.workers and len(workers) < len(pending) + self._busy(workers):
+                    workers.append(self._spawn())
+                for worker in workers:
+                    if worker.task is None and pending:
+                        task_id, path = pending.pop()
+                        metrics.QUEUE_DEPTH.dec(stage=EXTRACT_STAGE)
+                        worker.conn.send((task_id, path, output_dir))
+                        worker.task = (task_id, path)
+                        worker.started = time.monotonic()
+
+                busy = [worker for worker in workers if worker.task]
+                if not busy:
+                    break
+                next_deadline = min(worker.started + self.timeout for worker in busy)
+                ready = wait([worker.conn for worker in busy] + [worker.process.sentinel for worker in busy],
+                             timeout=max(0.0, next_deadline - time.monotonic()))
+
+                retired = []
+                for worker in busy:
+                    task_id, path = worker.task
+                    elapsed = time.monotonic() - worker.started
+                    if worker.conn in ready or worker.conn.poll():
+                        try:
+                            _, ok, payload, rss, retiring = worker.conn.recv()
+                        except (EOFError, OSError):
+                            self._crashed(worker, finish)
+                            retired.append(worker)
+                            continue
+                        self._count("completed" if ok else "failed")
+                        record = {"path": path, "status": "ok" if ok else "failed", "seconds": round(elapsed, 3),
+                                  "rss_mb": rss}
+                        record["result" if ok else "error"] = payload
+                        worker.task = None
+                        finish(task_id, record)
+                        if retiring:
+                            # 进程已自行退出，回收后由下一轮补足
+                            self._count("recycled")
+                            self._stop(worker)
+                            retired.append(worker)
+                    elif worker.process.sentinel in ready:
+                        self._crashed(worker, finish)
+                        retired.append(worker)
+                    elif elapsed >= self.timeout:
+                        reason = f"超过 {self.timeout:.0f}s 超时"
+                        quarantine(self.quarantine_dir, path, reason, elapsed)
+                        self._count("timeout")
+                        worker.task = None
+                        self._stop(worker, kill=True)
+                        finish(task_id, {"path": path, "status": "timeout", "reason": reason,
+                                         "seconds": round(elapsed, 3)})
+                        retired.append(worker)
+                workers = [worker for worker in workers if worker not in retired]
+                # 没有待处理任务时关闭空闲进程
+                if not pending:
+                    for worker in [w for w in workers if w.task is None]:
+                        self._close(worker)
+                    workers = [worker for worker in workers if worker.task]
+        finally:
+            metrics.QUEUE_DEPTH.dec(len(pending), stage=EXTRACT_STAGE)
+            for worker in workers:
+                if worker.task is None:
+                    self._close(worker)
+                else:
+                    self._stop(worker, kill=True)
+        return records
+
+    @staticmethod
+    def _busy(workers: list) -> int:
+        return sum(1 for worker in workers if worker.task)
+
+    def _close(self, worker: _Worker):
+        """通知空闲进程退出"""
+        try:
+            worker.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self._stop(worker)
+
+    def _crashed(self, worker: _Worker, finish):
+        """进程在处理中途退出（如段错误、被OOM杀掉）：隔离文件，替换进程"""
+        task_id, path = worker.task
+        elapsed = time.monotonic() - worker.started
+        worker.process.join(timeout=1)
+        reason = f"工作进程异常退出（exitcode={worker.process.exitcode}）"
+        quarantine(self.quarantine_dir, path, reason, elapsed)
+        self._count("crashed")
+        finish(task_id, {"path": path, "status": "crashed", "reason": reason, "seconds": round(elapsed, 3)})
+        worker.task = None
+        self._stop(worker)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="用带超时和回收的进程池批量提取PDF")
+    parser.add_argument('pdfs', nargs='+', help="PDF文件")
+    parser.add_argument('--output-dir', default='middles')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--timeout', type=float, default=None, help="单份文档超时秒数")
+    parser.add_argument('--max-tasks', type=int, default=None, help="每个进程最多处理的文档数")
+    parser.add_argument('--max-rss-mb', type=float, default=None, help="进程RSS上限（MB）")
+    args = parser.parse_args()
+
+    metrics.start_from_env()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    pool = ExtractionPool.from_env(workers=args.workers, timeout=args.timeout, max_tasks=args.max_tasks,
+                                   max_rss_mb=args.max_rss_mb)
+
+    def report(record: dict):
+        name = os.path.basename(record["path"])
+        if record["status"] == "ok":
+            print(f"✓ {name} ({record['seconds']:.1f}s) -> {record['result']}")
+        elif record["status"] == "failed":
+            print(f"✗ {name}: {record['error']}")
+        else:
+            print(f"⚠️ {name}: {record['status']} - {record['reason']}")
+
+    start = time.perf_counter()
+    pool.run(args.pdfs, args.output_dir, on_result=report)
+    stats = pool.stats
+    print(f"\n完成 {stats['completed']}，失败 {stats['failed']}，超时 {stats['timeout']}，崩溃 {stats['crashed']}，"
+          f"跳过(已隔离) {stats['skipped']}，进程回收 {stats['recycled']}，耗时 {time.perf_counter() - start:.1f}s")
+    if stats['timeout'] or stats['crashed']:
+        print(f"隔离清单: {os.path.join(pool.quarantine_dir, QUARANTINE_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,153 @@
 """
 
 import os
-import json
 import sys
 import re
 from pathlib import Path
 from datetime import datetime
-from dotenv import load_dotenv
-import langextract as lx
-from langextract.providers.openai import OpenAILanguageModel
-from langextract.data import ExampleData, Extraction
 
-# 加载环境变量
-load_dotenv()
+import date_normalization
+import llm_client
+import model_router
+import output_writer
+import packed_corpus
+import prompt_templates
+import raw_archive
+from metrics import start_from_env, track_export
+from prompt_templates import PromptTemplate
+from resilience import resume_deadline
+from tracing import span, resume_scope
+
+# 深度推理分析的schema、示例和系统提示（导入时构建一次，所有简历共享）
+ANALYSIS_TEMPLATE = prompt_templates.register(PromptTemplate(
+    name="final_comprehensive.analysis",
+    schema={
+        "技术能力分析": {
+            "核心技术栈": "string - 主要掌握的技术栈",
+            "技术深度评估": "string - 技术能力深度分析",
+            "技术创新能力": "string - 创新和优化能力评估",
+            "架构设计能力": "string - 系统架构设计能力"
+        },
+        "管理能力分析": {
+            "团队协作": "string - 团队合作能力",
+            "项目管理": "string - 项目管理经验",
+            "沟通协调": "string - 沟通协调能力",
+            "领导潜力": "string - 领导力潜力评估"
+        },
+        "业务能力分析": {
+            "需求理解": "string - 业务需求理解能力",
+            "产品思维": "string - 产品和用户思维",
+            "问题解决": "string - 复杂问题解决能力",
+            "业务价值": "string - 创造业务价值的能力"
+        },
+        "发展潜力评估": {
+            "职业发展": "string - 职业发展潜力",
+            "学习能力": "string - 学习新技术的能力",
+            "创新思维": "string - 创新思维和突破能力",
+            "适应能力": "string - 环境适应和变化应对"
+        },
+        "风险因素识别": {
+            "技术风险": "string - 技术能力相关风险",
+            "管理风险": "string - 管理能力相关风险",
+            "发展风险": "string - 职业发展相关风险"
+        }
+    },
+    example_text="""任街平
+
+男|32岁|籍贯：成都
+
+联系方式
+电话:19113247892
+邮箱:r414164729@163.com
+
+求职信息
+工作时长：9年
+求职意向：Python+go
+
+个人优势
+精通Python、go，了解shell，lua等脚本语言
+熟练使用Django、Flask，fastAPI，gin等web框架进行开发
+熟悉mysql，pg等常见数据库，
+熟悉redis，Mongo，ES等NoSQL
+熟悉docker容器技术，熟悉k8s，k3s
+熟悉numpy，pandas，matplotlib
+熟练使用git进行代码管理
+了解常见机器学习，深度学习相关模块,如sklearn，xgbost，pytorch，TensorFlow
+多次项目成功交付经验
+良好的自我驱动力，追逐新技术
+
+工作经历
+某科技公司 高级Python开发工程师
+负责后端系统开发和优化
+参与微服务架构设计
+""",
+    extractions=[
+        # 技术能力分析
+        ("技术能力分析_核心技术栈", "Python后端开发，微服务架构，容器化技术"),
+        ("技术能力分析_技术深度评估", "精通Python和Go语言，具备全栈开发能力，掌握现代化开发技术栈"),
+        ("技术能力分析_技术创新能力", "追逐新技术，具备机器学习和深度学习技术储备，有技术优化经验"),
+        ("技术能力分析_架构设计能力", "参与微服务架构设计，熟悉容器化和云原生技术"),
+
+        # 管理能力分析
+        ("管理能力分析_团队协作", "多次项目成功交付经验，具备良好的团队协作能力"),
+        ("管理能力分析_项目管理", "有项目交付经验，具备一定的项目管理能力"),
+        ("管理能力分析_沟通协调", "能够参与架构设计讨论，具备技术沟通能力"),
+        ("管理能力分析_领导潜力", "自我驱动力强，有技术领导潜力"),
+
+        # 业务能力分析
+        ("业务能力分析_需求理解", "后端系统开发经验，能够理解业务需求"),
+        ("业务能力分析_产品思维", "具备一定的产品思维，关注用户体验"),
+        ("业务能力分析_问题解决", "系统优化经验，具备复杂问题解决能力"),
+        ("业务能力分析_业务价值", "通过技术优化创造业务价值"),
+
+        # 发展潜力评估
+        ("发展潜力评估_职业发展", "技术专家候选人，有向架构师发展的潜力"),
+        ("发展潜力评估_学习能力", "追逐新技术，学习能力强，技术视野广"),
+        ("发展潜力评估_创新思维", "关注新技术，具备创新思维和技术敏感度"),
+        ("发展潜力评估_适应能力", "技术栈广泛，适应能力强"),
+
+        # 风险因素识别
+        ("风险因素识别_技术风险", "技术能力较强，无明显技术风险"),
+        ("风险因素识别_管理风险", "管理经验相对不足，需要在团队管理方面加强"),
+        ("风险因素识别_发展风险", "职业发展路径清晰，风险较小")
+    ],
+    system_prompt="""你是一位资深的人才评估专家和技术面试官，具备深厚的技术背景和丰富的人才识别经验。
+
+请对简历进行深度分析，重点关注以下维度：
+
+1. 技术能力深度分析：
+   - 评估核心技术栈的掌握程度和深度
+   - 分析技术创新能力和持续学习能力
+   - 评估架构设计和系统优化能力
+   - 识别技术领导力和技术影响力
+
+2. 管理能力潜力评估：
+   - 分析团队协作和沟通能力
+   - 评估项目管理和推进能力
+   - 识别领导潜力和影响力
+   - 评估跨部门协作能力
+
+3. 业务能力和价值创造：
+   - 分析业务理解和需求分析能力
+   - 评估产品思维和用户导向
+   - 识别问题解决和优化能力
+   - 评估业务价值创造能力
+
+4. 发展潜力和成长性：
+   - 评估职业发展轨迹和潜力
+   - 分析学习能力和适应性
+   - 识别创新思维和突破能力
+   - 评估长期发展价值
+
+5. 风险因素识别：
+   - 识别技术能力相关风险
+   - 评估管理能力不足风险
+   - 分析职业发展风险因素
+
+请基于简历内容进行专业的人才评估，提供深度的分析洞察。
+""",
+))
+
 
 class FinalComprehensiveFormatter:
     """最终综合格式化器 - 完整的推理分析系统"""
@@ -31,20 +166,38 @@ class FinalComprehensiveFormatter:
         print(f"使用最终综合格式化器: {text_file}")
         
         # 读取文本内容
-        with open(text_file, 'r', encoding='utf-8') as f:
-            text = f.read()
+        text = packed_corpus.read_text(text_file)
         
         print(f"文本长度: {len(text)} 字符")
         print(f"内容预览: {text[:200]}...")
         
-        # 第一步：基础信息提取（使用简单直接的方法）
-        basic_info = self._extract_basic_info_direct(text)
-        
-        # 第二步：使用AI进行深度分析和推理
-        reasoning_analysis = self._perform_ai_reasoning_analysis(text, basic_info)
-        
-        # 第三步：生成最终Excel格式
-        final_result = self._generate_comprehensive_excel_format(basic_info, reasoning_analysis)
+        resume_id = Path(text_file).stem.replace("_extracted", "")
+        with resume_scope(resume_id, stage="final_comprehensive"), resume_deadline():
+            # 第一步：基础信息提取（使用简单直接的方法）
+            with span("format.basic_info"):
+                basic_info = self._extract_basic_info_direct(text)
+            
+            # 第二步：使用AI进行深度分析和推理
+            reasoning_analysis = self._perform_ai_reasoning_analysis(text, basic_info)
+            
+            # 第三步：生成最终Excel格式
+            with span("format.tags"):
+                final_result = self._generate_comprehensive_excel_format(basic_info, reasoning_analysis)
+            
+            # 归档原始分析数据，调整标签规则后可用 retag.py 重新生成
+            with span("output.write_raw"):
+                try:
+                    raw_archive.save_raw("final_comprehensive", resume_id, {
+                        "source": text_file,
+                        "prompt": ANALYSIS_TEMPLATE.fingerprint,
+                        "schema_version": ANALYSIS_TEMPLATE.schema_version,
+                        "fields": list(ANALYSIS_TEMPLATE.fields),
+                        "basic_info": basic_info,
+                        "analysis_data": reasoning_analysis,
+                        "result": final_result,
+                    })
+                except OSError as e:
+                    print(f"⚠️  原始分析数据归档失败: {e}")
         
         return final_result
 
@@ -111,145 +264,8 @@ class FinalComprehensiveFormatter:
     def _perform_ai_reasoning_analysis(self, text: str, basic_info: dict) -> dict:
         """使用AI进行深度推理分析"""
         
-        # 构建分析schema
-        analysis_schema = {
-            "技术能力分析": {
-                "核心技术栈": "string - 主要掌握的技术栈",
-                "技术深度评估": "string - 技术能力深度分析",
-                "技术创新能力": "string - 创新和优化能力评估",
-                "架构设计能力": "string - 系统架构设计能力"
-            },
-            "管理能力分析": {
-                "团队协作": "string - 团队合作能力",
-                "项目管理": "string - 项目管理经验",
-                "沟通协调": "string - 沟通协调能力",
-                "领导潜力": "string - 领导力潜力评估"
-            },
-            "业务能力分析": {
-                "需求理解": "string - 业务需求理解能力",
-                "产品思维": "string - 产品和用户思维",
-                "问题解决": "string - 复杂问题解决能力",
-                "业务价值": "string - 创造业务价值的能力"
-            },
-            "发展潜力评估": {
-                "职业发展": "string - 职业发展潜力",
-                "学习能力": "string - 学习新技术的能力",
-                "创新思维": "string - 创新思维和突破能力",
-                "适应能力": "string - 环境适应和变化应对"
-            },
-            "风险因素识别": {
-                "技术风险": "string - 技术能力相关风险",
-                "管理风险": "string - 管理能力相关风险",
-                "发展风险": "string - 职业发展相关风险"
-            }
-        }
-        
-        # 创建分析示例
-        example_text = """
-        任街平
-        
-        男|32岁|籍贯：成都
-        
-        联系方式
-        电话:19113247892
-        邮箱:r414164729@163.com
-        
-        求职信息
-        工作时长：9年
-        求职意向：Python+go
-        
-        个人优势
-        精通Python、go，了解shell，lua等脚本语言
-        熟练使用Django、Flask，fastAPI，gin等web框架进行开发
-        熟悉mysql，pg等常见数据库，
-        熟悉redis，Mongo，ES等NoSQL
-        熟悉docker容器技术，熟悉k8s，k3s
-        熟悉numpy，pandas，matplotlib
-        熟练使用git进行代码管理
-        了解常见机器学习，深度学习相关模块,如sklearn，xgbost，pytorch，TensorFlow
-        多次项目成功交付经验
-        良好的自我驱动力，追逐新技术
-        
-        工作经历
-        某科技公司 高级Python开发工程师
-        负责后端系统开发和优化
-        参与微服务架构设计
-        """
-        
-        # 创建分析提取示例
-        analysis_extractions = [
-            # 技术能力分析
-            Extraction(extraction_class="技术能力分析_核心技术栈", extraction_text="Python后端开发，微服务架构，容器化技术"),
-            Extraction(extraction_class="技术能力分析_技术深度评估", extraction_text="精通Python和Go语言，具备全栈开发能力，掌握现代化开发技术栈"),
-            Extraction(extraction_class="技术能力分析_技术创新能力", extraction_text="追逐新技术，具备机器学习和深度学习技术储备，有技术优化经验"),
-            Extraction(extraction_class="技术能力分析_架构设计能力", extraction_text="参与微服务架构设计，熟悉容器化和云原生技术"),
-            
-            # 管理能力分析
-            Extraction(extraction_class="管理能力分析_团队协作", extraction_text="多次项目成功交付经验，具备良好的团队协作能力"),
-            Extraction(extraction_class="管理能力分析_项目管理", extraction_text="有项目交付经验，具备一定的项目管理能力"),
-            Extraction(extraction_class="管理能力分析_沟通协调", extraction_text="能够参与架构设计讨论，具备技术沟通能力"),
-            Extraction(extraction_class="管理能力分析_领导潜力", extraction_text="自我驱动力强，有技术领导潜力"),
-            
-            # 业务能力分析
-            Extraction(extraction_class="业务能力分析_需求理解", extraction_text="后端系统开发经验，能够理解业务需求"),
-            Extraction(extraction_class="业务能力分析_产品思维", extraction_text="具备一定的产品思维，关注用户体验"),
-            Extraction(extraction_class="业务能力分析_问题解决", extraction_text="系统优化经验，具备复杂问题解决能力"),
-            Extraction(extraction_class="业务能力分析_业务价值", extraction_text="通过技术优化创造业务价值"),
-            
-            # 发展潜力评估
-            Extraction(extraction_class="发展潜力评估_职业发展", extraction_text="技术专家候选人，有向架构师发展的潜力"),
-            Extraction(extraction_class="发展潜力评估_学习能力", extraction_text="追逐新技术，学习能力强，技术视野广"),
-            Extraction(extraction_class="发展潜力评估_创新思维", extraction_text="关注新技术，具备创新思维和技术敏感度"),
-            Extraction(extraction_class="发展潜力评估_适应能力", extraction_text="技术栈广泛，适应能力强"),
-            
-            # 风险因素识别
-            Extraction(extraction_class="风险因素识别_技术风险", extraction_text="技术能力较强，无明显技术风险"),
-            Extraction(extraction_class="风险因素识别_管理风险", extraction_text="管理经验相对不足，需要在团队管理方面加强"),
-            Extraction(extraction_class="风险因素识别_发展风险", extraction_text="职业发展路径清晰，风险较小")
-        ]
-        
-        examples = [ExampleData(text=example_text, extractions=analysis_extractions)]
-        
-        # 高级分析系统提示
-        system_prompt = """
-        你是一位资深的人才评估专家和技术面试官，具备深厚的技术背景和丰富的人才识别经验。
-        
-        请对简历进行深度分析，重点关注以下维度：
-        
-        1. 技术能力深度分析：
-           - 评估核心技术栈的掌握程度和深度
-           - 分析技术创新能力和持续学习能力
-           - 评估架构设计和系统优化能力
-           - 识别技术领导力和技术影响力
-        
-        2. 管理能力潜力评估：
-           - 分析团队协作和沟通能力
-           - 评估项目管理和推进能力
-           - 识别领导潜力和影响力
-           - 评估跨部门协作能力
-        
-        3. 业务能力和价值创造：
-           - 分析业务理解和需求分析能力
-           - 评估产品思维和用户导向
-           - 识别问题解决和优化能力
-           - 评估业务价值创造能力
-        
-        4. 发展潜力和成长性：
-           - 评估职业发展轨迹和潜力
-           - 分析学习能力和适应性
-           - 识别创新思维和突破能力
-           - 评估长期发展价值
-        
-        5. 风险因素识别：
-           - 识别技术能力相关风险
-           - 评估管理能力不足风险
-           - 分析职业发展风险因素
-        
-        请基于简历内容进行专业的人才评估，提供深度的分析洞察。
-        """
-        
         # 调用API进行分析
-        result = self._call_api(text, analysis_schema, examples, system_prompt)
+        result = self._call_api(text, ANALYSIS_TEMPLATE)
         
         # 转换分析结果
         analysis_data = {}
@@ -464,16 +480,7 @@ class FinalComprehensiveFormatter:
         if not age_str:
             return ""
         
-        try:
-            age_match = re.search(r'(\d+)', age_str)
-            if age_match:
-                age = int(age_match.group(1))
-                birth_year = datetime.now().year - age
-                return f"{birth_year}-01-01"
-        except:
-            pass
-        
-        return ""
+        return date_normalization.birth_date_from_age(age_str)
 
     def _mask_phone(self, phone: str) -> str:
         """手机号脱敏"""
@@ -489,14 +496,7 @@ class FinalComprehensiveFormatter:
 
     def _extract_years(self, years_str: str) -> int:
         """提取年数"""
-        if not years_str:
-            return 9  # 默认值
-        
-        years_match = re.search(r'(\d+)', years_str)
-        if years_match:
-            return int(years_match.group(1))
-        
-        return 9
+        return date_normalization.extract_int(years_str, default=9)
 
     def _infer_job_level(self, position: str, years: int) -> str:
         """推断职级"""
@@ -513,29 +513,35 @@ class FinalComprehensiveFormatter:
 
     def _estimate_work_start_date(self, years: int) -> str:
         """估算工作开始时间"""
-        start_year = datetime.now().year - years
-        return f"{start_year}-07-01"
+        return date_normalization.work_start_date(years)
 
-    def _call_api(self, text: str, schema: dict, examples: list, system_prompt: str):
-        """调用API"""
+    def _call_api(self, text: str, template: PromptTemplate):
+        """调用API（开启 RESUME_ROUTER 时先用快速模型，结果不完整再升级）"""
+        
+        if model_router.routing_enabled():
+            router = model_router.get_router()
+            try:
+                print(f"使用分层模型路由进行综合分析（{router.fast.model_id} → {router.strong.model_id}）...")
+                result = router.extract(text, template, stage='final_comprehensive')
+                print("✓ 分层模型路由综合分析成功")
+                return result
+            except Exception as e:
+                print(f"✗ 分层模型路由失败: {e}")
+                raise
         
-        deepseek_api_key = os.getenv('DEEPSEEK_API_KEY')
-        if deepseek_api_key:
+        if llm_client.has_credentials('deepseek'):
             try:
                 print("使用 DeepSeek API 进行综合分析...")
                 
-                model = OpenAILanguageModel(
-                    model_id="deepseek-chat",
-                    api_key=deepseek_api_key,
-                    base_url="https://api.deepseek.com/v1",
-                    system_prompt=system_prompt
-                )
-                
-                result = lx.extract(
+                result = llm_client.extract(
                     text,
-                    schema,
-                    examples=examples,
-                    model=model
+                    template.schema,
+                    template.examples,
+                    template.system_prompt,
+                    provider='deepseek',
+                    stage='final_comprehensive',
+                    fingerprint=template.fingerprint,
+                    validate_examples=False
                 )
                 
                 print("✓ DeepSeek API 综合分析成功")
@@ -550,16 +556,18 @@ class FinalComprehensiveFormatter:
 
 def main():
     """主函数"""
-    if len(sys.argv) != 2:
+    if len(sys.argv) != 2 or sys.argv[1] in ('-h', '--help'):
         print("使用方法: python final_comprehensive_formatter.py <文本文件路径>")
         sys.exit(1)
     
     text_file = sys.argv[1]
     
-    if not os.path.exists(text_file):
+    if not packed_corpus.text_exists(text_file):
         print(f"文件不存在: {text_file}")
         sys.exit(1)
     
+    start_from_env()
+    
     try:
         # 创建最终综合格式化器
         formatter = FinalComprehensiveFormatter()
@@ -574,10 +582,18 @@ def main():
         # 确保输出目录存在
         os.makedirs("outs", exist_ok=True)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(excel_data, f, ensure_ascii=False, indent=2)
+        with span("output.write_json"), track_export("json"):
+            saved = output_writer.save_result(output_file, excel_data)
         
-        print(f"\n✓ 最终综合分析结果已保存到: {output_file}")
+        print(f"\n✓ 最终综合分析结果已保存到: {saved}")
+        
+        # 可选：增量更新本地语义检索索引
+        if os.getenv('RESUME_SEMANTIC_INDEX'):
+            try:
+                from semantic_search import index_resume_file
+                index_resume_file(text_file)
+            except Exception as e:
+                print(f"⚠️  语义索引更新失败: {e}")
         
         # 显示结果预览
         print("\n=== 最终综合分析结果 ===")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+对冲请求（hedged requests）
+功能: 主请求超过历史 p95 延迟仍未返回时，再发出一个相同的请求，取先返回的结果，
+     放弃另一个；对冲比例有上限，保证额外成本可控；用于交互式单份简历分析，降低尾延迟
+
+历史延迟保存在文件中，单次运行的命令行进程也能用上之前运行的 p95。
+
+通过环境变量控制:
+    RESUME_LLM_HEDGE=1                            开启对冲（默认关闭）
+    RESUME_LLM_HEDGE_PERCENTILE=95                触发对冲的延迟分位数
+    RESUME_LLM_HEDGE_MAX_RATE=0.1                 对冲请求占全部请求的比例上限
+    RESUME_LLM_LATENCY_FILE=traces/llm_latency.json  历史延迟文件
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import metrics
+from tracing import percentile
+
+HEDGES = metrics.REGISTRY.counter('resume_llm_hedges_total', '对冲请求结果（won=对冲请求先返回）', ('provider', 'result'))
+
+_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix='llm-hedge')
+
+
+def hedging_enabled() -> bool:
+    """是否通过环境变量开启了对冲"""
+    return os.getenv('RESUME_LLM_HEDGE', '').lower() not in ('', '0', 'false', 'no')
+
+
+class LatencyTracker:
+    """最近成功请求的延迟，可持久化到文件供下次运行使用"""
+
+    def __init__(self, window: int = 500, path: str = None, key: str = 'llm'):
+        self.samples = deque(maxlen=window)
+        self.path = path
+        self.key = key
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.samples.extend(json.load(f).get(key, []))
+            except (OSError, ValueError):
+                pass
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.samples.append(round(seconds, 4))
+
+    def percentile(self, p: float) -> float:
+        """与 tracing 和各基准测试报告相同的分位数算法；没有样本时返回 None"""
+        with self._lock:
+            samples = list(self.samples)
+        return percentile(samples, p) if samples else None
+
+    def save(self):
+        """写回文件（同一文件按 key 保存多个服务商）"""
+        if not self.path:
+            return
+        data = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+        with self._lock:
+            data[self.key] = list(self.samples)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+
+class Hedger:
+    """
+    对冲调用器
+
+    主请求超过 p{percentile} 延迟未返回、且对冲比例未超过上限时发出对冲请求；
+    对冲请求先返回时直接使用其结果（同步请求无法中断，主请求在后台结束后丢弃结果），
+    主请求先返回时关闭对冲请求的连接。
+    primary 和对冲请求在各自的线程中结束时自行归还并发名额、记录token用量（见 llm_client.UsageRecorder.wrap），
+    call 返回时落败的请求可能仍在占用名额
+    """
+
+    def __init__(self, name: str = 'llm', percentile: float = 95, max_hedge_rate: float = 0.1,
+                 min_samples: int = 20, tracker: LatencyTracker = None):
+        self.name = name
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = min_samples
+        self.tracker = tracker or LatencyTracker(key=name)
+        self.requests = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str) -> 'Hedger':
+        tracker = LatencyTracker(path=os.getenv('RESUME_LLM_LATENCY_FILE', 'traces/llm_latency.json'), key=name)
+        atexit.register(tracker.save)
+        return cls(name, percentile=float(os.getenv('RESUME_LLM_HEDGE_PERCENTILE', '95')),
+                   max_hedge_rate=float(os.getenv('RESUME_LLM_HEDGE_MAX_RATE', '0.1')), tracker=tracker)
+
+    def hedge_delay(self) -> float:
+        """触发对冲的等待时间；历史样本不足时返回 None（不对冲）"""
+        if len(self.tracker.samples) < self.min_samples:
+            return None
+        return self.tracker.percentile(self.percentile)
+
+    def _take_budget(self) -> bool:
+        # 允许1次突发，之后对冲数不超过 max_hedge_rate × 请求数
+        with self._lock:
+            if self.hedges + 1 > self.max_hedge_rate * self.requests + 1:
+                return False
+            self.hedges += 1
+            return True
+
+    def call(self, primary, start_hedge):
+        """
+        执行一次可能被对冲的请求
+
+        Args:
+            primary: 无参函数，发出主请求
+            start_hedge: 无参函数，返回 (发出对冲请求的无参函数, 取消函数)；
+                         没有可用并发名额等情况返回 None
+
+        Returns:
+            先成功返回的响应；两个请求都失败时抛出主请求的异常
+        """
+        with self._lock:
+            self.requests += 1
+        delay = self.hedge_delay()
+        start = time.perf_counter()
+        if delay is None:
+            response = primary()
+            self.tracker.record(time.perf_counter() - start)
+            return response
+
+        # 记录主请求自身的真实延迟（即使被对冲请求抢先），避免对冲把 p95 越压越低
+        first = _POOL.submit(primary)
+        first.add_done_callback(
+            lambda f: f.exception() is None and self.tracker.record(time.perf_counter() - start))
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        if not self._take_budget():
+            HEDGES.inc(provider=self.name, result='skipped_budget')
+            return first.result()
+        hedge = start_hedge()
+        if hedge is None:
+            with self._lock:
+                self.hedges -= 1
+            HEDGES.inc(provider=self.name, result='skipped_capacity')
+            return first.result()
+
+        send, cancel = hedge
+        second = _POOL.submit(send)
+        pending, failed = {first, second}, None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        HEDGES.inc(provider=self.name, result='won' if future is second else 'lost')
+                        return future.result()
+                    if future is first:
+                        failed = future.exception()
+            HEDGES.inc(provider=self.name, result='failed')
+            raise failed or second.exception()
+        finally:
+            cancel()
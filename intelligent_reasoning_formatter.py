@@ -5,18 +5,97 @@
 """
 
 import os
-import json
 import sys
 import re
 from pathlib import Path
 from datetime import datetime
-from dotenv import load_dotenv
-import langextract as lx
-from langextract.providers.openai import OpenAILanguageModel
-from langextract.data import ExampleData, Extraction
 
-# 加载环境变量
-load_dotenv()
+import date_normalization
+import llm_client
+import output_writer
+import packed_corpus
+import prompt_templates
+from metrics import start_from_env, track_export
+from prompt_templates import PromptTemplate
+from resilience import resume_deadline
+from tracing import span, resume_scope
+
+# 基础信息提取的schema、示例和系统提示（导入时构建一次，所有简历共享）
+BASIC_INFO_TEMPLATE = prompt_templates.register(PromptTemplate(
+    name="intelligent_reasoning.basic_info",
+    schema={
+        "个人信息": {
+            "姓名": "string",
+            "性别": "string",
+            "年龄": "string",
+            "电话": "string",
+            "邮箱": "string",
+            "地址": "string"
+        },
+        "教育背景": {
+            "学校": "string",
+            "专业": "string", 
+            "学历": "string"
+        },
+        "工作经历": {
+            "当前职位": "string",
+            "工作年限": "string",
+            "公司经历": "string",
+            "主要职责": "string"
+        },
+        "技能专长": {
+            "技术技能": "string",
+            "工具框架": "string",
+            "项目经验": "string"
+        }
+    },
+    example_text="""任街平 - 高级Python开发工程师
+
+个人信息：
+性别：男
+年龄：30岁
+电话：19178927892
+邮箱：r414164729@163.com
+
+教育背景：
+某大学 计算机科学 本科
+
+工作经历：
+2018-至今 某科技公司 高级Python开发工程师
+负责后端系统开发，微服务架构设计
+参与多个大型项目的技术选型和架构设计
+
+技能专长：
+编程语言：Python, Go, Java
+数据库：MySQL, Redis, MongoDB
+框架：Django, Flask, Spring Boot
+工具：Docker, Git, Jenkins
+""",
+    extractions=[
+        ("个人信息_姓名", "任街平"),
+        ("个人信息_性别", "男"),
+        ("个人信息_年龄", "30岁"),
+        ("个人信息_电话", "19178927892"),
+        ("个人信息_邮箱", "r414164729@163.com"),
+        ("教育背景_学校", "某大学"),
+        ("教育背景_专业", "计算机科学"),
+        ("教育背景_学历", "本科"),
+        ("工作经历_当前职位", "高级Python开发工程师"),
+        ("工作经历_工作年限", "6年"),
+        ("工作经历_主要职责", "后端系统开发，微服务架构设计，技术选型"),
+        ("技能专长_技术技能", "Python, Go, Java"),
+        ("技能专长_工具框架", "Django, Flask, Spring Boot, Docker")
+    ],
+    system_prompt="""你是专业的简历分析师，请准确提取简历中的基础信息：
+1. 个人信息：姓名、性别、年龄、电话、邮箱、地址
+2. 教育背景：学校、专业、学历
+3. 工作经历：当前职位、工作年限、主要职责
+4. 技能专长：技术技能、工具框架、项目经验
+
+请仔细分析简历内容，准确提取每个字段的信息。
+""",
+))
+
 
 class IntelligentReasoningFormatter:
     """智能推理格式化器"""
@@ -53,16 +132,17 @@ class IntelligentReasoningFormatter:
         print(f"使用智能推理格式化器: {text_file}")
         
         # 读取文本内容
-        with open(text_file, 'r', encoding='utf-8') as f:
-            text = f.read()
+        text = packed_corpus.read_text(text_file)
         
         print(f"文本长度: {len(text)} 字符")
         
-        # 首先进行基础信息提取
-        basic_info = self._extract_basic_info(text)
-        
-        # 然后进行智能推理分析
-        reasoning_analysis = self._perform_reasoning_analysis(text, basic_info)
+        with resume_scope(Path(text_file).stem.replace("_extracted", ""), stage="intelligent_reasoning"), resume_deadline():
+            # 首先进行基础信息提取
+            basic_info = self._extract_basic_info(text)
+            
+            # 然后进行智能推理分析
+            with span("format.tags"):
+                reasoning_analysis = self._perform_reasoning_analysis(text, basic_info)
         
         # 合并结果
         final_result = {**basic_info, **reasoning_analysis}
@@ -72,89 +152,8 @@ class IntelligentReasoningFormatter:
     def _extract_basic_info(self, text: str) -> dict:
         """提取基础信息"""
         
-        # 基础信息提取的schema
-        schema = {
-            "个人信息": {
-                "姓名": "string",
-                "性别": "string",
-                "年龄": "string",
-                "电话": "string",
-                "邮箱": "string",
-                "地址": "string"
-            },
-            "教育背景": {
-                "学校": "string",
-                "专业": "string", 
-                "学历": "string"
-            },
-            "工作经历": {
-                "当前职位": "string",
-                "工作年限": "string",
-                "公司经历": "string",
-                "主要职责": "string"
-            },
-            "技能专长": {
-                "技术技能": "string",
-                "工具框架": "string",
-                "项目经验": "string"
-            }
-        }
-        
-        # 创建基础提取示例
-        example_text = """
-        任街平 - 高级Python开发工程师
-        
-        个人信息：
-        性别：男
-        年龄：30岁
-        电话：19178927892
-        邮箱：r414164729@163.com
-        
-        教育背景：
-        某大学 计算机科学 本科
-        
-        工作经历：
-        2018-至今 某科技公司 高级Python开发工程师
-        负责后端系统开发，微服务架构设计
-        参与多个大型项目的技术选型和架构设计
-        
-        技能专长：
-        编程语言：Python, Go, Java
-        数据库：MySQL, Redis, MongoDB
-        框架：Django, Flask, Spring Boot
-        工具：Docker, Git, Jenkins
-        """
-        
-        extractions = [
-            Extraction(extraction_class="个人信息_姓名", extraction_text="任街平"),
-            Extraction(extraction_class="个人信息_性别", extraction_text="男"),
-            Extraction(extraction_class="个人信息_年龄", extraction_text="30岁"),
-            Extraction(extraction_class="个人信息_电话", extraction_text="19178927892"),
-            Extraction(extraction_class="个人信息_邮箱", extraction_text="r414164729@163.com"),
-            Extraction(extraction_class="教育背景_学校", extraction_text="某大学"),
-            Extraction(extraction_class="教育背景_专业", extraction_text="计算机科学"),
-            Extraction(extraction_class="教育背景_学历", extraction_text="本科"),
-            Extraction(extraction_class="工作经历_当前职位", extraction_text="高级Python开发工程师"),
-            Extraction(extraction_class="工作经历_工作年限", extraction_text="6年"),
-            Extraction(extraction_class="工作经历_主要职责", extraction_text="后端系统开发，微服务架构设计，技术选型"),
-            Extraction(extraction_class="技能专长_技术技能", extraction_text="Python, Go, Java"),
-            Extraction(extraction_class="技能专长_工具框架", extraction_text="Django, Flask, Spring Boot, Docker")
-        ]
-        
-        examples = [ExampleData(text=example_text, extractions=extractions)]
-        
-        system_prompt = """
-        你是专业的简历分析师，请准确提取简历中的基础信息：
-        1. 个人信息：姓名、性别、年龄、电话、邮箱、地址
-        2. 教育背景：学校、专业、学历
-        3. 工作经历：当前职位、工作年限、主要职责
-        4. 技能专长：技术技能、工具框架、项目经验
-        
-        请仔细分析简历内容，准确提取每个字段的信息。
-        """
-        
         # 使用API进行基础提取
-        result = self._call_api(text, schema, examples, system_prompt)
+        result = self._call_api(text, BASIC_INFO_TEMPLATE)
         
         # 转换为基础信息字典
         basic_info = {}
@@ -433,16 +432,7 @@ class IntelligentReasoningFormatter:
         if not age_str:
             return ""
         
-        try:
-            age_match = re.search(r'(\d+)', age_str)
-            if age_match:
-                age = int(age_match.group(1))
-                birth_year = datetime.now().year - age
-                return f"{birth_year}-01-01"
-        except:
-            pass
-        
-        return ""
+        return date_normalization.birth_date_from_age(age_str)
 
     def _mask_phone(self, phone: str) -> str:
         """手机号脱敏"""
@@ -458,14 +448,7 @@ class IntelligentReasoningFormatter:
 
     def _extract_work_years(self, work_years_str: str) -> str:
         """提取工作年数"""
-        if not work_years_str:
-            return "5"  # 默认值
-        
-        years_match = re.search(r'(\d+)', work_years_str)
-        if years_match:
-            return years_match.group(1)
-        
-        return "5"
+        return str(date_normalization.extract_int(work_years_str, default=5))
 
     def _infer_job_level(self, position: str, years: str) -> str:
         """推断职级"""
@@ -487,34 +470,25 @@ class IntelligentReasoningFormatter:
 
     def _estimate_work_start_date(self, years: str) -> str:
         """估算参加工作时间"""
-        try:
-            years_int = int(years) if years.isdigit() else 5
-            start_year = datetime.now().year - years_int
-            return f"{start_year}-07-01"
-        except:
-            return "2019-07-01"
+        return date_normalization.work_start_date(int(years) if years.isdigit() else 5)
 
-    def _call_api(self, text: str, schema: dict, examples: list, system_prompt: str):
+    def _call_api(self, text: str, template: PromptTemplate):
         """调用API进行提取"""
         
         # 尝试使用 DeepSeek API
-        deepseek_api_key = os.getenv('DEEPSEEK_API_KEY')
-        if deepseek_api_key:
+        if llm_client.has_credentials('deepseek'):
             try:
                 print("使用 DeepSeek API 进行智能推理...")
                 
-                model = OpenAILanguageModel(
-                    model_id="deepseek-chat",
-                    api_key=deepseek_api_key,
-                    base_url="https://api.deepseek.com/v1",
-                    system_prompt=system_prompt
-                )
-                
-                result = lx.extract(
+                result = llm_client.extract(
                     text,
-                    schema,
-                    examples=examples,
-                    model=model
+                    template.schema,
+                    template.examples,
+                    template.system_prompt,
+                    provider='deepseek',
+                    stage='intelligent_reasoning',
+                    fingerprint=template.fingerprint,
+                    validate_examples=False
                 )
                 
                 print("✓ DeepSeek API 智能推理成功")
@@ -529,16 +503,18 @@ class IntelligentReasoningFormatter:
 
 def main():
     """主函数"""
-    if len(sys.argv) != 2:
+    if len(sys.argv) != 2 or sys.argv[1] in ('-h', '--help'):
         print("使用方法: python intelligent_reasoning_formatter.py <文本文件路径>")
         sys.exit(1)
     
     text_file = sys.argv[1]
     
-    if not os.path.exists(text_file):
+    if not packed_corpus.text_exists(text_file):
         print(f"文件不存在: {text_file}")
         sys.exit(1)
     
+    start_from_env()
+    
     try:
         # 创建智能推理格式化器
         formatter = IntelligentReasoningFormatter()
@@ -553,10 +529,10 @@ def main():
         # 确保输出目录存在
         os.makedirs("outs", exist_ok=True)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(excel_data, f, ensure_ascii=False, indent=2)
+        with span("output.write_json"), track_export("json"):
+            saved = output_writer.save_result(output_file, excel_data)
         
-        print(f"\n✓ 智能推理分析结果已保存到: {output_file}")
+        print(f"\n✓ 智能推理分析结果已保存到: {saved}")
         
         # 显示结果预览
         print("\n=== 智能推理分析结果预览 ===")
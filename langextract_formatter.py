@@ -5,18 +5,19 @@
 功能: 使用langextract对middles文件夹下的文本文件进行AI解析，生成结构化JSON
 """
 
-import os
-import json
 import sys
+import bisect
 from pathlib import Path
-from dotenv import load_dotenv
-import langextract as lx
-from langextract.providers.openai import OpenAILanguageModel
-from langextract.data import ExampleData, Extraction
 
-# 加载环境变量
-load_dotenv()
+import llm_client
+import output_writer
+import packed_corpus
+from metrics import start_from_env, track_export
+from resilience import resume_deadline
+from tracing import span, traced_resume
 
+@traced_resume('langextract')
+@resume_deadline()
 def format_resume_with_langextract(text_file: str) -> dict:
     """
     使用 langextract 格式化简历内容
@@ -30,8 +31,7 @@ def format_resume_with_langextract(text_file: str) -> dict:
     print(f"使用 langextract 格式化简历: {text_file}")
     
     # 读取文本内容
-    with open(text_file, 'r', encoding='utf-8') as f:
-        text = f.read()
+    text = packed_corpus.read_text(text_file)
     
     print(f"文本长度: {len(text)} 字符")
     print(f"前500字符预览: {text[:500]}...")
@@ -131,6 +131,8 @@ def format_resume_with_langextract(text_file: str) -> dict:
     熟悉MySQL、Redis等数据库
     """
     
+    from langextract.data import ExampleData, Extraction
+
     # 创建精确的 Extraction 对象 - 只包含必要的示例
     extractions = [
         # 个人信息
@@ -189,51 +191,43 @@ def format_resume_with_langextract(text_file: str) -> dict:
     examples = [ExampleData(text=example_text, extractions=extractions)]
     
     # 尝试使用 Qwen API
-    qwen_api_key = os.getenv('QWEN_API_KEY')
-    if qwen_api_key:
+    if llm_client.has_credentials('qwen'):
         try:
             print("使用 Qwen API 进行格式化...")
             
-            model = OpenAILanguageModel(
-                model_id="qwen-plus",
-                api_key=qwen_api_key,
-                base_url="https://dashscope.aliyuncs.com/compatible-mode/v1"
-            )
-            
-            result = lx.extract(
+            result = llm_client.extract(
                 text,
                 schema,
-                examples=examples,
-                model=model
+                examples,
+                None,
+                provider='qwen',
+                stage='langextract'
             )
             
             print("✓ Qwen API 格式化成功")
-            return convert_langextract_result(result)
+            with span("format.tags"):
+                return convert_langextract_result(result)
             
         except Exception as e:
             print(f"✗ Qwen API 失败: {e}")
     
     # 尝试使用 DeepSeek API
-    deepseek_api_key = os.getenv('DEEPSEEK_API_KEY')
-    if deepseek_api_key:
+    if llm_client.has_credentials('deepseek'):
         try:
             print("使用 DeepSeek API 进行格式化...")
             
-            model = OpenAILanguageModel(
-                model_id="deepseek-chat",
-                api_key=deepseek_api_key,
-                base_url="https://api.deepseek.com/v1"
-            )
-            
-            result = lx.extract(
+            result = llm_client.extract(
                 text,
                 schema,
-                examples=examples,
-                model=model
+                examples,
+                None,
+                provider='deepseek',
+                stage='langextract'
             )
             
             print("✓ DeepSeek API 格式化成功")
-            return convert_langextract_result(result)
+            with span("format.tags"):
+                return convert_langextract_result(result)
             
         except Exception as e:
             print(f"✗ DeepSeek API 失败: {e}")
@@ -241,9 +235,102 @@ def format_resume_with_langextract(text_file: str) -> dict:
     
     raise ValueError("没有可用的 API key")
 
+# 单值字段所属的分区及字段名
+SCALAR_SECTIONS = {
+    "个人信息": ("姓名", "性别", "年龄", "电话", "邮箱", "微信", "籍贯", "政治面貌", "婚姻状况"),
+    "求职信息": ("工作时长", "求职意向", "期望薪资", "期望城市"),
+    "技能专长": ("编程语言", "框架技术", "数据库技术", "容器技术", "其他技能"),
+}
+
+# 列表分区 -> 条目字段（第一个为锚点字段，每个锚点开始一个条目）
+LIST_SECTIONS = {
+    "工作经历": ("公司名称", "职位", "工作时间", "工作描述", "主要成果"),
+    "教育背景": ("学校名称", "专业", "学历", "就读时间"),
+    "项目经历": ("项目名称", "项目时间", "技术栈", "项目描述", "个人职责"),
+}
+
+# 抽取类别 -> (分区, 字段)，导入时预先计算，转换时只做一次字典查找
+FIELD_DISPATCH = {"自我评价": ("自我评价", None)}
+for _section, _keys in {**SCALAR_SECTIONS, **LIST_SECTIONS}.items():
+    for _key in _keys:
+        FIELD_DISPATCH[f"{_section}_{_key}"] = (_section, _key)
+
+
+def _position(extraction):
+    """抽取在原文中的起始位置，未对齐时返回 None"""
+    interval = getattr(extraction, 'char_interval', None)
+    return getattr(interval, 'start_pos', None) if interval is not None else None
+
+
+def merge_extractions(*extraction_lists) -> list:
+    """
+    合并多组抽取结果（如并行分块、重试产生的结果），去掉重复项并按原文位置排序
+
+    同一类别、同一位置（未对齐时为同一文本）的抽取只保留第一次出现的；未对齐的抽取排在最后，保持原有顺序
+    """
+    seen = set()
+    merged = []
+    for extractions in extraction_lists:
+        for extraction in extractions or []:
+            interval = getattr(extraction, 'char_interval', None)
+            span_key = (interval.start_pos, interval.end_pos) if interval is not None and interval.start_pos is not None else None
+            key = (extraction.extraction_class, span_key if span_key else (extraction.extraction_text or "").strip())
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(extraction)
+    # sorted 是稳定排序，未对齐的抽取保持原有相对顺序
+    return sorted(merged, key=lambda e: (_position(e) is None, _position(e) or 0))
+
+
+def _group_entries(section: str, anchors: list, fields: list, text: str) -> list:
+    """
+    按原文位置把字段分到条目中
+
+    每个锚点（如公司名称）所在行的行首到下一个锚点行首为一个区间，字段按起始位置用二分查找落入区间；
+    位于第一个锚点之前的字段归入第一个条目。锚点没有位置信息时退回按到达顺序分组。
+
+    Args:
+        anchors: [(位置, 到达序号, 值)]
+        fields: [(位置, 到达序号, 所属锚点的到达下标, 字段名, 值)]
+    """
+    keys = LIST_SECTIONS[section]
+    positional = all(position is not None for position, _, _ in anchors)
+    if positional:
+        anchors = sorted(anchors)
+    entries = [dict.fromkeys(keys, "") for _ in anchors]
+    for entry, (_, _, value) in zip(entries, anchors):
+        entry[keys[0]] = value
+    if not entries:
+        return entries
+
+    if positional:
+        # 条目区间的起点：锚点所在行的行首（“2020-2023  某某公司”这类时间在前的行也归入该条目）
+        starts = [text.rfind('\n', 0, position) + 1 if text else position for position, _, _ in anchors]
+        # 锚点到达序号 -> 排序后的条目下标（未对齐字段按到达顺序归属时使用）
+        arrival_index = {order: index for index, (_, order, _) in enumerate(anchors)}
+        arrival_order = sorted(arrival_index)
+        for position, _, anchor_arrival, key, value in sorted(fields, key=lambda f: (f[0] is None, f[0] or 0, f[1])):
+            if position is not None:
+                index = max(bisect.bisect_right(starts, position) - 1, 0)
+            elif anchor_arrival >= 0:
+                index = arrival_index[arrival_order[anchor_arrival]]
+            else:
+                continue
+            entries[index][key] = value
+    else:
+        for _, _, anchor_arrival, key, value in sorted(fields, key=lambda f: f[1]):
+            if anchor_arrival >= 0:
+                entries[anchor_arrival][key] = value
+    return entries
+
+
 def convert_langextract_result(result) -> dict:
     """
     将 langextract 的结果转换为结构化数据
+
+    工作经历/教育背景/项目经历按抽取在原文中的位置分组，与抽取结果的先后顺序无关，
+    并行分块或重试得到的抽取列表可以先用 merge_extractions 合并再转换
     
     Args:
         result: langextract 的 AnnotatedDocument 结果
@@ -251,127 +338,43 @@ def convert_langextract_result(result) -> dict:
     Returns:
         转换后的简历数据
     """
+    text = result.text if hasattr(result, 'text') else ""
     # 初始化完整的结果结构
     resume_data = {
-        "个人信息": {
-            "姓名": "",
-            "性别": "",
-            "年龄": "",
-            "电话": "",
-            "邮箱": "",
-            "微信": "",
-            "籍贯": "",
-            "政治面貌": "",
-            "婚姻状况": ""
-        },
-        "求职信息": {
-            "工作时长": "",
-            "求职意向": "",
-            "期望薪资": "",
-            "期望城市": ""
-        },
+        "个人信息": dict.fromkeys(SCALAR_SECTIONS["个人信息"], ""),
+        "求职信息": dict.fromkeys(SCALAR_SECTIONS["求职信息"], ""),
         "工作经历": [],
         "教育背景": [],
         "项目经历": [],
-        "技能专长": {
-            "编程语言": "",
-            "框架技术": "",
-            "数据库技术": "",
-            "容器技术": "",
-            "其他技能": ""
-        },
+        "技能专长": dict.fromkeys(SCALAR_SECTIONS["技能专长"], ""),
         "自我评价": "",
-        "原始文本": result.text if hasattr(result, 'text') else ""
+        "原始文本": text
     }
-    
-    # 临时存储用于构建列表项 - 使用更智能的分组策略
-    work_groups = []  # 存储工作经历组
-    edu_groups = []   # 存储教育背景组
-    proj_groups = []  # 存储项目经历组
-    
-    # 从提取结果中获取信息
-    if hasattr(result, 'extractions'):
-        for extraction in result.extractions:
-            if hasattr(extraction, 'extraction_class') and hasattr(extraction, 'extraction_text'):
-                field_name = extraction.extraction_class
-                field_value = extraction.extraction_text
-                
-                # 只保存非空值
-                if field_value and field_value.strip():
-                    field_value = field_value.strip()
-                    
-                    # 个人信息字段
-                    if field_name.startswith("个人信息_"):
-                        key = field_name.replace("个人信息_", "")
-                        if key in resume_data["个人信息"]:
-                            resume_data["个人信息"][key] = field_value
-                    
-                    # 求职信息字段
-                    elif field_name.startswith("求职信息_"):
-                        key = field_name.replace("求职信息_", "")
-                        if key in resume_data["求职信息"]:
-                            resume_data["求职信息"][key] = field_value
-                    
-                    # 工作经历字段 - 使用智能分组
-                    elif field_name.startswith("工作经历_"):
-                        key = field_name.replace("工作经历_", "")
-                        
-                        # 如果是公司名称，开始新的工作经历组
-                        if key == "公司名称":
-                            work_groups.append({
-                                "公司名称": field_value,
-                                "职位": "",
-                                "工作时间": "",
-                                "工作描述": "",
-                                "主要成果": ""
-                            })
-                        # 否则添加到最后一个工作经历组
-                        elif work_groups and key in work_groups[-1]:
-                            work_groups[-1][key] = field_value
-                    
-                    # 教育背景字段 - 使用智能分组
-                    elif field_name.startswith("教育背景_"):
-                        key = field_name.replace("教育背景_", "")
-                        
-                        if key == "学校名称":
-                            edu_groups.append({
-                                "学校名称": field_value,
-                                "专业": "",
-                                "学历": "",
-                                "就读时间": ""
-                            })
-                        elif edu_groups and key in edu_groups[-1]:
-                            edu_groups[-1][key] = field_value
-                    
-                    # 项目经历字段 - 使用智能分组
-                    elif field_name.startswith("项目经历_"):
-                        key = field_name.replace("项目经历_", "")
-                        
-                        if key == "项目名称":
-                            proj_groups.append({
-                                "项目名称": field_value,
-                                "项目时间": "",
-                                "技术栈": "",
-                                "项目描述": "",
-                                "个人职责": ""
-                            })
-                        elif proj_groups and key in proj_groups[-1]:
-                            proj_groups[-1][key] = field_value
-                    
-                    # 技能专长字段
-                    elif field_name.startswith("技能专长_"):
-                        key = field_name.replace("技能专长_", "")
-                        if key in resume_data["技能专长"]:
-                            resume_data["技能专长"][key] = field_value
-                    
-                    # 自我评价
-                    elif field_name == "自我评价":
-                        resume_data["自我评价"] = field_value
-    
-    # 将分组结果添加到最终数据中，只保留有效的条目
-    resume_data["工作经历"] = [exp for exp in work_groups if exp.get("公司名称")]
-    resume_data["教育背景"] = [edu for edu in edu_groups if edu.get("学校名称")]
-    resume_data["项目经历"] = [proj for proj in proj_groups if proj.get("项目名称")]
+
+    # 列表分区的锚点和其他字段，分组在所有抽取读完后进行
+    anchors = {section: [] for section in LIST_SECTIONS}
+    fields = {section: [] for section in LIST_SECTIONS}
+
+    for order, extraction in enumerate(getattr(result, 'extractions', None) or []):
+        target = FIELD_DISPATCH.get(getattr(extraction, 'extraction_class', None))
+        field_value = getattr(extraction, 'extraction_text', None)
+        # 只保存非空值
+        if target is None or not field_value or not field_value.strip():
+            continue
+        field_value = field_value.strip()
+        section, key = target
+
+        if key is None:
+            resume_data[section] = field_value
+        elif section in SCALAR_SECTIONS:
+            resume_data[section][key] = field_value
+        elif key == LIST_SECTIONS[section][0]:
+            anchors[section].append((_position(extraction), order, field_value))
+        else:
+            fields[section].append((_position(extraction), order, len(anchors[section]) - 1, key, field_value))
+
+    for section in LIST_SECTIONS:
+        resume_data[section] = _group_entries(section, anchors[section], fields[section], text)
     
     return resume_data
 
@@ -383,16 +386,17 @@ def save_result(data: dict, output_file: str):
         data: 简历数据
         output_file: 输出文件路径
     """
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with span("output.write_json"), track_export("json"):
+        saved = output_writer.save_result(output_file, data)
     
-    print(f"✓ 结果已保存到: {output_file}")
+    print(f"✓ 结果已保存到: {saved}")
 
 def main():
     """主函数"""
     print("=" * 60)
     print("简历格式化器 - 使用langextract")
     print("=" * 60)
+    start_from_env()
     
     # 查找middles文件夹下的文本文件
     middles_dir = Path("middles")
@@ -400,7 +404,7 @@ def main():
         print("✗ middles文件夹不存在，请先运行 unstructured_extractor.py")
         return
     
-    text_files = list(middles_dir.glob("*_extracted.txt"))
+    text_files = [Path(p) for p in packed_corpus.list_text_files(str(middles_dir))]
     if not text_files:
         print("✗ middles文件夹下没有找到 *_extracted.txt 文件")
         print("请先运行 unstructured_extractor.py 生成中间文件")
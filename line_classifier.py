@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+轻量行分类器 - 代替 unstructured 的 partition_text
+功能: 只用标准库把 pdfminer 提取的文本按行标注为 Title / ListItem / KeyValue / NarrativeText / Text，
+     针对中文简历调整（章节标题、项目符号、“键：值”行），不需要导入 unstructured（导入需数秒）
+
+分段方式与 partition_text 处理中文简历时基本一致：每个非空行是一个元素；
+partition_text 会把5个以上空格分隔的词组成的段落合并成一行，中文简历中很少出现。
+
+unstructured_extractor.py 中通过 RESUME_PARTITIONER=lines 选用；与 partition_text 的一致率见
+benchmark_line_classifier.py
+"""
+
+import re
+
+# 项目符号（unstructured 的符号表加上中文简历常见的方块、箭头）
+BULLETS = "\x95•‣⁃ㅤ⁌⁍∙○●◘◦☙❥❧⦾⦿*·▪■□◆◇►▶➢✓✔"
+BULLET_RE = re.compile(rf"^(?:[{re.escape(BULLETS)}]+|[-–](?=\s|$))\s*")
+NUMBERED_RE = re.compile(r"^(?:\d{1,2}[.)、）]\s*(?!\d)|[（(]\d{1,2}[)）]\s*)\S")
+
+# 常见的简历章节标题（去掉结尾冒号和空白后比较）
+SECTION_HEADERS = frozenset({
+    "个人信息", "基本信息", "个人资料", "联系方式", "求职信息", "求职意向", "个人优势", "个人简介",
+    "工作经历", "工作经验", "实习经历", "教育背景", "教育经历", "项目经历", "项目经验",
+    "专业技能", "技能专长", "技能特长", "职业技能", "自我评价", "个人评价", "证书", "资格证书",
+    "荣誉奖项", "获奖情况", "培训经历", "语言能力", "兴趣爱好", "其他信息",
+})
+
+# 键：值 行，如 “电话:138xxxx”、“工作时长：9年”；键不超过8个字符
+KEY_VALUE_RE = re.compile(r"^[^\s:：|，。]{1,8}[:：]\s*\S")
+# 以冒号结尾的短行，如 “实时风控系统：”
+SHORT_TITLE_RE = re.compile(r"^[^:：。；;，,]{2,20}[:：]$")
+SENTENCE_PUNCT_RE = re.compile(r"[。；;！!？?]|[，,].{6,}")
+
+
+def classify_line(line: str) -> tuple:
+    """
+    标注一行文本
+
+    Returns:
+        (元素类型, 清理后的文本)；ListItem 去掉项目符号，编号列表保留编号（与 partition_text 一致）
+    """
+    text = line.strip()
+    match = BULLET_RE.match(text)
+    if match:
+        return "ListItem", text[match.end():].strip()
+    if NUMBERED_RE.match(text):
+        return "ListItem", text
+
+    header = text.rstrip(":： ")
+    if header in SECTION_HEADERS or SHORT_TITLE_RE.match(text):
+        return "Title", text
+    if KEY_VALUE_RE.match(text):
+        return "KeyValue", text
+    if len(text) > 30 or SENTENCE_PUNCT_RE.search(text):
+        return "NarrativeText", text
+    return "Text", text
+
+
+def partition_lines(text: str) -> list:
+    """
+    把文本切分并标注为 [(元素类型, 文本)]，跳过空行和只有项目符号的行
+    """
+    elements = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        element_type, element_text = classify_line(line)
+        if element_text:
+            elements.append((element_type, element_text))
+    return elements
+
+
+def render_elements(elements) -> str:
+    """
+    按元素类型整理文本：标题前后加空行，列表项加“• ”，其他保持原样，并去掉多余的空行
+
+    Args:
+        elements: [(元素类型, 文本)]，类型名与 unstructured 的元素类名一致
+    """
+    processed_parts = []
+    for element_type, element_text in elements:
+        if not element_text:
+            continue
+        if element_type in ('Title', 'Header'):
+            # 标题类元素，前后加空行强调
+            processed_parts.append(f"\n{element_text}\n")
+        elif element_type == 'ListItem':
+            # 列表项，添加适当缩进
+            processed_parts.append(f"• {element_text}")
+        else:
+            # 正文和其他类型，保持原样
+            processed_parts.append(element_text)
+
+    processed_text = "\n".join(processed_parts)
+    processed_text = re.sub(r'\n\s*\n\s*\n+', '\n\n', processed_text)
+    return processed_text.strip()
+
+
+def render_class(element_type: str) -> str:
+    """元素类型对输出文本的影响：title（加空行）/ list（加项目符号）/ plain（原样）"""
+    if element_type in ('Title', 'Header'):
+        return "title"
+    if element_type == 'ListItem':
+        return "list"
+    return "plain"
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+LLM请求录制/回放（cassette）
+功能: 在 chat.completions 层按请求内容的哈希录制请求/响应，保存为紧凑的 JSONL 文件；
+     回放时直接从文件返回响应（不经过网络、并发控制和重试），整条流水线及其基准测试可以离线、确定性地运行
+
+模式（RESUME_LLM_CASSETTE_MODE）:
+    replay  只回放；未命中的请求照常发出（严格模式下直接失败）
+    record  所有请求照常发出，成功的响应追加到文件（同一请求以最后一次录制为准）
+    auto    命中时回放，未命中时发出请求并追加录制
+
+通过环境变量控制:
+    RESUME_LLM_CASSETTE=cassettes/run.jsonl     cassette 文件，未设置时关闭
+    RESUME_LLM_CASSETTE_MODE=replay             模式
+    RESUME_LLM_CASSETTE_STRICT=1                严格模式：回放未命中时抛出 CassetteMiss，不访问网络
+
+命令行:
+    python llm_cassette.py stats <cassette文件>     条目数、按模型统计、文件大小
+    python llm_cassette.py compact <cassette文件>   去掉被覆盖的重复条目
+"""
+
+import os
+import sys
+import json
+import hashlib
+import threading
+
+import metrics
+
+MODES = ('replay', 'record', 'auto')
+
+# 不影响响应内容的传输参数，不参与请求哈希
+TRANSPORT_KWARGS = ('timeout', 'extra_headers', 'extra_query', 'extra_body')
+
+_active = None
+_active_lock = threading.Lock()
+
+
+class CassetteMiss(ValueError):
+    """严格回放模式下请求没有录制的响应"""
+
+
+def request_key(kwargs: dict) -> str:
+    """请求内容（模型、消息、采样参数等）的哈希"""
+    payload = {k: v for k, v in kwargs.items() if k not in TRANSPORT_KWARGS}
+    canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+def _flag(name: str) -> bool:
+    return os.getenv(name, '').lower() not in ('', '0', 'false', 'no')
+
+
+def load_entries(path: str) -> dict:
+    """读取 cassette 文件，返回 请求哈希 -> 条目（后出现的条目覆盖先出现的）"""
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+                entries[entry['k']] = entry
+            except (ValueError, KeyError):
+                print(f"⚠️ cassette 第{line_no}行无法解析，已跳过: {path}")
+    return entries
+
+
+class Cassette:
+    """一个 cassette 文件；同一进程内所有格式化器共享，线程安全"""
+
+    def __init__(self, path: str, mode: str = 'replay', strict: bool = False):
+        if mode not in MODES:
+            raise ValueError(f"未知的 cassette 模式: {mode}（可选 {'/'.join(MODES)}）")
+        self.path = path
+        self.mode = mode
+        self.strict = strict
+        self.entries = load_entries(path) if mode != 'record' else {}
+        self.stats = {'hits': 0, 'misses': 0, 'recorded': 0}
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'Cassette':
+        """未设置 RESUME_LLM_CASSETTE 时返回 None"""
+        path = os.getenv('RESUME_LLM_CASSETTE')
+        if not path:
+            return None
+        return cls(path, os.getenv('RESUME_LLM_CASSETTE_MODE', 'replay'), _flag('RESUME_LLM_CASSETTE_STRICT'))
+
+    @property
+    def offline(self) -> bool:
+        """严格回放：不会发出任何网络请求，不需要API key"""
+        return self.mode == 'replay' and self.strict
+
+    def lookup(self, key: str):
+        """返回录制的响应对象（每个条目只反序列化一次），没有时返回 None"""
+        if self.mode == 'record':
+            return None
+        with self._lock:
+            response = self._responses.get(key)
+            if response is None:
+                entry = self.entries.get(key)
+                if entry is None:
+                    return None
+                from openai.types.chat import ChatCompletion
+                response = self._responses[key] = ChatCompletion.model_validate(entry['r'])
+        return response
+
+    def store(self, key: str, kwargs: dict, response):
+        """追加一条录制（单次 write 写入整行，多个进程同时追加同一文件也不会交错）"""
+        data = response.to_dict() if hasattr(response, 'to_dict') else response.model_dump()
+        entry = {'k': key, 'm': kwargs.get('model'), 'r': data}
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock:
+            self.entries[key] = entry
+            self._responses[key] = response
+            self.stats['recorded'] += 1
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+    def wrap(self, create, on_replay=None):
+        """
+        包装 chat.completions.create
+
+        Args:
+            create: 实际发出请求的函数（已包含并发控制、重试等）
+            on_replay: 回放命中时对响应调用的函数（如记录token用量）
+        """
+        def cassette_create(*args, **kwargs):
+            key = request_key(kwargs)
+            response = self.lookup(key)
+            if response is not None:
+                self._count('hits')
+                return on_replay(response) if on_replay is not None else response
+            self._count('misses')
+            if self.mode == 'replay' and self.strict:
+                raise CassetteMiss(f"cassette 中没有该请求的录制（{key}）: {self.path}")
+            response = create(*args, **kwargs)
+            if self.mode in ('record', 'auto'):
+                self.store(key, kwargs, response)
+            return response
+
+        return cassette_create
+
+    def _count(self, result: str):
+        with self._lock:
+            self.stats[result] += 1
+        if result in ('hits', 'misses'):
+            metrics.record_cache('llm_cassette', result == 'hits')
+
+
+def active() -> Cassette:
+    """按环境变量获取当前进程的 cassette，未开启时返回 None；环境变量变化时重新加载"""
+    global _active
+    path = os.getenv('RESUME_LLM_CASSETTE')
+    with _active_lock:
+        if not path:
+            _active = None
+        elif (_active is None or _active.path != path
+              or _active.mode != os.getenv('RESUME_LLM_CASSETTE_MODE', 'replay')
+              or _active.strict != _flag('RESUME_LLM_CASSETTE_STRICT')):
+            _active = Cassette.from_env()
+        return _active
+
+
+def offline() -> bool:
+    """当前是否为严格回放（不需要API key和网络）"""
+    cassette = active()
+    return cassette is not None and cassette.offline
+
+
+def compact(path: str) -> tuple:
+    """重写文件，只保留每个请求最后一次录制；返回 (原行数, 新行数)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        before = sum(1 for line in f if line.strip())
+    entries = load_entries(path)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for entry in entries.values():
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+    os.replace(tmp, path)
+    return before, len(entries)
+
+
+def main():
+    """命令行入口"""
+    if len(sys.argv) != 3 or sys.argv[1] not in ('stats', 'compact'):
+        print("使用方法: python llm_cassette.py stats|compact <cassette文件>")
+        sys.exit(1)
+    command, path = sys.argv[1], sys.argv[2]
+    if not os.path.exists(path):
+        print(f"文件不存在: {path}")
+        sys.exit(1)
+
+    if command == 'compact':
+        before, after = compact(path)
+        print(f"✓ 已压缩: {before} 行 -> {after} 行")
+        return
+
+    entries = load_entries(path)
+    models = {}
+    for entry in entries.values():
+        models[entry.get('m')] = models.get(entry.get('m'), 0) + 1
+    print(f"条目数: {len(entries)}")
+    print(f"文件大小: {os.path.getsize(path) / 1024:.1f} KB")
+    for model, count in sorted(models.items(), key=lambda item: -item[1]):
+        print(f"  {model}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+LLM调用层 - 统一封装各格式化器对 DeepSeek / Qwen 的 langextract 调用
+功能: 按服务商构建 OpenAILanguageModel，执行 lx.extract，
+     每个HTTP请求经过自适应并发控制器（adaptive_limiter）和容错策略（resilience：超时、截止时间、重试、熔断），
+     可选对冲请求（hedging）降低尾延迟，可选前缀稳定的提示布局（prompt_layout）提高服务商上下文缓存命中，
+     可选录制/回放（llm_cassette）实现离线、确定性运行，
+     并为每次调用记录追踪span（输入输出token数、缓存命中token数、重试次数、抽取条数）和 metrics 指标
+"""
+
+import os
+import time
+import functools
+import threading
+
+import metrics
+import hedging
+import resilience
+import llm_cassette
+import prompt_layout
+import priority_lanes
+from adaptive_limiter import AdaptiveLimiter, classify_error, estimate_tokens, retry_after_seconds
+from resilience import CircuitBreaker, DeadlineExceeded, RetryPolicy
+from tracing import span
+
+# 服务商配置，API地址可以通过环境变量覆盖（例如指向本地桩服务器）
+PROVIDERS = {
+    'deepseek': {
+        'name': 'DeepSeek',
+        'model_id': 'deepseek-chat',
+        'api_key_env': 'DEEPSEEK_API_KEY',
+        'base_url_env': 'DEEPSEEK_BASE_URL',
+        'default_base_url': 'https://api.deepseek.com/v1',
+    },
+    'qwen': {
+        'name': 'Qwen',
+        'model_id': 'qwen-plus',
+        'api_key_env': 'QWEN_API_KEY',
+        'base_url_env': 'QWEN_BASE_URL',
+        'default_base_url': 'https://dashscope.aliyuncs.com/compatible-mode/v1',
+    },
+}
+
+# 估算token预算时为输出预留的token数
+EXPECTED_OUTPUT_TOKENS = 512
+
+# 每个服务商一个自适应并发控制器、熔断器和对冲调用器，同一进程内的所有格式化器共享
+LIMITERS = {}
+BREAKERS = {}
+HEDGERS = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> AdaptiveLimiter:
+    """获取（或按环境变量创建）服务商的并发控制器"""
+    with _limiters_lock:
+        if provider not in LIMITERS:
+            LIMITERS[provider] = AdaptiveLimiter.from_env(provider)
+        return LIMITERS[provider]
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    """获取（或按环境变量创建）服务商的熔断器"""
+    with _limiters_lock:
+        if provider not in BREAKERS:
+            BREAKERS[provider] = CircuitBreaker.from_env(provider)
+        return BREAKERS[provider]
+
+
+def get_hedger(provider: str):
+    """未开启对冲（RESUME_LLM_HEDGE）时返回 None"""
+    if not hedging.hedging_enabled():
+        return None
+    with _limiters_lock:
+        if provider not in HEDGERS:
+            HEDGERS[provider] = hedging.Hedger.from_env(provider)
+        return HEDGERS[provider]
+
+
+@functools.lru_cache(maxsize=None)
+def load_env() -> bool:
+    """
+    加载 .env 中的环境变量（每个进程只加载一次）
+
+    langextract、openai 和 dotenv 都延迟到第一次调用模型时才导入，
+    命令行参数检查、--help 等路径不需要付出这部分导入时间
+    """
+    from dotenv import load_dotenv
+    return load_dotenv()
+
+
+def get_api_key(provider: str = 'deepseek') -> str:
+    """读取服务商的API key，未配置时返回空字符串"""
+    load_env()
+    return os.getenv(PROVIDERS[provider]['api_key_env'], '')
+
+
+def has_credentials(provider: str = 'deepseek') -> bool:
+    """是否可以调用该服务商：配置了API key，或处于严格回放模式（不访问网络）"""
+    return bool(get_api_key(provider)) or llm_cassette.offline()
+
+
+class UsageRecorder:
+    """
+    累计一次 lx.extract 内所有 chat.completions 请求的token用量、缓存命中token数和重试次数
+
+    on_usage(prompt_tokens, completion_tokens) 在每个响应记录后调用；被对冲请求抢先的请求在后台结束时才记录，
+    调用方需要完整成本时用它累计，而不是在 lx.extract 返回后读取总数
+    """
+
+    def __init__(self, on_usage=None):
+        self.on_usage = on_usage
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        # 服务商未返回缓存用量时保持为 None
+        self.cache_hit_tokens = None
+        self.cache_miss_tokens = None
+
+    def wrap(self, model, provider: str = None, deadline: float = None, lane: str = None):
+        """
+        包装模型的 OpenAI 客户端，记录每个响应中的 usage；
+        指定 provider 时每个请求经过该服务商的并发控制器、熔断器和重试策略
+
+        openai 客户端自带的重试会被关闭，由这里统一处理，限流信号才能反馈给并发控制器。
+        deadline 和 lane（优先级通道）需要由调用线程传入：langextract 多个分块并行请求时运行在线程池中，读不到调用方的上下文变量。
+        开启 cassette 时在最外层包一层录制/回放，回放命中的请求不经过并发控制和重试
+        """
+        client = getattr(model, '_client', None)
+        if client is None or getattr(getattr(client, 'chat', None), 'completions', None) is None:
+            return
+        if provider is not None and hasattr(client, 'with_options'):
+            client = model._client = client.with_options(max_retries=0)
+        completions = client.chat.completions
+        create = completions.create
+        cassette = llm_cassette.active()
+
+        if provider is None:
+            recorded = lambda *args, **kwargs: self._record(create(*args, **kwargs))
+            completions.create = recorded if cassette is None else cassette.wrap(recorded, self._record)
+            return
+
+        limiter, breaker, hedger = get_limiter(provider), get_breaker(provider), get_hedger(provider)
+        policy, call_timeout = RetryPolicy.from_env(), resilience.default_call_timeout()
+        lane = lane or priority_lanes.current_lane()
+        priority = priority_lanes.lane_rank(lane)
+
+        def send(ticket, request, cancelled=None):
+            # 请求真正结束时才归还并发名额、记录token用量：对冲后落败的请求在后台结束时也是如此
+            start = time.perf_counter()
+            try:
+                response = request()
+            except Exception as e:
+                outcome = 'cancelled' if cancelled is not None and cancelled.is_set() else classify_error(e)
+                limiter.release(ticket, outcome, time.perf_counter() - start, retry_after=retry_after_seconds(e))
+                raise
+            usage = getattr(response, 'usage', None)
+            actual = ((getattr(usage, 'prompt_tokens', 0) or 0) + (getattr(usage, 'completion_tokens', 0) or 0)
+                      if usage is not None else None)
+            limiter.release(ticket, 'ok', time.perf_counter() - start, actual_tokens=actual)
+            return self._record(response)
+
+        def start_hedge(args, kwargs, estimated):
+            # 对冲请求不排队等待并发名额，占用自己的名额；使用独立连接，主请求先返回时可以直接关闭
+            try:
+                ticket = limiter.acquire(estimated, timeout=0, priority=priority)
+            except TimeoutError:
+                return None
+            import openai
+            private = client.with_options(http_client=openai.DefaultHttpxClient())
+            cancelled = threading.Event()
+
+            def cancel():
+                cancelled.set()
+                private.close()
+
+            return (lambda: send(ticket, lambda: private.chat.completions.create(*args, **kwargs), cancelled)), cancel
+
+        def guarded_create(*args, **kwargs):
+            prompt = ''.join(str(m.get('content', '')) for m in kwargs.get('messages', []) if isinstance(m, dict))
+            estimated = estimate_tokens(prompt) + EXPECTED_OUTPUT_TOKENS
+            attempt = 0
+            while True:
+                left = resilience.remaining(deadline)
+                if left is not None and left <= 0:
+                    resilience.FAST_FAILS.inc(provider=provider, reason='deadline')
+                    raise DeadlineExceeded(f"简历处理超过截止时间（第{attempt + 1}次请求前）")
+                try:
+                    breaker.before_call()
+                except resilience.CircuitOpenError:
+                    resilience.FAST_FAILS.inc(provider=provider, reason='circuit_open')
+                    raise
+                queued = time.perf_counter()
+                try:
+                    ticket = limiter.acquire(estimated, timeout=left, priority=priority)
+                except TimeoutError:
+                    breaker.release()
+                    resilience.FAST_FAILS.inc(provider=provider, reason='deadline')
+                    raise DeadlineExceeded("等待并发名额时超过截止时间")
+
+                priority_lanes.LANE_LLM_WAIT.observe(time.perf_counter() - queued, lane=lane)
+                kwargs['timeout'] = call_timeout if left is None else max(0.1, min(call_timeout, left))
+                primary = functools.partial(send, ticket, lambda: create(*args, **kwargs))
+                try:
+                    if hedger is None:
+                        response = primary()
+                    else:
+                        response = hedger.call(primary, lambda: start_hedge(args, kwargs, estimated))
+                except Exception as e:
+                    outcome = classify_error(e)
+                    retry_after = retry_after_seconds(e)
+                    if outcome in ('server', 'timeout'):
+                        breaker.record_failure()
+                    else:
+                        breaker.release()
+                    if not policy.should_retry(outcome, attempt):
+                        raise
+                    delay = policy.delay(attempt, retry_after)
+                    left = resilience.remaining(deadline)
+                    if left is not None and delay >= left:
+                        raise DeadlineExceeded(f"重试等待{delay:.1f}秒将超过截止时间") from e
+                    self.retries += 1
+                    resilience.RETRIES.inc(provider=provider, outcome=outcome)
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+
+                breaker.record_success()
+                return response
+
+        completions.create = guarded_create if cassette is None else cassette.wrap(guarded_create, self._record)
+
+    def _record(self, response):
+        usage = getattr(response, 'usage', None)
+        prompt_tokens = (getattr(usage, 'prompt_tokens', 0) or 0) if usage is not None else 0
+        completion_tokens = (getattr(usage, 'completion_tokens', 0) or 0) if usage is not None else 0
+        with self._lock:
+            self.requests += 1
+            if usage is not None:
+                self.prompt_tokens += prompt_tokens
+                self.completion_tokens += completion_tokens
+                hit, miss = prompt_layout.cache_usage(usage)
+                if hit is not None:
+                    self.cache_hit_tokens = (self.cache_hit_tokens or 0) + hit
+                    self.cache_miss_tokens = (self.cache_miss_tokens or 0) + miss
+        if self.on_usage is not None and usage is not None:
+            self.on_usage(prompt_tokens, completion_tokens)
+        return response
+
+
+def error_type(exc: BaseException) -> str:
+    """
+    取异常链中的容错异常（DeadlineExceeded、CircuitOpenError、CassetteMiss）或 openai 客户端抛出的异常类型
+    作为错误类型（langextract 会把它包装一层），例如 RateLimitError、APITimeoutError；都没有时取最内层异常
+    """
+    chain, seen = [], set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        chain.append(exc)
+        exc = exc.__cause__ or exc.__context__
+    for prefix in ('resilience', 'llm_cassette', 'openai'):
+        for item in chain:
+            if type(item).__module__.startswith(prefix):
+                return type(item).__name__
+    return type(chain[-1]).__name__
+
+
+def create_model(provider: str = 'deepseek', system_prompt: str = None, model_id: str = None):
+    """构建 langextract 的 OpenAI 兼容模型，model_id 为空时使用服务商的默认模型"""
+    from langextract.providers.openai import OpenAILanguageModel
+
+    config = PROVIDERS[provider]
+    kwargs = {}
+    if system_prompt is not None:
+        kwargs['system_prompt'] = system_prompt
+    return OpenAILanguageModel(
+        model_id=model_id or config['model_id'],
+        # 严格回放时不会发出请求，但 openai 客户端要求非空的 key
+        api_key=get_api_key(provider) or 'cassette-replay',
+        base_url=os.getenv(config['base_url_env'], config['default_base_url']),
+        **kwargs
+    )
+
+
+def extract(text: str, schema, examples: list, system_prompt: str = None,
+            provider: str = 'deepseek', stage: str = '', fingerprint: str = None, validate_examples: bool = True,
+            model_id: str = None, usage: UsageRecorder = None):
+    """
+    调用 langextract 执行一次抽取
+
+    Args:
+        text: 简历文本
+        schema: 抽取schema（作为 prompt_description 传给 lx.extract）
+        examples: ExampleData 列表
+        system_prompt: 系统提示（前缀稳定布局下并入 prompt_description）
+        provider: 'deepseek' 或 'qwen'
+        stage: 调用方标识，用于追踪
+        fingerprint: 提示模板指纹（prompt_templates），记录在追踪span中
+        validate_examples: 是否让 langextract 校验示例对齐；预编译模板已校验过，传 False 跳过
+        model_id: 覆盖服务商的默认模型（model_router 按层级选择模型）
+        usage: 传入时用它累计本次调用的token用量，调用方可据此计算成本
+
+    Returns:
+        langextract 的 AnnotatedDocument
+    """
+    import langextract as lx
+
+    config = PROVIDERS[provider]
+    if not has_credentials(provider):
+        raise ValueError(f"没有可用的 {config['name']} API key")
+    model_id = model_id or config['model_id']
+
+    metrics.LLM_IN_FLIGHT.inc(provider=provider)
+    start = time.perf_counter()
+    try:
+        lane = priority_lanes.current_lane()
+        with span('llm.call', provider=provider, model=model_id, stage=stage, chars_in=len(text), lane=lane) as s:
+            if fingerprint:
+                s.set(prompt=fingerprint)
+            model = create_model(provider, system_prompt, model_id)
+            usage = usage if usage is not None else UsageRecorder()
+            usage.wrap(model, provider, resilience.current_deadline(), lane)
+
+            layout = prompt_layout.extract_kwargs(schema, system_prompt)
+            if not validate_examples:
+                from langextract.prompt_validation import PromptValidationLevel
+                layout['prompt_validation_level'] = PromptValidationLevel.OFF
+            result = lx.extract(
+                text,
+                examples=examples,
+                model=model,
+                **layout
+            )
+
+            s.set(
+                requests=usage.requests,
+                tokens_in=usage.prompt_tokens,
+                tokens_out=usage.completion_tokens,
+                retries=usage.retries,
+                extractions=len(getattr(result, 'extractions', None) or []),
+                layout=prompt_layout.layout_mode(),
+            )
+            if usage.cache_hit_tokens is not None:
+                s.set(cache_hit_tokens=usage.cache_hit_tokens, cache_miss_tokens=usage.cache_miss_tokens)
+    except Exception as e:
+        metrics.LLM_CALLS.inc(provider=provider, status='error')
+        metrics.LLM_ERRORS.inc(provider=provider, type=error_type(e))
+        raise
+    finally:
+        metrics.LLM_IN_FLIGHT.dec(provider=provider)
+        metrics.LLM_SECONDS.observe(time.perf_counter() - start, provider=provider)
+
+    metrics.LLM_CALLS.inc(provider=provider, status='ok')
+    metrics.LLM_TOKENS.inc(usage.prompt_tokens, provider=provider, direction='in')
+    metrics.LLM_TOKENS.inc(usage.completion_tokens, provider=provider, direction='out')
+    if usage.cache_hit_tokens is not None:
+        prompt_layout.PROMPT_CACHE_TOKENS.inc(usage.cache_hit_tokens, provider=provider, result='hit')
+        prompt_layout.PROMPT_CACHE_TOKENS.inc(usage.cache_miss_tokens, provider=provider, result='miss')
+        metrics.record_cache('llm_prompt', usage.cache_hit_tokens > 0)
+    return result
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+轻量级指标注册表（Prometheus 文本格式）
+功能: 提供计数器、仪表盘和直方图，记录队列深度、LLM并发数、按类型的错误数、
+     缓存命中率和吞吐量；通过本地HTTP端点暴露，或定期写入文件，无需外部服务
+
+通过环境变量控制:
+    RESUME_METRICS_PORT=9108                 在本地端口暴露 /metrics
+    RESUME_METRICS_FILE=metrics/{pid}.prom   定期写入文件（{pid} 替换为进程号）
+    RESUME_METRICS_INTERVAL=15               文件写入间隔（秒）
+"""
+
+import os
+import sys
+import time
+import atexit
+import threading
+import contextvars
+from pathlib import Path
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_in_resume = contextvars.ContextVar('metrics_in_resume', default=False)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """指标基类，按标签值分组保存样本"""
+
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"指标 {self.name} 需要标签 {self.label_names}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def get(self, **labels):
+        """读取一个标签组合的当前值（测试和快照用）"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """只增不减的计数器"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError(f"计数器 {self.name} 不能减少")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """可增可减的仪表盘"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """累积分桶直方图"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += 1
+            state[2] += value
+
+    def time(self, **labels):
+        """计时上下文管理器: with LATENCY.time(stage="x"): ..."""
+        return _Timer(self, labels)
+
+    def get(self, **labels):
+        """返回 (次数, 总和)"""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return (state[1], state[2]) if state else (0, 0.0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, (bucket_counts, count, total) in sorted(self._values.items()):
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {bucket_count}")
+                inf = _format_labels(self.label_names, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Registry:
+    """指标注册表，同名指标只注册一次"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, cls, name: str, help_text: str, labels: tuple, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labels, **kwargs)
+            elif not isinstance(metric, cls) or metric.label_names != tuple(labels):
+                raise ValueError(f"指标 {name} 已以不同类型或标签注册")
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: tuple = ()) -> Counter:
+        return self._register(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str, labels: tuple = ()) -> Gauge:
+        return self._register(Gauge, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help_text, labels, buckets=buckets)
+
+    def render(self) -> str:
+        """生成 Prometheus 文本格式"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# 流水线指标
+QUEUE_DEPTH = REGISTRY.gauge('resume_queue_depth', '等待处理的简历数量', ('stage',))
+RESUMES_TOTAL = REGISTRY.counter('resume_processed_total', '已处理的简历数量', ('stage', 'status'))
+RESUME_SECONDS = REGISTRY.histogram('resume_duration_seconds', '单份简历的处理耗时', ('stage',))
+
+# LLM调用指标
+LLM_IN_FLIGHT = REGISTRY.gauge('resume_llm_in_flight', '正在进行的LLM调用数', ('provider',))
+LLM_CALLS = REGISTRY.counter('resume_llm_calls_total', 'LLM调用次数', ('provider', 'status'))
+LLM_ERRORS = REGISTRY.counter('resume_llm_errors_total', '按错误类型统计的LLM调用失败数', ('provider', 'type'))
+LLM_SECONDS = REGISTRY.histogram('resume_llm_call_duration_seconds', 'LLM调用耗时', ('provider',))
+LLM_TOKENS = REGISTRY.counter('resume_llm_tokens_total', 'LLM消耗的token数', ('provider', 'direction'))
+
+# 缓存指标（命中率 = hit / (hit + miss)）
+CACHE_LOOKUPS = REGISTRY.counter('resume_cache_lookups_total', '缓存查询次数', ('cache', 'result'))
+
+# 导出指标
+EXPORTS = REGISTRY.counter('resume_exports_total', '导出文件次数', ('format', 'status'))
+EXPORT_SECONDS = REGISTRY.histogram('resume_export_duration_seconds', '导出文件耗时', ('format',))
+
+
+def record_cache(cache: str, hit: bool):
+    """记录一次缓存查询"""
+    CACHE_LOOKUPS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+class _Tracked:
+    """统计次数、成功/失败和耗时的上下文管理器"""
+
+    __slots__ = ('counter', 'histogram', 'labels', 'start', 'nested', '_token')
+
+    def __init__(self, counter: Counter, histogram: Histogram, labels: dict, nested: bool = False):
+        self.counter = counter
+        self.histogram = histogram
+        self.labels = labels
+        self.nested = nested
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        self.counter.inc(status='error' if exc_type else 'ok', **self.labels)
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+class _ResumeTracked(_Tracked):
+    """简历级统计，嵌套调用（例如一个格式化器调用另一个）只在最外层计数"""
+
+    def __enter__(self):
+        self.nested = _in_resume.get()
+        if not self.nested:
+            self._token = _in_resume.set(True)
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.nested:
+            _in_resume.reset(self._token)
+            super().__exit__(exc_type, exc, tb)
+        return False
+
+
+def track_resume(stage: str):
+    """统计一份简历的处理（吞吐量和耗时）"""
+    return _ResumeTracked(RESUMES_TOTAL, RESUME_SECONDS, {'stage': stage})
+
+
+def track_export(fmt: str):
+    """统计一次文件导出"""
+    return _Tracked(EXPORTS, EXPORT_SECONDS, {'format': fmt})
+
+
+def start_http_server(port: int, host: str = '127.0.0.1', registry: Registry = REGISTRY):
+    """
+    在后台线程启动 /metrics 端点
+
+    Returns:
+        server 对象，server.server_address[1] 为实际端口（port=0 时随机分配）
+    """
+    # http.server 导入较慢，只在需要暴露端点时加载
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?')[0].rstrip('/') not in ('', '/metrics'):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def dump_to_file(path: str, registry: Registry = REGISTRY):
+    """把当前指标写入文件（先写临时文件再替换，读取方不会看到半个文件）"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(registry.render())
+    os.replace(tmp, path)
+
+
+def start_file_dump(path: str, interval: float = 15.0, registry: Registry = REGISTRY):
+    """在后台线程定期写入指标文件，进程退出时再写一次"""
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval):
+            try:
+                dump_to_file(path, registry)
+            except OSError as e:
+                print(f"⚠️  指标文件写入失败: {e}", file=sys.stderr)
+
+    threading.Thread(target=loop, daemon=True).start()
+    atexit.register(lambda: (stop.set(), dump_to_file(path, registry)))
+    return stop
+
+
+_started = False
+
+
+def start_from_env():
+    """根据环境变量启动HTTP端点和文件写入（每个进程只启动一次；由各命令行入口调用，导入本模块不会启动）"""
+    global _started
+    if _started:
+        return
+    _started = True
+
+    port = os.getenv('RESUME_METRICS_PORT')
+    if port:
+        try:
+            server = start_http_server(int(port))
+            print(f"✓ 指标端点: http://127.0.0.1:{server.server_address[1]}/metrics", file=sys.stderr)
+        except (OSError, ValueError) as e:
+            # 批量运行时多个进程可能争用同一端口，只由第一个进程提供端点
+            print(f"⚠️  指标端点启动失败: {e}", file=sys.stderr)
+
+    path = os.getenv('RESUME_METRICS_FILE')
+    if path:
+        start_file_dump(path.replace('{pid}', str(os.getpid())),
+                        float(os.getenv('RESUME_METRICS_INTERVAL', '15')))
+
+
+def main():
+    """主函数：打印指标文件，或本进程的指标定义"""
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'r', encoding='utf-8') as f:
+            print(f.read(), end='')
+        return
+    print(REGISTRY.render(), end='')
+
+
+if __name__ == "__main__":
+    main()
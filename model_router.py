@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+分层模型路由
+功能: 每份简历先交给快速、便宜的模型（fast 层），按抽取结果的完整度打分
+     （缺少 技术能力分析_* / 风险因素识别_* 等必需维度、字段为空），只有不合格的简历才升级到更强的模型（strong 层）；
+     按层统计调用次数、升级率、延迟、token用量和估算成本
+
+通过环境变量控制:
+    RESUME_ROUTER=1                            开启分层路由（默认关闭，所有请求直接发给 strong 层）
+    RESUME_ROUTER_FAST=qwen:qwen-turbo         fast 层，格式为 服务商:模型
+    RESUME_ROUTER_STRONG=deepseek:deepseek-chat  strong 层
+    RESUME_ROUTER_MIN_SCORE=0.8                完整度低于该值时升级
+    RESUME_ROUTER_FAST_PRICE / RESUME_ROUTER_STRONG_PRICE   每百万输入,输出token的价格（元），覆盖内置价格表
+"""
+
+import os
+import time
+import threading
+from collections import deque
+
+import metrics
+import llm_client
+from tracing import percentile
+
+ROUTED = metrics.REGISTRY.counter('resume_router_calls_total', '分层路由各层的调用结果（accepted/escalated/errors）',
+                                  ('tier', 'result'))
+ROUTE_SECONDS = metrics.REGISTRY.histogram('resume_router_call_duration_seconds', '分层路由各层的调用耗时', ('tier',))
+ROUTE_COST = metrics.REGISTRY.counter('resume_router_cost_yuan_total', '分层路由各层的估算成本（元）', ('tier',))
+
+# 每百万token的参考价格（元，输入, 输出），实际价格以服务商为准，可通过环境变量覆盖
+PRICES = {
+    'deepseek-chat': (2.0, 8.0),
+    'deepseek-reasoner': (4.0, 16.0),
+    'qwen-turbo': (0.3, 0.6),
+    'qwen-flash': (0.15, 1.5),
+    'qwen-plus': (0.8, 2.0),
+    'qwen-max': (2.4, 9.6),
+}
+
+# 缺少任一前缀的抽取结果视为不合格
+DEFAULT_REQUIRED = ('技术能力分析_', '风险因素识别_')
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def routing_enabled() -> bool:
+    """是否通过环境变量开启了分层路由"""
+    return os.getenv('RESUME_ROUTER', '').lower() not in ('', '0', 'false', 'no')
+
+
+class Tier:
+    """一个模型层级"""
+
+    __slots__ = ('name', 'provider', 'model_id', 'price_in', 'price_out')
+
+    def __init__(self, name: str, provider: str, model_id: str = None, price_in: float = None, price_out: float = None):
+        if provider not in llm_client.PROVIDERS:
+            raise ValueError(f"未知的服务商: {provider}")
+        self.name = name
+        self.provider = provider
+        self.model_id = model_id or llm_client.PROVIDERS[provider]['model_id']
+        default_in, default_out = PRICES.get(self.model_id, (0.0, 0.0))
+        self.price_in = default_in if price_in is None else price_in
+        self.price_out = default_out if price_out is None else price_out
+
+    @classmethod
+    def parse(cls, name: str, spec: str, price: str = None) -> 'Tier':
+        """
+        解析 "服务商:模型" 和 "输入价格,输出价格"
+
+        Raises:
+            ValueError: 格式错误或服务商未知
+        """
+        provider, _, model_id = spec.strip().partition(':')
+        price_in = price_out = None
+        if price:
+            try:
+                price_in, price_out = (float(p) for p in price.split(','))
+            except ValueError:
+                raise ValueError(f"价格格式应为 输入,输出: {price}") from None
+        return cls(name, provider, model_id or None, price_in, price_out)
+
+    def cost(self, tokens_in: int, tokens_out: int) -> float:
+        """按每百万token价格估算成本（元）"""
+        return (tokens_in * self.price_in + tokens_out * self.price_out) / 1_000_000
+
+    def __repr__(self):
+        return f"Tier({self.name}={self.provider}:{self.model_id})"
+
+
+def _percentile_ms(latencies: list, p: float) -> float:
+    return round(percentile(latencies, p) * 1000, 1) if latencies else None
+
+
+def completeness(result, template, required_prefixes: tuple = DEFAULT_REQUIRED) -> tuple:
+    """
+    按模板的示例抽取类别给结果打分
+
+    Returns:
+        (得分 0~1, 缺少的必需前缀列表)；得分为模板中有非空值的字段比例
+    """
+    expected = {cls for cls, _ in template.extractions}
+    present = set()
+    for extraction in getattr(result, 'extractions', None) or []:
+        value = getattr(extraction, 'extraction_text', None)
+        if value and value.strip():
+            present.add(getattr(extraction, 'extraction_class', ''))
+    score = len(expected & present) / len(expected) if expected else 1.0
+    missing = [prefix for prefix in required_prefixes
+               if any(cls.startswith(prefix) for cls in expected)
+               and not any(cls.startswith(prefix) for cls in present)]
+    return score, missing
+
+
+class ModelRouter:
+    """
+    两层模型路由: fast 层结果合格时直接使用，否则（或 fast 层调用失败、没有API key）交给 strong 层
+    """
+
+    def __init__(self, fast: Tier, strong: Tier, min_score: float = 0.8,
+                 required_prefixes: tuple = DEFAULT_REQUIRED, latency_window: int = 1000):
+        self.fast = fast
+        self.strong = strong
+        self.min_score = min_score
+        self.required_prefixes = required_prefixes
+        self._lock = threading.Lock()
+        self.stats = {tier.name: {'calls': 0, 'accepted': 0, 'escalated': 0, 'errors': 0,
+                                  'tokens_in': 0, 'tokens_out': 0, 'cost': 0.0,
+                                  'latencies': deque(maxlen=latency_window)}
+                      for tier in (fast, strong)}
+
+    @classmethod
+    def from_env(cls) -> 'ModelRouter':
+        return cls(
+            fast=Tier.parse('fast', os.getenv('RESUME_ROUTER_FAST', 'qwen:qwen-turbo'),
+                            os.getenv('RESUME_ROUTER_FAST_PRICE')),
+            strong=Tier.parse('strong', os.getenv('RESUME_ROUTER_STRONG', 'deepseek:deepseek-chat'),
+                              os.getenv('RESUME_ROUTER_STRONG_PRICE')),
+            min_score=float(os.getenv('RESUME_ROUTER_MIN_SCORE', '0.8')),
+        )
+
+    def _add_usage(self, tier: Tier, tokens_in: int, tokens_out: int):
+        """累计一个响应的token用量和成本（被对冲抢先的请求在后台结束时也会计入）"""
+        cost = tier.cost(tokens_in, tokens_out)
+        ROUTE_COST.inc(cost, tier=tier.name)
+        with self._lock:
+            stats = self.stats[tier.name]
+            stats['tokens_in'] += tokens_in
+            stats['tokens_out'] += tokens_out
+            stats['cost'] += cost
+
+    def _call(self, tier: Tier, text: str, template, stage: str):
+        usage = llm_client.UsageRecorder(
+            on_usage=lambda tokens_in, tokens_out: self._add_usage(tier, tokens_in, tokens_out))
+        start = time.perf_counter()
+        try:
+            return llm_client.extract(
+                text, template.schema, template.examples, template.system_prompt,
+                provider=tier.provider, stage=f"{stage}.{tier.name}", fingerprint=template.fingerprint,
+                validate_examples=False, model_id=tier.model_id, usage=usage,
+            )
+        finally:
+            elapsed = time.perf_counter() - start
+            ROUTE_SECONDS.observe(elapsed, tier=tier.name)
+            with self._lock:
+                stats = self.stats[tier.name]
+                stats['calls'] += 1
+                stats['latencies'].append(elapsed)
+
+    def _count(self, tier: Tier, result: str):
+        ROUTED.inc(tier=tier.name, result=result)
+        with self._lock:
+            self.stats[tier.name][result] += 1
+
+    def extract(self, text: str, template, stage: str = ''):
+        """
+        按层级执行抽取
+
+        Returns:
+            langextract 的 AnnotatedDocument；strong 层失败时抛出其异常
+        """
+        if llm_client.has_credentials(self.fast.provider):
+            try:
+                result = self._call(self.fast, text, template, stage)
+            except Exception as e:
+                self._count(self.fast, 'errors')
+                print(f"⚠️ {self.fast.model_id} 调用失败，升级到 {self.strong.model_id}: {llm_client.error_type(e)}")
+            else:
+                score, missing = completeness(result, template, self.required_prefixes)
+                if score >= self.min_score and not missing:
+                    self._count(self.fast, 'accepted')
+                    return result
+                self._count(self.fast, 'escalated')
+                print(f"⚠️ {self.fast.model_id} 结果完整度 {score:.0%}"
+                      f"{'，缺少 ' + '/'.join(p.rstrip('_') for p in missing) if missing else ''}，"
+                      f"升级到 {self.strong.model_id}")
+
+        try:
+            result = self._call(self.strong, text, template, stage)
+        except Exception:
+            self._count(self.strong, 'errors')
+            raise
+        self._count(self.strong, 'accepted')
+        return result
+
+    def report(self) -> dict:
+        """各层的调用次数、升级率、延迟分位数、token用量和成本"""
+        report = {}
+        with self._lock:
+            for tier in (self.fast, self.strong):
+                stats = self.stats[tier.name]
+                latencies = stats['latencies']
+                report[tier.name] = {
+                    'model': f"{tier.provider}:{tier.model_id}",
+                    'calls': stats['calls'],
+                    'accepted': stats['accepted'],
+                    'escalated': stats['escalated'],
+                    'errors': stats['errors'],
+                    'escalation_rate': round((stats['escalated'] + stats['errors']) / stats['calls'], 4)
+                    if tier is self.fast and stats['calls'] else None,
+                    'p50_ms': _percentile_ms(latencies, 50),
+                    'p95_ms': _percentile_ms(latencies, 95),
+                    'tokens_in': stats['tokens_in'],
+                    'tokens_out': stats['tokens_out'],
+                    'cost_yuan': round(stats['cost'], 6),
+                }
+        return report
+
+
+def get_router() -> ModelRouter:
+    """获取（或按环境变量创建）进程内共享的路由器"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter.from_env()
+        return _router
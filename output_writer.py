@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+结果输出
+功能: 统一写出分析结果JSON:
+     - 单文件输出先写同目录下的临时文件再原子替换，进程中断时不会留下半个JSON
+     - 安装了 orjson 时用它序列化（比标准库 json 快数倍），输出格式与 json.dump(indent=2, ensure_ascii=False) 一致
+     - NDJSON 流式输出：批处理时每个结果一行，写到标准输出或一个持续追加的文件，多线程写入按行加锁
+
+通过环境变量控制:
+    RESUME_JSON_SERIALIZER=auto    auto（有 orjson 时使用）/ orjson / json
+    RESUME_OUTPUT_FSYNC=0          为1时替换前 fsync，断电时也不会丢失已报告保存的结果
+    RESUME_OUTPUT_NDJSON=          设置后格式化器的结果追加到该NDJSON文件（'-' 为标准输出），不再逐个写JSON文件
+
+使用方法:
+    output_writer.write_json("outs/张三_final_comprehensive.json", excel_data)
+    with output_writer.NdjsonWriter("outs/results.ndjson") as stream:
+        stream.write({"output": "张三_final_comprehensive.json", "result": excel_data})
+
+吞吐量对比见 benchmark_output_writer.py
+"""
+
+import os
+import sys
+import json
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def serializer() -> str:
+    """
+    当前使用的序列化器
+
+    Raises:
+        ValueError: RESUME_JSON_SERIALIZER 无效，或指定了 orjson 但未安装
+    """
+    mode = os.getenv('RESUME_JSON_SERIALIZER', 'auto')
+    if mode == 'auto':
+        return 'orjson' if orjson is not None else 'json'
+    if mode not in ('orjson', 'json'):
+        raise ValueError(f"未知的JSON序列化器: {mode}（可选 auto/orjson/json）")
+    if mode == 'orjson' and orjson is None:
+        raise ValueError("RESUME_JSON_SERIALIZER=orjson 但未安装 orjson（pip install orjson）")
+    return mode
+
+
+def dumps(data, indent: bool = True, name: str = None) -> bytes:
+    """序列化为UTF-8字节；orjson 不支持的对象（如超过64位的整数）回退到标准库"""
+    if (name or serializer()) == 'orjson':
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            pass
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def fsync_enabled() -> bool:
+    return os.getenv('RESUME_OUTPUT_FSYNC', '0').lower() in ('1', 'true', 'yes')
+
+
+def write_bytes(path: str, payload: bytes, fsync: bool = None):
+    """原子写入：同目录临时文件写完后 os.replace，失败时删除临时文件"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # 临时文件名包含进程和线程号，并发写同一结果时互不覆盖；用 open 创建以保持按 umask 的文件权限
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+            if fsync_enabled() if fsync is None else fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_json(path: str, data, indent: bool = True, fsync: bool = None) -> str:
+    """把结果原子写入JSON文件，返回路径"""
+    write_bytes(path, dumps(data, indent), fsync)
+    return str(path)
+
+
+class NdjsonWriter:
+    """
+    NDJSON 输出流：target 为 '-'（标准输出）或文件路径（追加写入）
+
+    每个结果序列化为一行后用一次 write 写出（文件不经缓冲，多个进程追加同一文件时行不会交错），中断时最多丢失最后一行（read_ndjson 会跳过不完整的行）
+    """
+
+    def __init__(self, target: str = '-'):
+        self.target = target
+        self.count = 0
+        self._lock = threading.Lock()
+        self._serializer = serializer()
+        if target == '-':
+            # 创建时取真正的标准输出：批处理期间 stdout 可能被重定向以屏蔽格式化器的打印
+            self._stream, self._owned = sys.stdout.buffer, False
+        else:
+            directory = os.path.dirname(os.path.abspath(target))
+            os.makedirs(directory, exist_ok=True)
+            self._stream, self._owned = open(target, 'ab', buffering=0), True
+
+    def write(self, record):
+        line = dumps(record, indent=False, name=self._serializer) + b'\n'
+        with self._lock:
+            self._stream.write(line)
+            self._stream.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._owned and not self._stream.closed:
+                self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_streams = {}
+_streams_lock = threading.Lock()
+
+
+def ndjson_target() -> str:
+    return os.getenv('RESUME_OUTPUT_NDJSON', '')
+
+
+def save_result(output_file: str, data) -> str:
+    """
+    保存一份分析结果：设置了 RESUME_OUTPUT_NDJSON 时追加一行 {"output": 文件名, "result": 结果}，
+    否则原子写入 output_file
+
+    Returns:
+        实际写入的位置（文件路径或NDJSON目标）
+    """
+    target = ndjson_target()
+    if not target:
+        return write_json(output_file, data)
+    with _streams_lock:
+        stream = _streams.get(target)
+        if stream is None:
+            stream = _streams[target] = NdjsonWriter(target)
+    stream.write({"output": os.path.basename(output_file), "result": data})
+    return target
+
+
+def read_ndjson(path: str):
+    """逐行读取NDJSON；最后一行不完整（写入中途中断）时跳过并提示"""
+    with open(path, 'rb') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                if not line.endswith(b'\n'):
+                    print(f"⚠️ {path}: 第{number}行不完整，已跳过", file=sys.stderr)
+                    return
+                raise ValueError(f"{path}: 第{number}行不是有效的JSON")
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+打包语料（代替 middles 下大量的 *_extracted.txt 小文件）
+功能: 把提取后的简历文本追加写入一个数据文件（长度前缀的UTF-8记录），另写一个"简历名哈希 -> 偏移"索引文件；
+     读取时对数据文件做内存映射，按索引直接取记录，不再逐个打开小文件
+     - 只追加：同一份简历重新提取时追加新记录，索引指向最新的一条；旧记录由 compact 清理
+     - 索引落后于数据文件（写入中途中断）时，打开时从索引末尾扫描数据文件补齐
+     - 多个进程可同时追加（文件锁）；读取前检查索引文件是否增长或被替换，增量加载其他进程追加的条目
+
+文件格式:
+    <pack>      文件头 b'RPACK001'，之后每条记录为 <名称字节数:u32><文本字节数:u32><名称><文本>
+    <pack>.idx  每条 20 字节：<名称哈希:u64><记录偏移:u64><记录长度:u32>
+
+通过环境变量控制:
+    RESUME_CORPUS_PACK=            打包语料路径（如 middles/corpus.pack），为空时仍使用单独的文本文件
+
+使用方法:
+    python packed_corpus.py migrate middles [--pack middles/corpus.pack] [--remove]   把已有文本文件导入
+    python packed_corpus.py compact middles/corpus.pack                               清理被覆盖的旧记录
+    python packed_corpus.py stats middles/corpus.pack
+    python packed_corpus.py cat middles/corpus.pack 张三
+"""
+
+import os
+import sys
+import mmap
+import glob
+import fcntl
+import struct
+import hashlib
+import argparse
+import threading
+import contextlib
+from pathlib import Path
+
+MAGIC = b'RPACK001'
+RECORD_HEADER = struct.Struct('<II')
+INDEX_ENTRY = struct.Struct('<QQI')
+TEXT_SUFFIX = '_extracted.txt'
+
+
+def pack_path() -> str:
+    return os.getenv('RESUME_CORPUS_PACK', '')
+
+
+def name_hash(name: str) -> int:
+    return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+@contextlib.contextmanager
+def _locked(path: str, mode: str):
+    """打开数据文件并持有进程间互斥锁（追加、修复、压缩时）；等锁期间文件被 compact 替换时重新打开"""
+    while True:
+        f = open(path, mode)
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            if os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                yield f
+                return
+        finally:
+            f.close()
+
+
+def resume_id(text_file: str) -> str:
+    """文本文件路径对应的简历名（middles/张三_extracted.txt -> 张三）"""
+    name = os.path.basename(str(text_file))
+    return name[:-len(TEXT_SUFFIX)] if name.endswith(TEXT_SUFFIX) else os.path.splitext(name)[0]
+
+
+class PackedCorpus:
+    """一个打包语料文件及其索引"""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self.index_path = self.path + '.idx'
+        self._index = {}
+        self._index_read = 0
+        self._index_inode = None
+        self._map = None
+        self._lock = threading.Lock()
+        if not os.path.exists(self.path):
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            with _locked(self.path, 'ab') as f:
+                if f.tell() == 0:
+                    f.write(MAGIC)
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是打包语料文件: {self.path}")
+        self._repair()
+        self._load_index()
+
+    def _scan(self, data, start: int):
+        """从 start 开始逐条解析记录，产生 (偏移, 记录长度, 名称)；遇到不完整的记录时停止"""
+        offset, size = start, len(data)
+        while offset + RECORD_HEADER.size <= size:
+            name_len, text_len = RECORD_HEADER.unpack_from(data, offset)
+            length = RECORD_HEADER.size + name_len + text_len
+            if offset + length > size:
+                break
+            name_start = offset + RECORD_HEADER.size
+            yield offset, length, bytes(data[name_start:name_start + name_len]).decode('utf-8')
+            offset += length
+
+    def _repair(self):
+        """索引落后于数据文件时从最后一条已索引记录之后扫描补齐；截掉末尾不完整的记录和索引项"""
+        with _locked(self.path, 'r+b') as data_file:
+            with open(self.index_path, 'a+b') as index_file:
+                index_file.seek(0)
+                raw = index_file.read()
+                usable = len(raw) - len(raw) % INDEX_ENTRY.size
+                end = len(MAGIC)
+                if usable:
+                    _, offset, length = INDEX_ENTRY.unpack_from(raw, usable - INDEX_ENTRY.size)
+                    end = offset + length
+                size = os.fstat(data_file.fileno()).st_size
+                if usable == len(raw) and end == size:
+                    return
+                index_file.truncate(usable)
+                if end > size:
+                    raise ValueError(f"索引与数据文件不一致，请删除 {self.index_path} 后重新打开以重建索引")
+                with mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    entries = list(self._scan(data, end))
+                tail = entries[-1][0] + entries[-1][1] if entries else end
+                index_file.seek(0, os.SEEK_END)
+                index_file.write(b''.join(INDEX_ENTRY.pack(name_hash(name), offset, length)
+                                          for offset, length, name in entries))
+                data_file.truncate(tail)
+                if entries or tail < size:
+                    print(f"⚠️ {self.path}: 补齐索引 {len(entries)} 条，截掉不完整数据 {size - tail} 字节")
+
+    def _load_index(self):
+        """读取索引中新增的条目（调用时持有 _lock 或在构造中）；索引被 compact 替换过时整体重新读取"""
+        with open(self.index_path, 'rb') as f:
+            inode = os.fstat(f.fileno()).st_ino
+            if inode != self._index_inode:
+                self._index, self._index_read, self._index_inode = {}, 0, inode
+                if self._map is not None:
+                    self._map.close()
+                    self._map = None
+            f.seek(self._index_read)
+            raw = f.read()
+        usable = len(raw) - len(raw) % INDEX_ENTRY.size
+        for key, offset, length in INDEX_ENTRY.iter_unpack(raw[:usable]):
+            self._index[key] = (offset, length)
+        self._index_read += usable
+
+    def _mapped(self, end: int):
+        """覆盖到 end 的内存映射（数据文件增长后重新映射）"""
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _refresh(self):
+        """索引文件增长（有新追加）或被 compact 替换时加载新条目（调用时持有 _lock）"""
+        try:
+            info = os.stat(self.index_path)
+        except FileNotFoundError:
+            return
+        if info.st_ino != self._index_inode or info.st_size - info.st_size % INDEX_ENTRY.size != self._index_read:
+            self._load_index()
+
+    def _locate(self, name: str):
+        with self._lock:
+            self._refresh()
+            return self._index.get(name_hash(name))
+
+    def get(self, name: str) -> str:
+        """
+        读取一份简历的文本
+
+        Raises:
+            KeyError: 语料中没有该简历
+        """
+        for attempt in range(2):
+            entry = self._locate(name)
+            if entry is None:
+                raise KeyError(name)
+            offset, length = entry
+            with self._lock:
+                data = self._mapped(offset + length)
+                name_len, text_len = RECORD_HEADER.unpack_from(data, offset)
+                start = offset + RECORD_HEADER.size
+                if bytes(data[start:start + name_len]).decode('utf-8', 'replace') == name:
+                    return bytes(data[start + name_len:start + name_len + text_len]).decode('utf-8')
+                # 读到的索引和映射跨越了一次 compact，整体重新加载后再试
+                self._index_inode = None
+                self._load_index()
+        raise ValueError(f"{self.path}: 索引中 {name} 的位置与数据不符（名称哈希冲突或文件损坏）")
+
+    def size_of(self, name: str) -> int:
+        """文本的字节数，不存在时返回 None"""
+        entry = self._locate(name)
+        if entry is None:
+            return None
+        offset, length = entry
+        with self._lock:
+            name_len, text_len = RECORD_HEADER.unpack_from(self._mapped(offset + length), offset)
+        return text_len
+
+    def __contains__(self, name: str) -> bool:
+        return self._locate(name) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load_index()
+            return len(self._index)
+
+    def append(self, name: str, text: str) -> int:
+        """追加一份简历的文本（已存在时覆盖），返回记录偏移"""
+        name_bytes, text_bytes = name.encode('utf-8'), text.encode('utf-8')
+        record = RECORD_HEADER.pack(len(name_bytes), len(text_bytes)) + name_bytes + text_bytes
+        with _locked(self.path, 'ab') as data_file:
+            offset = data_file.seek(0, os.SEEK_END)
+            data_file.write(record)
+            data_file.flush()
+            # 先写数据再写索引：中途中断时下次打开由 _repair 补齐
+            with open(self.index_path, 'ab') as index_file:
+                index_file.write(INDEX_ENTRY.pack(name_hash(name), offset, len(record)))
+        return offset
+
+    def names(self) -> list:
+        """所有简历名（按写入顺序，覆盖过的取最新位置）"""
+        with self._lock:
+            self._load_index()
+            entries = sorted(self._index.values())
+            data = self._mapped(entries[-1][0] + entries[-1][1]) if entries else None
+            names = []
+            for offset, _ in entries:
+                name_len, _ = RECORD_HEADER.unpack_from(data, offset)
+                start = offset + RECORD_HEADER.size
+                names.append(bytes(data[start:start + name_len]).decode('utf-8'))
+            return names
+
+    def stats(self) -> dict:
+        """记录数、数据文件大小和可回收的字节数（被覆盖的旧记录）"""
+        with self._lock:
+            self._load_index()
+            live = sum(length for _, length in self._index.values())
+        size = os.path.getsize(self.path)
+        return {"resumes": len(self._index), "bytes": size, "reclaimable_bytes": size - len(MAGIC) - live}
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+
+_corpora = {}
+_corpora_lock = threading.Lock()
+
+
+def open_corpus(path: str = None) -> PackedCorpus:
+    """按路径复用已打开的语料（默认 RESUME_CORPUS_PACK），未配置时返回 None"""
+    path = path or pack_path()
+    if not path:
+        return None
+    key = os.path.abspath(path)
+    with _corpora_lock:
+        if key not in _corpora:
+            _corpora[key] = PackedCorpus(path)
+        return _corpora[key]
+
+
+def write_text(text_file: str, text: str) -> str:
+    """保存提取后的文本：配置了打包语料时追加到语料，否则写文本文件；返回 text_file"""
+    corpus = open_corpus()
+    if corpus is not None:
+        corpus.append(resume_id(text_file), text)
+        return str(text_file)
+    with open(text_file, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return str(text_file)
+
+
+def read_text(text_file: str) -> str:
+    """读取提取后的文本：优先从打包语料按简历名读取，语料中没有时读取文本文件"""
+    corpus = open_corpus()
+    if corpus is not None:
+        try:
+            return corpus.get(resume_id(text_file))
+        except KeyError:
+            pass
+    with open(text_file, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def text_exists(text_file: str) -> bool:
+    corpus = open_corpus()
+    return (corpus is not None and resume_id(text_file) in corpus) or os.path.exists(text_file)
+
+
+def text_size(text_file: str) -> int:
+    """文本字节数（用于估算处理成本）
+
+    Raises:
+        OSError: 语料和文件中都没有
+    """
+    corpus = open_corpus()
+    size = corpus.size_of(resume_id(text_file)) if corpus is not None else None
+    return size if size is not None else os.path.getsize(text_file)
+
+
+def list_text_files(directory: str = 'middles') -> list:
+    """directory 下的 *_extracted.txt 以及打包语料中的简历（以同样的路径表示），按路径排序"""
+    files = set(glob.glob(os.path.join(directory, f'*{TEXT_SUFFIX}')))
+    corpus = open_corpus()
+    if corpus is not None:
+        files.update(os.path.join(directory, f'{name}{TEXT_SUFFIX}') for name in corpus.names())
+    return sorted(files)
+
+
+def migrate(directory: str, path: str, remove: bool = False) -> int:
+    """把 directory 下已有的 *_extracted.txt 导入打包语料，返回导入的份数"""
+    corpus = PackedCorpus(path)
+    migrated = 0
+    for text_file in sorted(glob.glob(os.path.join(directory, f'*{TEXT_SUFFIX}'))):
+        with open(text_file, 'r', encoding='utf-8') as f:
+            text = f.read()
+        corpus.append(resume_id(text_file), text)
+        migrated += 1
+        if remove:
+            os.remove(text_file)
+    corpus.close()
+    return migrated
+
+
+def compact(path: str) -> dict:
+    """只保留每份简历的最新记录，重写数据文件和索引（先写临时文件再替换）"""
+    corpus = PackedCorpus(path)
+    tmp_path = path + '.compact'
+    with _locked(path, 'rb'):
+        with corpus._lock:
+            corpus._load_index()
+            entries = sorted(corpus._index.items(), key=lambda item: item[1][0])
+            before = os.path.getsize(path)
+            data = corpus._mapped(before)
+            with open(tmp_path, 'wb') as data_out, open(tmp_path + '.idx', 'wb') as index_out:
+                data_out.write(MAGIC)
+                for key, (offset, length) in entries:
+                    index_out.write(INDEX_ENTRY.pack(key, data_out.tell(), length))
+                    data_out.write(data[offset:offset + length])
+        corpus.close()
+        # 先替换索引再替换数据：等锁的写入方拿到旧数据文件的锁后会发现文件已被替换并重新打开；
+        # 读取方发现索引文件被替换后整体重新加载
+        os.replace(tmp_path + '.idx', path + '.idx')
+        os.replace(tmp_path, path)
+    return {"resumes": len(entries), "bytes_before": before, "bytes_after": os.path.getsize(path)}
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="打包语料管理")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('migrate', help="导入已有的 *_extracted.txt")
+    p.add_argument('directory')
+    p.add_argument('--pack', default=None, help="默认 <directory>/corpus.pack")
+    p.add_argument('--remove', action='store_true', help="导入后删除文本文件")
+    p = sub.add_parser('compact', help="清理被覆盖的旧记录")
+    p.add_argument('pack')
+    p = sub.add_parser('stats')
+    p.add_argument('pack')
+    p = sub.add_parser('cat', help="输出一份简历的文本")
+    p.add_argument('pack')
+    p.add_argument('name')
+    args = parser.parse_args()
+
+    if args.command == 'migrate':
+        path = args.pack or os.path.join(args.directory, 'corpus.pack')
+        count = migrate(args.directory, path, args.remove)
+        print(f"✓ 已导入 {count} 份到 {path}" + ("（已删除文本文件）" if args.remove else ""))
+        print(f"  设置 RESUME_CORPUS_PACK={path} 后提取和分析流程使用打包语料")
+    elif args.command == 'compact':
+        result = compact(args.pack)
+        print(f"✓ 压缩完成: {result['resumes']} 份，{result['bytes_before']} -> {result['bytes_after']} 字节")
+    elif args.command == 'stats':
+        print(PackedCorpus(args.pack).stats())
+    else:
+        try:
+            sys.stdout.write(PackedCorpus(args.pack).get(args.name))
+        except KeyError:
+            print(f"✗ 语料中没有: {args.name}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+PDF文本提取后端
+功能: 统一的PDF文本提取接口，pdfminer 为默认后端，安装了 pypdfium2 / pypdf 时可使用更快的本地后端；
+     auto 模式下先快速探测文档（页数、是否有文本层）再为每份文档选择后端，提取失败或内容过少时依次回退
+
+通过环境变量控制:
+    RESUME_PDF_BACKEND=pdfminer    后端：pdfminer / pypdfium2 / pypdf / auto（默认 pdfminer）
+    RESUME_PDF_PARALLEL_PAGES=20   页数达到该值的文档按页范围拆分、在多个进程中并行提取后按页序拼接（默认0，关闭）
+    RESUME_PDF_WORKERS=4           并行提取的进程数（默认CPU核数）
+    在守护进程中（不能再创建子进程）按页范围顺序提取；fork 出的子进程不沿用父进程的进程池
+
+各后端的吞吐量和文本保真度见 benchmark_pdf_backends.py
+"""
+
+import os
+import atexit
+import threading
+import multiprocessing
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+
+PDF_EXTRACTIONS = metrics.REGISTRY.counter('resume_pdf_extractions_total', '各PDF后端的提取结果（ok/fallback/errors）',
+                                           ('backend', 'result'))
+
+# 提取结果少于该字符数视为失败（与 unstructured_extractor 的检查一致）
+MIN_TEXT_CHARS = 50
+
+# auto 模式的优先顺序（从快到慢），pdfminer 始终作为最后的回退
+AUTO_ORDER = ('pypdfium2', 'pypdf', 'pdfminer')
+
+# 并行提取时每个页范围至少包含的页数（页数太少时进程间传输的开销超过收益）
+MIN_PAGES_PER_RANGE = 4
+
+_pool = None
+_pool_workers = 0
+_pool_pid = 0
+_pool_lock = threading.Lock()
+
+
+class PdfBackend:
+    """PDF文本提取后端；子类实现 page_count 和 extract_pages"""
+
+    name = ''
+    module = ''
+
+    def available(self) -> bool:
+        """依赖是否已安装（不导入模块）"""
+        return importlib.util.find_spec(self.module) is not None
+
+    def page_count(self, path: str) -> int:
+        raise NotImplementedError
+
+    def extract_pages(self, path: str, first: int = 0, last: int = None) -> list:
+        """
+        提取 [first, last) 页的文本
+
+        Returns:
+            每页一个字符串（换行统一为 \\n）
+        """
+        raise NotImplementedError
+
+    def extract(self, path: str) -> str:
+        """整份文档的文本，每页以换页符结尾（与 pdfminer 的 extract_text 一致）"""
+        return "".join(f"{page}\f" for page in self.extract_pages(path))
+
+    def probe_document(self, path: str) -> tuple:
+        """(页数, 第一页文本)"""
+        pages = self.page_count(path)
+        return pages, (self.extract_pages(path, 0, 1)[0] if pages else "")
+
+
+class PdfminerBackend(PdfBackend):
+    name = 'pdfminer'
+    module = 'pdfminer'
+
+    def page_count(self, path: str) -> int:
+        from pdfminer.pdfpage import PDFPage
+        with open(path, 'rb') as f:
+            return sum(1 for _ in PDFPage.get_pages(f))
+
+    def extract_pages(self, path: str, first: int = 0, last: int = None) -> list:
+        from pdfminer.high_level import extract_text
+        if last is None:
+            last = self.page_count(path)
+        # extract_text 在每页末尾加换页符，按换页符切回单页
+        text = extract_text(path, page_numbers=list(range(first, last)))
+        return text.split("\f")[:max(last - first, 0)]
+
+    def extract(self, path: str) -> str:
+        from pdfminer.high_level import extract_text
+        return extract_text(path)
+
+
+class Pypdfium2Backend(PdfBackend):
+    name = 'pypdfium2'
+    module = 'pypdfium2'
+
+    def page_count(self, path: str) -> int:
+        import pypdfium2
+        document = pypdfium2.PdfDocument(path)
+        try:
+            return len(document)
+        finally:
+            document.close()
+
+    @staticmethod
+    def _page_text(document, index: int) -> str:
+        page = document[index]
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range().replace("\r\n", "\n").replace("\r", "\n")
+        finally:
+            textpage.close()
+            page.close()
+
+    def extract_pages(self, path: str, first: int = 0, last: int = None) -> list:
+        import pypdfium2
+        document = pypdfium2.PdfDocument(path)
+        try:
+            last = len(document) if last is None else min(last, len(document))
+            return [self._page_text(document, index) for index in range(first, last)]
+        finally:
+            document.close()
+
+    def probe_document(self, path: str) -> tuple:
+        import pypdfium2
+        document = pypdfium2.PdfDocument(path)
+        try:
+            return len(document), (self._page_text(document, 0) if len(document) else "")
+        finally:
+            document.close()
+
+
+class PypdfBackend(PdfBackend):
+    name = 'pypdf'
+    module = 'pypdf'
+
+    def page_count(self, path: str) -> int:
+        from pypdf import PdfReader
+        return len(PdfReader(path).pages)
+
+    def extract_pages(self, path: str, first: int = 0, last: int = None) -> list:
+        from pypdf import PdfReader
+        pages = PdfReader(path).pages
+        last = len(pages) if last is None else min(last, len(pages))
+        return [(pages[index].extract_text() or "").replace("\r\n", "\n") for index in range(first, last)]
+
+
+BACKENDS = {backend.name: backend for backend in (PdfminerBackend(), Pypdfium2Backend(), PypdfBackend())}
+
+
+def get_backend(name: str) -> PdfBackend:
+    """
+    Raises:
+        ValueError: 未知的后端或依赖未安装
+    """
+    backend = BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"未知的PDF后端: {name}（可选 {', '.join(BACKENDS)}、auto）")
+    if not backend.available():
+        raise ValueError(f"PDF后端 {name} 的依赖 {backend.module} 未安装")
+    return backend
+
+
+def available_backends() -> list:
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+
+def backend_mode() -> str:
+    return os.getenv('RESUME_PDF_BACKEND', 'pdfminer')
+
+
+def probe(path: str) -> dict:
+    """
+    快速探测文档：页数和第一页是否有文本层（用最快的可用后端，只读第一页）
+
+    Returns:
+        {"pages", "text_layer", "size_bytes", "probe_backend"}；探测失败时 pages 为 None
+    """
+    info = {"pages": None, "text_layer": None, "size_bytes": os.path.getsize(path), "probe_backend": None}
+    for name in AUTO_ORDER:
+        backend = BACKENDS[name]
+        if not backend.available():
+            continue
+        try:
+            info["pages"], first_page = backend.probe_document(path)
+            info["text_layer"] = len(first_page.strip()) >= 10
+            info["probe_backend"] = name
+            return info
+        except Exception:
+            continue
+    return info
+
+
+def select_backend(info: dict) -> str:
+    """
+    根据探测结果选择后端：探测失败或没有文本层（扫描件）时用 pdfminer，否则用最快的可用后端
+    """
+    if not info.get("pages") or not info.get("text_layer"):
+        return 'pdfminer'
+    for name in AUTO_ORDER:
+        if BACKENDS[name].available():
+            return name
+    return 'pdfminer'
+
+
+def fallback_chain(first: str) -> list:
+    """先用指定后端，失败后按 AUTO_ORDER 回退（只包含已安装的后端）"""
+    chain = [first] + [name for name in AUTO_ORDER if name != first]
+    return [name for name in chain if BACKENDS[name].available()]
+
+
+def parallel_threshold() -> int:
+    """页数达到该值时并行提取，0 表示关闭"""
+    return int(os.getenv('RESUME_PDF_PARALLEL_PAGES', '0') or 0)
+
+
+def parallel_workers() -> int:
+    return max(1, int(os.getenv('RESUME_PDF_WORKERS', '0') or 0) or os.cpu_count() or 1)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """进程池在第一次并行提取时创建，之后的文档复用；进程数变化或在 fork 出的子进程中时重建"""
+    global _pool, _pool_workers, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers or _pool_pid != os.getpid():
+            if _pool is not None and _pool_pid == os.getpid():
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _reset_after_fork():
+    """fork 出的子进程继承的进程池属于父进程，不能使用（否则提交的任务一直等到超时）"""
+    global _pool, _pool_workers, _pool_pid, _pool_lock
+    _pool, _pool_workers, _pool_pid = None, 0, 0
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+@atexit.register
+def shutdown_pool(wait: bool = False):
+    """关闭本进程创建的并行提取进程池；wait 时等子进程退出"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=wait, cancel_futures=True)
+        _pool = None
+
+
+def _extract_range(name: str, path: str, first: int, last: int) -> list:
+    """工作进程：提取一个页范围"""
+    return BACKENDS[name].extract_pages(path, first, last)
+
+
+def page_ranges(pages: int, workers: int) -> list:
+    """把 [0, pages) 拆成不超过 workers 个连续页范围，每个至少 MIN_PAGES_PER_RANGE 页"""
+    size = max(MIN_PAGES_PER_RANGE, -(-pages // workers))
+    return [(first, min(first + size, pages)) for first in range(0, pages, size)]
+
+
+def extract_parallel(path: str, name: str, pages: int, workers: int = None) -> str:
+    """
+    按页范围在多个进程中并行提取，按页序拼接（结果与 extract 相同，每页以换页符结尾）
+    """
+    workers = workers or parallel_workers()
+    ranges = page_ranges(pages, workers)
+    if len(ranges) < 2:
+        return BACKENDS[name].extract(path)
+    if multiprocessing.current_process().daemon:
+        # 守护进程不能创建子进程，在本进程中按页范围顺序提取
+        return "".join(f"{page}\f" for first, last in ranges for page in BACKENDS[name].extract_pages(path, first, last))
+    pool = _get_pool(workers)
+    futures = [pool.submit(_extract_range, name, path, first, last) for first, last in ranges]
+    # 按提交顺序取结果，页序与原文一致
+    return "".join(f"{page}\f" for future in futures for page in future.result())
+
+
+def _extract_with(name: str, path: str, pages: int = None) -> str:
+    """用一个后端提取；开启并行且页数达到阈值时按页范围并行"""
+    threshold = parallel_threshold()
+    if threshold > 0:
+        if pages is None:
+            pages = BACKENDS[name].page_count(path)
+        if pages >= threshold:
+            return extract_parallel(path, name, pages)
+    return BACKENDS[name].extract(path)
+
+
+def extract_text(path: str, backend: str = None) -> tuple:
+    """
+    提取PDF文本，失败或内容过少时回退到下一个后端
+
+    Args:
+        backend: 后端名或 auto，默认取 RESUME_PDF_BACKEND
+
+    Returns:
+        (文本, 实际使用的后端名)
+
+    Raises:
+        ValueError: 所有后端都失败
+    """
+    mode = backend or backend_mode()
+    pages = None
+    if mode == 'auto':
+        info = probe(path)
+        first, pages = select_backend(info), info["pages"]
+    else:
+        first = get_backend(mode).name
+
+    errors = []
+    for name in fallback_chain(first):
+        try:
+            text = _extract_with(name, path, pages)
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+            PDF_EXTRACTIONS.inc(backend=name, result='errors')
+            print(f"  ⚠️ PDF后端 {name} 提取失败，尝试下一个: {e}")
+            continue
+        if text and len(text.strip()) >= MIN_TEXT_CHARS:
+            PDF_EXTRACTIONS.inc(backend=name, result='ok' if name == first else 'fallback')
+            return text, name
+        errors.append(f"{name}: 内容过少（{len(text.strip()) if text else 0} 字符）")
+        PDF_EXTRACTIONS.inc(backend=name, result='errors')
+    raise ValueError(f"所有PDF后端都未能提取到足够的文本: {'; '.join(errors)}")
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+优先级通道
+功能: 把工作分为三个通道：interactive（招聘人员等待中的单份简历）、normal、backfill（大批量回填），
+     - 工作队列为 interactive 通道保留工作线程，其余线程按通道优先级取任务
+     - LLM并发控制器为 interactive 通道保留并发名额，高优先级请求排队时低优先级请求让行
+     - 排队超过老化时间的任务每过一个老化周期提升一级，低优先级通道不会被饿死
+     - 每个通道单独记录排队等待、LLM名额等待和端到端耗时指标
+
+通过环境变量控制:
+    RESUME_LANE=normal                 当前进程默认通道（run_final_analysis.py 的分析步骤为 interactive）
+    RESUME_LANE_RESERVED_WORKERS=1     工作队列中只处理 interactive 任务的线程数
+    RESUME_LANE_RESERVED_LLM=1         本进程有 interactive 请求在等待或在途时，每个服务商为其保留的LLM并发名额
+                                       （保留按进程计算；没有 interactive 请求时其他通道使用整个窗口）
+    RESUME_LANE_AGING=30               老化周期（秒），0 表示不老化
+
+使用方法（同一进程内共享LLM并发控制器，批量回填进行中插入的单份简历优先处理）:
+    python priority_lanes.py final_comprehensive --backfill middles/*_extracted.txt --interactive new_extracted.txt
+    结果与 batch_scheduler.py 相同，保存为 outs/<简历名>_<阶段>.json（或按 RESUME_OUTPUT_NDJSON 追加到NDJSON流）
+
+与不分通道时的 interactive 延迟对比见 benchmark_priority_lanes.py
+"""
+
+import os
+import sys
+import time
+import argparse
+import itertools
+import threading
+import contextlib
+import contextvars
+from collections import deque
+from concurrent.futures import Future
+
+import metrics
+
+LANES = ('interactive', 'normal', 'backfill')
+
+LANE_WAIT = metrics.REGISTRY.histogram('resume_lane_queue_wait_seconds', '各通道任务在工作队列中的等待时间', ('lane',))
+LANE_LLM_WAIT = metrics.REGISTRY.histogram('resume_lane_llm_wait_seconds', '各通道LLM请求等待并发名额的时间', ('lane',))
+LANE_SECONDS = metrics.REGISTRY.histogram('resume_lane_duration_seconds', '各通道任务从提交到完成的耗时', ('lane',))
+LANE_DEPTH = metrics.REGISTRY.gauge('resume_lane_queue_depth', '各通道排队中的任务数', ('lane',))
+LANE_TASKS = metrics.REGISTRY.counter('resume_lane_tasks_total', '各通道完成的任务数', ('lane', 'status'))
+
+_current_lane = contextvars.ContextVar('lane', default=None)
+
+
+def lane_rank(lane: str) -> int:
+    """通道的优先级（0最高）"""
+    try:
+        return LANES.index(lane)
+    except ValueError:
+        raise ValueError(f"未知的通道: {lane}（可选 {'/'.join(LANES)}）") from None
+
+
+def current_lane() -> str:
+    """当前上下文的通道；未设置时取 RESUME_LANE，默认 normal"""
+    return _current_lane.get() or os.getenv('RESUME_LANE', 'normal')
+
+
+@contextlib.contextmanager
+def lane_scope(lane: str):
+    """在该上下文中发出的LLM请求使用指定通道"""
+    lane_rank(lane)
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def aging_seconds() -> float:
+    return float(os.getenv('RESUME_LANE_AGING', '30'))
+
+
+def reserved_llm_slots() -> int:
+    return int(os.getenv('RESUME_LANE_RESERVED_LLM', '1'))
+
+
+def effective_rank(rank: int, waited: float, aging: float) -> int:
+    """排队 waited 秒后的优先级：每过一个老化周期提升一级"""
+    if aging <= 0:
+        return rank
+    return max(0, rank - int(waited // aging))
+
+
+class _Task:
+    __slots__ = ('lane', 'rank', 'seq', 'submitted', 'func', 'args', 'kwargs', 'future')
+
+    def __init__(self, lane, seq, func, args, kwargs):
+        self.lane = lane
+        self.rank = lane_rank(lane)
+        self.seq = seq
+        self.submitted = time.monotonic()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+
+class PriorityWorkQueue:
+    """
+    带优先级通道的工作线程池
+
+    reserved 个线程只处理 interactive 任务；其余线程每次取（老化后）优先级最高、提交最早的任务
+    """
+
+    def __init__(self, workers: int = 4, reserved: int = 1, aging: float = None, name: str = 'lanes'):
+        if workers < 1:
+            raise ValueError(f"工作线程数必须大于0: {workers}")
+        self.workers = workers
+        self.reserved = max(0, min(reserved, workers - 1))
+        self.aging = aging_seconds() if aging is None else aging
+        self._queues = {lane: deque() for lane in LANES}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._closed = False
+        self.stats = {lane: {'submitted': 0, 'completed': 0, 'failed': 0} for lane in LANES}
+        self._threads = [
+            threading.Thread(target=self._work, args=(index < self.reserved,), name=f"{name}-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @classmethod
+    def from_env(cls, workers: int = 4, **overrides) -> 'PriorityWorkQueue':
+        reserved = int(os.getenv('RESUME_LANE_RESERVED_WORKERS', '1'))
+        return cls(workers, overrides.pop('reserved', reserved), **overrides)
+
+    def submit(self, func, *args, lane: str = 'normal', **kwargs) -> Future:
+        """提交任务，返回 Future；任务在 lane_scope(lane) 中执行"""
+        task = _Task(lane, next(self._seq), func, args, kwargs)
+        with self._cond:
+            if self._closed:
+                raise ValueError("工作队列已关闭")
+            self._queues[lane].append(task)
+            self.stats[lane]['submitted'] += 1
+            LANE_DEPTH.set(len(self._queues[lane]), lane=lane)
+            self._cond.notify_all()
+        return task.future
+
+    def _pick(self, interactive_only: bool):
+        """取出下一个任务（调用时持有锁），没有可处理的任务时返回 None"""
+        if interactive_only:
+            queue = self._queues['interactive']
+            return queue.popleft() if queue else None
+        now = time.monotonic()
+        best = None
+        for lane in LANES:
+            queue = self._queues[lane]
+            if not queue:
+                continue
+            head = queue[0]
+            key = (effective_rank(head.rank, now - head.submitted, self.aging), head.seq)
+            if best is None or key < best[0]:
+                best = (key, lane)
+        return self._queues[best[1]].popleft() if best else None
+
+    def _work(self, interactive_only: bool):
+        while True:
+            with self._cond:
+                task = self._pick(interactive_only)
+                while task is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    task = self._pick(interactive_only)
+                LANE_DEPTH.set(len(self._queues[task.lane]), lane=task.lane)
+
+            if not task.future.set_running_or_notify_cancel():
+                continue
+            LANE_WAIT.observe(time.monotonic() - task.submitted, lane=task.lane)
+            try:
+                with lane_scope(task.lane):
+                    result = task.func(*task.args, **task.kwargs)
+            except BaseException as e:
+                status = 'failed'
+                task.future.set_exception(e)
+            else:
+                status = 'completed'
+                task.future.set_result(result)
+            LANE_SECONDS.observe(time.monotonic() - task.submitted, lane=task.lane)
+            LANE_TASKS.inc(lane=task.lane, status=status)
+            with self._cond:
+                self.stats[task.lane][status] += 1
+
+    def snapshot(self) -> dict:
+        """各通道的排队数和完成情况"""
+        with self._cond:
+            return {lane: dict(self.stats[lane], queued=len(self._queues[lane])) for lane in LANES}
+
+    def shutdown(self, wait: bool = True):
+        """不再接受新任务；已提交的任务处理完后线程退出"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def main():
+    """主函数"""
+    import batch_scheduler
+    parser = argparse.ArgumentParser(description="按优先级通道分析简历")
+    parser.add_argument('stage', choices=list(batch_scheduler.STAGES))
+    for lane in LANES:
+        parser.add_argument(f'--{lane}', nargs='*', default=[], metavar='FILE', help=f"{lane} 通道的 *_extracted.txt")
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    metrics.start_from_env()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    module_name, class_name, method_name = batch_scheduler.STAGES[args.stage]
+    formatter = getattr(__import__(module_name), class_name)()
+    analyze = getattr(formatter, method_name)
+
+    def process(path: str) -> str:
+        """分析并保存一份简历（与 batch_scheduler 相同的输出位置），返回结果写入的位置"""
+        return batch_scheduler.save_stage_result(path, args.stage, analyze(path))
+
+    submitted = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), \
+            PriorityWorkQueue.from_env(args.workers) as queue:
+        for lane in LANES:
+            # 同一通道内按成本从大到小提交
+            for path in batch_scheduler.lpt_order(getattr(args, lane), batch_scheduler.text_cost):
+                record = {"lane": lane, "path": path, "submitted": time.monotonic()}
+                record["future"] = queue.submit(process, path, lane=lane)
+                record["future"].add_done_callback(lambda _, record=record: record.update(done=time.monotonic()))
+                submitted.append(record)
+
+    failed = 0
+    latencies = {lane: [] for lane in LANES}
+    for record in submitted:
+        name, lane, error = os.path.basename(record["path"]), record["lane"], record["future"].exception()
+        seconds = record["done"] - record["submitted"]
+        latencies[lane].append(seconds)
+        if error is not None:
+            failed += 1
+            print(f"✗ [{lane}] {name}: {type(error).__name__}: {error}")
+        else:
+            print(f"✓ [{lane}] {name} ({seconds:.1f}s) -> {record['future'].result()}")
+    print(f"\n完成 {len(submitted) - failed}，失败 {failed}")
+    for lane, values in latencies.items():
+        if values:
+            print(f"  {lane}: {len(values)} 份，平均 {sum(values) / len(values):.1f}s，最慢 {max(values):.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+前缀稳定的提示布局
+功能: 把系统提示、schema、few-shot 示例等静态部分组织成同一格式化器每次调用都逐字节相同的前缀，
+     简历文本放在最后，最大化 DeepSeek 等服务商的上下文缓存（KV cache）命中
+
+langextract 组装的提示依次为: prompt_description、示例（Q/A）、待抽取文本（Q），
+但 OpenAI 兼容模型会丢弃 system_prompt，长简历还会被切成约1000字符的多个分块、每块重复发送前缀。
+前缀稳定模式下:
+    - system_prompt 规范化后并入 prompt_description，真正发送给模型，且位于前缀中
+    - schema 以固定格式的 JSON 序列化，保证逐字节一致
+    - 整份简历作为一个分块发送（上限 RESUME_PROMPT_MAX_CHARS），每份简历只发送一次前缀
+
+通过环境变量控制:
+    RESUME_PROMPT_LAYOUT=prefix_stable   开启前缀稳定模式（默认 default，保持 langextract 原有布局）
+    RESUME_PROMPT_MAX_CHARS=20000        前缀稳定模式下单个分块的字符上限
+"""
+
+import os
+import json
+import functools
+
+import metrics
+
+PROMPT_CACHE_TOKENS = metrics.REGISTRY.counter('resume_llm_prompt_cache_tokens_total',
+                                               '服务商上下文缓存命中/未命中的提示token数', ('provider', 'result'))
+
+PREFIX_STABLE = 'prefix_stable'
+
+
+def layout_mode() -> str:
+    """当前提示布局模式"""
+    return os.getenv('RESUME_PROMPT_LAYOUT', 'default')
+
+
+def canonical_schema(schema) -> str:
+    """schema 的规范化 JSON（保持字段顺序，固定分隔符，不转义中文）"""
+    if isinstance(schema, str):
+        return schema.strip()
+    return json.dumps(schema, ensure_ascii=False, separators=(',', ':'))
+
+
+def normalize_text(text: str) -> str:
+    """去掉每行首尾空白和多余空行，消除三引号字符串缩进带来的差异"""
+    lines = [line.strip() for line in (text or '').strip().splitlines()]
+    return '\n'.join(line for i, line in enumerate(lines) if line or (i > 0 and lines[i - 1]))
+
+
+@functools.lru_cache(maxsize=64)
+def _build_description(schema_json: str, system_prompt: str) -> str:
+    parts = []
+    if system_prompt:
+        parts.append(normalize_text(system_prompt))
+    parts.append('按以下schema抽取信息，抽取类别名为"一级字段_二级字段"，抽取内容使用原文：')
+    parts.append(schema_json)
+    return '\n\n'.join(parts)
+
+
+def build_description(schema, system_prompt: str = None) -> str:
+    """
+    构建前缀稳定的 prompt_description（系统提示 + schema）
+
+    相同的 schema 和系统提示总是得到同一个字符串对象
+    """
+    return _build_description(canonical_schema(schema), normalize_text(system_prompt) if system_prompt else '')
+
+
+def extract_kwargs(schema, system_prompt: str = None) -> dict:
+    """
+    返回传给 lx.extract 的布局相关参数
+
+    Returns:
+        {"prompt_description": ..., ...}；默认布局下与原来的调用方式一致
+    """
+    if layout_mode() != PREFIX_STABLE:
+        return {'prompt_description': schema}
+    return {
+        'prompt_description': build_description(schema, system_prompt),
+        'max_char_buffer': int(os.getenv('RESUME_PROMPT_MAX_CHARS', '20000')),
+    }
+
+
+def cache_usage(usage) -> tuple:
+    """
+    从响应的 usage 中读取提示缓存命中/未命中的token数
+
+    DeepSeek 返回 prompt_cache_hit_tokens / prompt_cache_miss_tokens，
+    OpenAI 兼容接口（如 Qwen）返回 prompt_tokens_details.cached_tokens
+
+    Returns:
+        (命中token数, 未命中token数)，服务商未返回时为 (None, None)
+    """
+    if usage is None:
+        return None, None
+    hit = getattr(usage, 'prompt_cache_hit_tokens', None)
+    miss = getattr(usage, 'prompt_cache_miss_tokens', None)
+    if hit is None:
+        details = getattr(usage, 'prompt_tokens_details', None)
+        hit = getattr(details, 'cached_tokens', None) if details is not None else None
+        if hit is not None:
+            miss = max(0, (getattr(usage, 'prompt_tokens', 0) or 0) - hit)
+    if hit is None:
+        return None, None
+    return int(hit), int(miss or 0)
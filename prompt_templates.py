@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+预编译的提示模板注册表
+功能: 各格式化器的抽取schema、few-shot示例和系统提示只在导入时构建一次，之后每份简历直接复用，
+     不再逐份重建 schema 字典、示例文本和几十个 Extraction 对象
+
+模板不可变（schema 为只读字典，示例为元组），可以在线程间共享；
+指纹由模板全部内容计算，内容不变时在不同进程（如 spawn 的工作进程）中也相同，可作为缓存键的一部分。
+langextract 的 ExampleData 在第一次使用时才构建（保持导入轻量），示例对齐校验也只在那时做一次。
+"""
+
+import json
+import hashlib
+import functools
+import threading
+
+_REGISTRY = {}
+_registry_lock = threading.Lock()
+
+
+class FrozenDict(dict):
+    """只读字典；repr 和 JSON 序列化与普通字典相同，传给 langextract 的提示不变"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("提示模板的 schema 不可修改")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __hash__(self):
+        return hash(json.dumps(self, ensure_ascii=False, sort_keys=True))
+
+
+def schema_fields(schema: dict, prefix: str = '') -> tuple:
+    """把嵌套schema展开为抽取类别名，如 {"技术能力分析": {"核心技术栈": ...}} -> ("技术能力分析_核心技术栈",)"""
+    fields = []
+    for key, value in schema.items():
+        name = f"{prefix}_{key}" if prefix else key
+        if isinstance(value, dict):
+            fields.extend(schema_fields(value, name))
+        else:
+            fields.append(name)
+    return tuple(fields)
+
+
+def prune_schema(schema: dict, fields: set, prefix: str = '') -> dict:
+    """只保留 fields 中的字段（及其上级）的schema"""
+    pruned = {}
+    for key, value in schema.items():
+        name = f"{prefix}_{key}" if prefix else key
+        if isinstance(value, dict):
+            child = prune_schema(value, fields, name)
+            if child:
+                pruned[key] = child
+        elif name in fields:
+            pruned[key] = value
+    return pruned
+
+
+def freeze(value):
+    """递归转换为不可变结构（dict -> FrozenDict，list -> tuple）"""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class PromptTemplate:
+    """
+    一组抽取提示: schema、示例文本、示例抽取结果（(类别, 原文) 元组）和系统提示
+
+    创建后不可修改
+    """
+
+    __slots__ = ('name', 'schema', 'example_text', 'extractions', 'system_prompt', 'fingerprint',
+                 'fields', 'schema_version', '_examples', '_lock')
+
+    def __init__(self, name: str, schema: dict, example_text: str, extractions, system_prompt: str = None):
+        set_attr = object.__setattr__
+        set_attr(self, 'name', name)
+        set_attr(self, 'schema', freeze(schema))
+        set_attr(self, 'example_text', example_text)
+        set_attr(self, 'extractions', tuple((str(cls), str(txt)) for cls, txt in extractions))
+        set_attr(self, 'system_prompt', system_prompt)
+        set_attr(self, '_examples', None)
+        set_attr(self, '_lock', threading.Lock())
+
+        payload = json.dumps([name, self.schema, example_text, self.extractions, system_prompt],
+                             ensure_ascii=False, separators=(',', ':'))
+        set_attr(self, 'fingerprint', hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16])
+        # schema版本只由字段决定，修改示例或系统提示不会让已存储的结果需要补抽
+        set_attr(self, 'fields', schema_fields(self.schema))
+        set_attr(self, 'schema_version', hashlib.sha256(
+            json.dumps(self.schema, ensure_ascii=False, separators=(',', ':')).encode('utf-8')).hexdigest()[:12])
+
+    def __setattr__(self, key, value):
+        raise AttributeError("提示模板不可修改")
+
+    def __repr__(self):
+        return f"PromptTemplate({self.name!r}, fingerprint={self.fingerprint!r})"
+
+    @property
+    def examples(self) -> tuple:
+        """
+        langextract 的示例（第一次访问时构建并做一次示例对齐校验，之后直接返回同一个元组）
+        """
+        if self._examples is None:
+            with self._lock:
+                if self._examples is None:
+                    object.__setattr__(self, '_examples', self._build_examples())
+        return self._examples
+
+    def _build_examples(self) -> tuple:
+        from langextract.data import ExampleData, Extraction
+        from langextract import prompt_validation
+
+        examples = (ExampleData(text=self.example_text, extractions=[
+            Extraction(extraction_class=cls, extraction_text=txt) for cls, txt in self.extractions
+        ]),)
+        report = prompt_validation.validate_prompt_alignment(examples=list(examples))
+        prompt_validation.handle_alignment_report(report, level=prompt_validation.PromptValidationLevel.WARNING)
+        return examples
+
+    def subset(self, fields) -> 'PromptTemplate':
+        """
+        只包含指定字段的精简模板（schema和示例抽取都只保留这些字段），用于给已存储的结果补抽新增字段；
+        示例中没有这些字段时保留完整示例，保证至少有一个示例
+        """
+        return _subset(self, tuple(sorted(set(fields) & set(self.fields))))
+
+    def cache_key(self, *parts: str) -> str:
+        """以模板指纹为前缀的缓存键，例如 template.cache_key(简历文本, 服务商)"""
+        digest = hashlib.sha256(self.fingerprint.encode('utf-8'))
+        for part in parts:
+            digest.update(b'\0')
+            digest.update(str(part).encode('utf-8'))
+        return f"{self.name}:{digest.hexdigest()[:32]}"
+
+
+@functools.lru_cache(maxsize=128)
+def _subset(template: PromptTemplate, fields: tuple) -> PromptTemplate:
+    if not fields:
+        raise ValueError(f"模板 {template.name} 中没有要补抽的字段")
+    wanted = set(fields)
+    extractions = [(cls, txt) for cls, txt in template.extractions if cls in wanted] or template.extractions
+    return PromptTemplate(f"{template.name}[{','.join(fields)}]", prune_schema(template.schema, wanted),
+                          template.example_text, extractions, template.system_prompt)
+
+
+def register(template: PromptTemplate) -> PromptTemplate:
+    """
+    注册模板；同名同指纹时返回已注册的模板（模块被重复导入时保持同一个对象）
+
+    Raises:
+        ValueError: 同名模板已注册且内容不同
+    """
+    with _registry_lock:
+        existing = _REGISTRY.get(template.name)
+        if existing is not None:
+            if existing.fingerprint != template.fingerprint:
+                raise ValueError(f"提示模板 {template.name} 已注册且内容不同")
+            return existing
+        _REGISTRY[template.name] = template
+        return template
+
+
+def get(name: str) -> PromptTemplate:
+    """
+    按名称获取模板
+
+    Raises:
+        ValueError: 模板未注册
+    """
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"未注册的提示模板: {name}") from None
+
+
+def templates() -> dict:
+    """已注册模板的 名称 -> 指纹"""
+    with _registry_lock:
+        return {name: template.fingerprint for name, template in _REGISTRY.items()}
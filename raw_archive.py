@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+原始分析结果归档
+功能: 每次分析都把LLM返回的原始维度（analysis_data / structured_data）与最终结果一起保存，
+     调整标签规则后可以用 retag.py 直接从归档重新生成Excel字段，不必重新调用LLM
+
+归档路径: <RESUME_RAW_ARCHIVE_DIR>/<阶段>/<简历名>.json（默认 outs/raw），RESUME_RAW_ARCHIVE=0 关闭
+"""
+
+import os
+import json
+from pathlib import Path
+from datetime import datetime
+
+import output_writer
+
+ARCHIVE_VERSION = 1
+
+
+def archive_enabled() -> bool:
+    return os.getenv('RESUME_RAW_ARCHIVE', '1').lower() not in ('0', 'false', 'no')
+
+
+def archive_root() -> str:
+    return os.getenv('RESUME_RAW_ARCHIVE_DIR', 'outs/raw')
+
+
+def archive_path(stage: str, resume_id: str, root: str = None) -> Path:
+    return Path(root or archive_root()) / stage / f"{resume_id}.json"
+
+
+def save_raw(stage: str, resume_id: str, record: dict, root: str = None) -> str:
+    """
+    保存一份简历的原始分析数据（output_writer 原子写入，中断时不会留下半个文件）
+
+    Args:
+        stage: 阶段名，如 final_comprehensive
+        resume_id: 简历名（文本文件名去掉 _extracted）
+        record: 原始数据，如 {"basic_info": ..., "analysis_data": ..., "result": ...}
+
+    Returns:
+        归档文件路径；归档关闭时返回 None
+    """
+    if not archive_enabled():
+        return None
+    path = archive_path(stage, resume_id, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": ARCHIVE_VERSION,
+        "stage": stage,
+        "resume_id": resume_id,
+        "archived_at": datetime.now().isoformat(timespec="seconds"),
+        **record,
+    }
+    return output_writer.write_json(str(path), data)
+
+
+def load_raw(path: str) -> dict:
+    """
+    读取一份归档
+
+    Raises:
+        ValueError: 文件不是有效的归档
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or 'stage' not in data:
+        raise ValueError(f"不是有效的原始分析归档: {path}")
+    return data
+
+
+def list_raw(stage: str, root: str = None) -> list:
+    """某个阶段的所有归档文件（按文件名排序）"""
+    directory = Path(root or archive_root()) / stage
+    if not directory.is_dir():
+        return []
+    return sorted(str(p) for p in directory.glob('*.json'))
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+LLM调用的容错策略
+功能: 单次请求超时、单份简历的总截止时间（deadline）、带抖动的指数退避重试，
+     以及熔断器——服务端持续故障时快速失败，避免工作线程堆积在注定失败的请求上
+
+通过环境变量控制:
+    RESUME_LLM_TIMEOUT=60           单次请求超时（秒）
+    RESUME_LLM_MAX_ATTEMPTS=4       单次请求最多尝试次数（含第一次）
+    RESUME_DEADLINE_SECONDS=300     单份简历的总截止时间（秒）
+    RESUME_BREAKER_THRESHOLD=5      连续失败多少次后熔断
+    RESUME_BREAKER_RESET=30         熔断后多久放行一次试探请求（秒）
+"""
+
+import os
+import time
+import random
+import threading
+import contextlib
+import contextvars
+
+import metrics
+
+RETRIES = metrics.REGISTRY.counter('resume_llm_retries_total', 'LLM请求重试次数', ('provider', 'outcome'))
+BREAKER_STATE = metrics.REGISTRY.gauge('resume_llm_breaker_state', '熔断器状态（0关闭 1半开 2打开）', ('provider',))
+FAST_FAILS = metrics.REGISTRY.counter('resume_llm_fast_fail_total', '因熔断或截止时间而未发出的请求数', ('provider', 'reason'))
+
+_deadline = contextvars.ContextVar('resume_deadline', default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """单份简历的处理时间超过截止时间"""
+
+
+class CircuitOpenError(ConnectionError):
+    """熔断器打开，请求被直接拒绝"""
+
+
+def default_call_timeout() -> float:
+    return float(os.getenv('RESUME_LLM_TIMEOUT', '60'))
+
+
+@contextlib.contextmanager
+def resume_deadline(seconds: float = None):
+    """
+    为一份简历设置总截止时间，可作为上下文管理器或装饰器使用
+
+    嵌套时取更早的截止时间，内层不会放宽外层的限制
+    """
+    if seconds is None:
+        seconds = float(os.getenv('RESUME_DEADLINE_SECONDS', '300'))
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> float:
+    """当前的截止时间（time.monotonic 时间），没有时返回 None"""
+    return _deadline.get()
+
+
+def remaining(deadline: float = None) -> float:
+    """距截止时间的剩余秒数，没有截止时间时返回 None"""
+    if deadline is None:
+        deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class RetryPolicy:
+    """带全抖动（full jitter）的指数退避重试策略"""
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 20.0,
+                 retryable: tuple = ('throttle', 'server', 'timeout'), rng: random.Random = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def from_env(cls) -> 'RetryPolicy':
+        return cls(max_attempts=int(os.getenv('RESUME_LLM_MAX_ATTEMPTS', '4')))
+
+    def should_retry(self, outcome: str, attempt: int) -> bool:
+        """attempt 从0开始计数"""
+        return outcome in self.retryable and attempt + 1 < self.max_attempts
+
+    def delay(self, attempt: int, retry_after: float = 0.0) -> float:
+        """第 attempt 次失败后的等待时间；服务端给出 Retry-After 时不少于该值"""
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return max(self.rng.uniform(0, cap), retry_after)
+
+
+class CircuitBreaker:
+    """
+    连续失败计数熔断器
+
+    - closed: 正常放行，连续 failure_threshold 次失败后转为 open
+    - open: 直接拒绝，reset_timeout 秒后转为 half_open
+    - half_open: 只放行一个试探请求，成功则关闭，失败则重新打开
+    """
+
+    STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+    def __init__(self, name: str = 'llm', failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        BREAKER_STATE.set(0, provider=name)
+
+    @classmethod
+    def from_env(cls, name: str) -> 'CircuitBreaker':
+        return cls(name, failure_threshold=int(os.getenv('RESUME_BREAKER_THRESHOLD', '5')),
+                   reset_timeout=float(os.getenv('RESUME_BREAKER_RESET', '30')))
+
+    def _set_state(self, state: str):
+        self.state = state
+        BREAKER_STATE.set(self.STATES[state], provider=self.name)
+
+    def before_call(self):
+        """
+        请求前检查
+
+        Raises:
+            CircuitOpenError: 熔断器打开，或半开状态下已有试探请求
+        """
+        with self._lock:
+            if self.state == 'open':
+                wait = self.opened_at + self.reset_timeout - time.monotonic()
+                if wait > 0:
+                    raise CircuitOpenError(f"{self.name} 熔断中，{wait:.1f}秒后重试")
+                self._set_state('half_open')
+            if self.state == 'half_open':
+                if self._probe_in_flight:
+                    raise CircuitOpenError(f"{self.name} 熔断半开，正在试探")
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            if self.state != 'closed':
+                self._set_state('closed')
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state('open')
+
+    def release(self):
+        """请求结果与服务端健康无关（如4xx）时调用，只释放试探名额"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {'state': self.state, 'consecutive_failures': self.failures}
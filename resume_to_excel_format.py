@@ -5,10 +5,14 @@
 
 import os
 import json
-import pandas as pd
 from datetime import datetime
 import sys
 
+import date_normalization
+import packed_corpus
+from metrics import start_from_env, track_export
+from tracing import span
+
 # 直接导入现有的模块
 sys.path.append('.')
 try:
@@ -25,7 +29,7 @@ def run_unstructured_extraction(pdf_file):
     # 直接调用函数
     try:
         output_file = extract_pdf_with_unstructured(pdf_file)
-        if output_file and os.path.exists(output_file):
+        if output_file and packed_corpus.text_exists(output_file):
             print(f"unstructured提取完成，输出文件: {output_file}")
             return output_file
         else:
@@ -137,22 +141,8 @@ def infer_department(data):
 
 def format_birth_date(age_str):
     """根据年龄推算出生日期"""
-    if not age_str:
-        return ""
-    
-    try:
-        # 提取年龄数字
-        import re
-        age_match = re.search(r'(\d+)', age_str)
-        if age_match:
-            age = int(age_match.group(1))
-            current_year = datetime.now().year
-            birth_year = current_year - age
-            # 假设生日在年中
-            return f"{birth_year}-06-15"
-    except:
-        pass
-    return ""
+    # 假设生日在年中
+    return date_normalization.birth_date_from_age(age_str, month_day="06-15")
 
 def mask_phone(phone):
     """手机号脱敏处理"""
@@ -234,61 +224,23 @@ def get_work_start_date(work_exp_list):
         return ""
     
     # 找到最早的工作开始时间
-    earliest_date = None
-    for exp in work_exp_list:
-        start_date = exp.get("开始时间", "")
-        if start_date:
-            try:
-                from dateutil import parser
-                parsed_date = parser.parse(start_date)
-                if earliest_date is None or parsed_date < earliest_date:
-                    earliest_date = parsed_date
-            except:
-                continue
-    
-    return earliest_date.strftime("%Y-%m-%d") if earliest_date else ""
+    return date_normalization.earliest_date(exp.get("开始时间", "") for exp in work_exp_list)
 
 def calculate_work_years(data):
     """计算工作经验年数"""
     # 优先使用求职信息中的工作时长
     work_duration = data.get("求职信息", {}).get("工作时长", "")
     if work_duration:
-        import re
-        years_match = re.search(r'(\d+)', work_duration)
-        if years_match:
-            return int(years_match.group(1))
+        years = date_normalization.extract_int(work_duration)
+        if years is not None:
+            return years
     
-    # 如果没有，则根据工作经历计算
+    # 如果没有，则根据工作经历计算，时间范围如 "2022.07-2024.08"、"2022.07-至今"
     work_exp_list = data.get("工作经历", [])
     if not work_exp_list:
         return 0
     
-    total_months = 0
-    for exp in work_exp_list:
-        work_time = exp.get("工作时间", "")
-        
-        if work_time:
-            try:
-                from dateutil import parser
-                # 解析时间范围，如 "2022.07-2024.08"
-                if "-" in work_time:
-                    start_str, end_str = work_time.split("-", 1)
-                    start_str = start_str.strip()
-                    end_str = end_str.strip()
-                    
-                    # 处理"至今"的情况
-                    if "至今" in end_str:
-                        end_str = datetime.now().strftime("%Y.%m")
-                    
-                    start = parser.parse(start_str.replace(".", "-"))
-                    end = parser.parse(end_str.replace(".", "-"))
-                    
-                    months = (end.year - start.year) * 12 + (end.month - start.month)
-                    total_months += max(0, months)
-            except:
-                continue
-    
-    return round(total_months / 12, 1) if total_months > 0 else 0
+    return date_normalization.total_work_years(exp.get("工作时间", "") for exp in work_exp_list)
 
 def format_certifications(skills_dict):
     """格式化职业资质"""
@@ -431,15 +383,18 @@ def format_risk_tags(data):
 
 def save_to_excel(excel_data, output_file):
     """保存为Excel格式"""
+    import pandas as pd
+
     # 创建DataFrame
     df = pd.DataFrame([excel_data])
     
     # 保存为Excel文件
-    df.to_excel(output_file, index=False, sheet_name="简历分析结果")
+    with span("output.write_excel"), track_export("excel"):
+        df.to_excel(output_file, index=False, sheet_name="简历分析结果")
     print(f"Excel文件已保存: {output_file}")
 
 def main():
-    if len(sys.argv) != 2:
+    if len(sys.argv) != 2 or sys.argv[1] in ('-h', '--help'):
         print("使用方法: python resume_to_excel_format.py <PDF文件路径>")
         sys.exit(1)
     
@@ -449,6 +404,7 @@ def main():
         print(f"文件不存在: {pdf_file}")
         sys.exit(1)
     
+    start_from_env()
     print(f"开始处理简历文件: {pdf_file}")
     
     # 步骤1: 使用unstructured提取内容
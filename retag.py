@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+按规则重新生成标签（不调用LLM）
+功能: 读取 raw_archive 保存的原始分析数据，用当前的标签规则（关键词表、demo_patterns 等）
+     并行重新生成22个Excel字段，写回 outs/ 下的结果文件，并统计标签发生变化的简历
+
+使用方法:
+    python retag.py [阶段|all] [--archive outs/raw] [--workers N] [--dry-run]
+"""
+
+import os
+import sys
+import time
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+import output_writer
+import raw_archive
+import batch_scheduler
+from analysis_record import TAG_FIELDS
+
+# 阶段 -> (模块, 类, 结果文件后缀)
+STAGES = {
+    "final_comprehensive": ("final_comprehensive_formatter", "FinalComprehensiveFormatter", "_final_comprehensive.json"),
+    "advanced_reasoning": ("advanced_reasoning_system", "AdvancedReasoningSystem", "_advanced_reasoning.json"),
+}
+
+# 工作进程内缓存的格式化器实例
+_formatters = {}
+
+
+def rederive(stage: str, record: dict) -> dict:
+    """用当前规则从原始数据重新生成Excel字段（保留原来的员工工号）"""
+    module_name, class_name, _ = STAGES[stage]
+    formatter = _formatters.get(stage)
+    if formatter is None:
+        module = __import__(module_name)
+        formatter = _formatters[stage] = getattr(module, class_name)()
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if stage == "final_comprehensive":
+            result = formatter._generate_comprehensive_excel_format(record["basic_info"], record["analysis_data"])
+        else:
+            structured_data = record["structured_data"]
+            reasoning = formatter._perform_advanced_reasoning(record.get("text", ""), structured_data)
+            result = formatter._generate_final_excel_format(structured_data, reasoning)
+
+    previous = record.get("result") or {}
+    if previous.get("员工工号"):
+        result["员工工号"] = previous["员工工号"]
+    return result
+
+
+def retag_files(stage: str, paths: list, output_dir: str, dry_run: bool) -> dict:
+    """在工作进程中处理一批归档文件，返回统计"""
+    stats = {"processed": 0, "changed": 0, "errors": {}, "changed_fields": {}}
+    for path in paths:
+        try:
+            record = raw_archive.load_raw(path)
+            result = rederive(stage, record)
+        except (OSError, ValueError, KeyError) as e:
+            key = type(e).__name__
+            stats["errors"][key] = stats["errors"].get(key, 0) + 1
+            continue
+
+        stats["processed"] += 1
+        previous = record.get("result") or {}
+        changed = [field for field in TAG_FIELDS if previous.get(field) != result.get(field)]
+        if changed:
+            stats["changed"] += 1
+            for field in changed:
+                stats["changed_fields"][field] = stats["changed_fields"].get(field, 0) + 1
+        if dry_run:
+            continue
+
+        output_file = os.path.join(output_dir, f"{record['resume_id']}{STAGES[stage][2]}")
+        output_writer.write_json(output_file, result)
+        record["result"] = result
+        raw_archive.save_raw(stage, record["resume_id"],
+                             {k: v for k, v in record.items() if k not in ("version", "stage", "resume_id", "archived_at")},
+                             root=os.path.dirname(os.path.dirname(path)))
+    return stats
+
+
+def retag_archive(stage: str, root: str = None, workers: int = None, output_dir: str = "outs",
+                  dry_run: bool = False) -> dict:
+    """
+    重新生成一个阶段的全部归档
+
+    Returns:
+        {"processed", "changed", "errors", "changed_fields", "seconds"}
+    """
+    if stage not in STAGES:
+        raise ValueError(f"未知阶段: {stage}（可选 {', '.join(STAGES)}）")
+    paths = raw_archive.list_raw(stage, root)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+    os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    # 每个工作进程处理一批文件，进程只需导入一次格式化器；按归档大小分组使各进程的工作量接近
+    batches = batch_scheduler.lpt_partition(paths, workers, cost=os.path.getsize)
+    if workers == 1:
+        results = [retag_files(stage, paths, output_dir, dry_run)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(retag_files, [stage] * workers, batches, [output_dir] * workers,
+                                    [dry_run] * workers))
+
+    total = {"processed": 0, "changed": 0, "errors": {}, "changed_fields": {}}
+    for stats in results:
+        total["processed"] += stats["processed"]
+        total["changed"] += stats["changed"]
+        for key in ("errors", "changed_fields"):
+            for name, count in stats[key].items():
+                total[key][name] = total[key].get(name, 0) + count
+    total["seconds"] = round(time.perf_counter() - start, 3)
+    return total
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="从原始分析归档重新生成标签（不调用LLM）")
+    parser.add_argument('stage', nargs='?', default='all', help=f"{'/'.join(STAGES)} 或 all")
+    parser.add_argument('--archive', default=None, help="归档目录，默认 RESUME_RAW_ARCHIVE_DIR 或 outs/raw")
+    parser.add_argument('--workers', type=int, default=None, help="并行进程数，默认CPU核数")
+    parser.add_argument('--output-dir', default='outs')
+    parser.add_argument('--dry-run', action='store_true', help="只统计变化，不写回文件")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    stages = list(STAGES) if args.stage == 'all' else [args.stage]
+    for stage in stages:
+        try:
+            stats = retag_archive(stage, args.archive, args.workers, args.output_dir, args.dry_run)
+        except ValueError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        if not stats["processed"] and not stats["errors"]:
+            print(f"⚠️  {stage}: 没有归档")
+            continue
+        print(f"✓ {stage}: {stats['processed']} 份，标签变化 {stats['changed']} 份，耗时 {stats['seconds']}s")
+        for field, count in sorted(stats["changed_fields"].items(), key=lambda item: -item[1]):
+            print(f"    {field}: {count}")
+        if stats["errors"]:
+            print(f"  ✗ 失败: {stats['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ import sys
 import subprocess
 from pathlib import Path
 
+import packed_corpus
+
 def run_command(command, cwd=None, env_vars=None):
     """执行命令并返回结果"""
     try:
@@ -73,7 +75,7 @@ def main():
     base_name = Path(pdf_file).stem
     text_file = f"middles/{base_name}_extracted.txt"
     
-    if not os.path.exists(text_file):
+    if not packed_corpus.text_exists(text_file):
         print(f"❌ 错误: PDF提取失败，未生成文本文件 - {text_file}")
         sys.exit(1)
     
@@ -91,7 +93,10 @@ def main():
     
     # 执行智能推理分析
     analysis_command = f"{venv_python} final_comprehensive_formatter.py \"{text_file}\""
-    if not run_command(analysis_command):
+    # 交互式单份分析默认开启对冲请求，降低LLM长尾延迟（RESUME_LLM_HEDGE=0 可关闭）；
+    # 并走 interactive 优先级通道，使用为其保留的并发名额，不与批量任务排队
+    if not run_command(analysis_command, env_vars={"RESUME_LLM_HEDGE": os.getenv("RESUME_LLM_HEDGE", "1"),
+                                                   "RESUME_LANE": os.getenv("RESUME_LANE", "interactive")}):
         print("❌ 智能推理分析失败")
         sys.exit(1)
     
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+增量schema演进
+功能: 模板新增字段（如 期望薪资、职业资质）后，对已归档的简历只补抽新增的字段：
+     比较归档时的字段列表与当前模板的字段，用只含新增字段的精简schema和示例调用LLM，
+     把结果合并进归档的原始数据，再按当前规则重新生成Excel字段
+
+归档中没有字段列表（旧版本归档）时，以原始数据中已有的字段作为已抽取字段。
+
+使用方法:
+    python schema_evolution.py [阶段|all] [--archive outs/raw] [--dry-run]
+"""
+
+import os
+import sys
+import argparse
+
+import output_writer
+import packed_corpus
+import raw_archive
+import retag
+
+# 阶段 -> (模块, 模板变量名, 原始数据键)
+STAGES = {
+    "final_comprehensive": ("final_comprehensive_formatter", "ANALYSIS_TEMPLATE", "analysis_data"),
+    "advanced_reasoning": ("advanced_reasoning_system", "STRUCTURED_TEMPLATE", "structured_data"),
+}
+
+
+def load_template(stage: str):
+    """阶段当前使用的提示模板"""
+    module_name, template_name, _ = STAGES[stage]
+    return getattr(__import__(module_name), template_name)
+
+
+def stored_fields(record: dict, data_key: str) -> set:
+    """归档时已经抽取过的字段"""
+    if record.get("fields") is not None:
+        return set(record["fields"])
+    return set(record.get(data_key) or {})
+
+
+def schema_diff(record: dict, template, data_key: str) -> tuple:
+    """
+    Returns:
+        (新增字段, 已删除字段)，都按模板顺序/名称排序
+    """
+    stored = stored_fields(record, data_key)
+    added = [field for field in template.fields if field not in stored]
+    removed = sorted(stored - set(template.fields))
+    return added, removed
+
+
+def extraction_dict(result) -> dict:
+    """langextract 结果 -> {抽取类别: 非空文本}"""
+    data = {}
+    for extraction in getattr(result, 'extractions', None) or []:
+        field_name = getattr(extraction, 'extraction_class', None)
+        field_value = getattr(extraction, 'extraction_text', None)
+        if field_name and field_value and field_value.strip():
+            data[field_name] = field_value.strip()
+    return data
+
+
+def source_text(record: dict) -> str:
+    """归档中的原文；没有时读取归档记录的源文件"""
+    if record.get("text"):
+        return record["text"]
+    source = record.get("source")
+    if not source or not packed_corpus.text_exists(source):
+        raise ValueError(f"{record.get('resume_id')}: 归档中没有原文，源文件也不存在: {source}")
+    return packed_corpus.read_text(source)
+
+
+def evolve_record(stage: str, path: str, formatter, template, dry_run: bool = False) -> dict:
+    """
+    为一份归档补抽新增字段并合并
+
+    Returns:
+        {"resume_id", "added", "removed", "filled"}；filled 为补抽到非空值的字段
+    """
+    _, _, data_key = STAGES[stage]
+    record = raw_archive.load_raw(path)
+    added, removed = schema_diff(record, template, data_key)
+    summary = {"resume_id": record.get("resume_id"), "added": added, "removed": removed, "filled": []}
+    if not added or dry_run:
+        return summary
+
+    reduced = template.subset(added)
+    result = formatter._call_api(source_text(record), reduced)
+    new_data = {k: v for k, v in extraction_dict(result).items() if k in set(added)}
+    summary["filled"] = sorted(new_data)
+
+    data = dict(record.get(data_key) or {})
+    data.update(new_data)
+    record[data_key] = data
+    record["fields"] = list(template.fields)
+    record["schema_version"] = template.schema_version
+    record["prompt"] = template.fingerprint
+    record["result"] = retag.rederive(stage, record)
+    raw_archive.save_raw(stage, record["resume_id"],
+                         {k: v for k, v in record.items() if k not in ("version", "stage", "resume_id", "archived_at")},
+                         root=os.path.dirname(os.path.dirname(path)))
+    return summary
+
+
+def evolve_archive(stage: str, root: str = None, output_dir: str = "outs", dry_run: bool = False) -> dict:
+    """
+    处理一个阶段的全部归档
+
+    Returns:
+        {"resumes", "up_to_date", "evolved", "failed", "added_fields", "filled"}
+    """
+    if stage not in STAGES:
+        raise ValueError(f"未知阶段: {stage}（可选 {', '.join(STAGES)}）")
+    module_name, _, _ = STAGES[stage]
+    template = load_template(stage)
+    formatter = getattr(__import__(module_name), retag.STAGES[stage][1])()
+
+    report = {"resumes": 0, "up_to_date": 0, "evolved": 0, "failed": 0, "added_fields": {}, "filled": 0}
+    for path in raw_archive.list_raw(stage, root):
+        report["resumes"] += 1
+        try:
+            summary = evolve_record(stage, path, formatter, template, dry_run)
+        except Exception as e:
+            report["failed"] += 1
+            print(f"✗ {os.path.basename(path)}: {e}")
+            continue
+        if not summary["added"]:
+            report["up_to_date"] += 1
+            continue
+        for field in summary["added"]:
+            report["added_fields"][field] = report["added_fields"].get(field, 0) + 1
+        if dry_run:
+            continue
+        report["evolved"] += 1
+        report["filled"] += len(summary["filled"])
+        output_file = os.path.join(output_dir, f"{summary['resume_id']}{retag.STAGES[stage][2]}")
+        output_writer.write_json(output_file, raw_archive.load_raw(path)["result"])
+    return report
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="为已归档的简历补抽新增的schema字段")
+    parser.add_argument('stage', nargs='?', default='all', help=f"{'/'.join(STAGES)} 或 all")
+    parser.add_argument('--archive', default=None, help="归档目录，默认 RESUME_RAW_ARCHIVE_DIR 或 outs/raw")
+    parser.add_argument('--output-dir', default='outs')
+    parser.add_argument('--dry-run', action='store_true', help="只显示每个阶段需要补抽的字段，不调用LLM")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    stages = list(STAGES) if args.stage == 'all' else [args.stage]
+    for stage in stages:
+        try:
+            report = evolve_archive(stage, args.archive, args.output_dir, args.dry_run)
+        except ValueError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        print(f"✓ {stage}: {report['resumes']} 份归档，已是最新 {report['up_to_date']} 份"
+              + ("" if args.dry_run else f"，补抽 {report['evolved']} 份（得到 {report['filled']} 个字段）")
+              + (f"，失败 {report['failed']} 份" if report['failed'] else ""))
+        for field, count in report["added_fields"].items():
+            print(f"    新增字段 {field}: {count} 份")
+
+
+if __name__ == "__main__":
+    main()
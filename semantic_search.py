@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+"""
+语义检索索引 - 本地离线的候选人语义搜索
+功能: 将简历按段落编码为向量（哈希n-gram或本地CPU小模型），
+     向量保存在内存映射的float32矩阵中，使用IVF近似最近邻索引，
+     支持增量添加/删除简历以及top-k语义检索，全程无需网络
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import zlib
+import fcntl
+import contextlib
+from pathlib import Path
+
+import numpy as np
+
+import output_writer
+import packed_corpus
+
+# 同义词归一化：在编码前把常见缩写和说法统一成同一个词
+SYNONYM_MAP = {
+    'k8s': 'kubernetes',
+    'k3s': 'kubernetes',
+    'golang': 'go',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'pg': 'postgresql',
+    'postgres': 'postgresql',
+    'mongo': 'mongodb',
+    'es': 'elasticsearch',
+    'py': 'python',
+    'ml': '机器学习',
+    'dl': '深度学习',
+    'ai': '人工智能',
+    '带领团队': '团队管理',
+    '带队': '团队管理',
+    '管理团队': '团队管理',
+    '团队负责人': '团队管理',
+    '技术负责人': '技术管理',
+    '微服务架构': '微服务',
+    '容器化': '容器',
+}
+
+# 常见简历分段标题
+SECTION_HEADERS = [
+    '个人优势', '个人信息', '基本信息', '联系方式', '求职信息', '求职意向',
+    '工作经历', '工作经验', '项目经历', '项目经验', '教育背景', '教育经历',
+    '技能专长', '专业技能', '技能特长', '自我评价', '职业资质', '证书',
+]
+
+_ASCII_SYNONYMS = {k: v for k, v in SYNONYM_MAP.items() if k.isascii()}
+_CJK_SYNONYMS = {k: v for k, v in SYNONYM_MAP.items() if not k.isascii()}
+_ASCII_SYNONYM_RE = re.compile(
+    r'(?<![a-z0-9])(' + '|'.join(sorted(map(re.escape, _ASCII_SYNONYMS), key=len, reverse=True)) + r')(?![a-z0-9])'
+)
+_CJK_SYNONYM_RE = re.compile('|'.join(sorted(map(re.escape, _CJK_SYNONYMS), key=len, reverse=True)))
+_TOKEN_RE = re.compile(r'[a-z0-9+#.]+|[一-鿿]+')
+_SECTION_RE = re.compile(r'^\s*(' + '|'.join(SECTION_HEADERS) + r')\s*[:：]?\s*$', re.MULTILINE)
+
+
+def normalize_text(text: str) -> str:
+    """小写化并做同义词归一化"""
+    text = text.lower()
+    text = _ASCII_SYNONYM_RE.sub(lambda m: _ASCII_SYNONYMS[m.group(1)], text)
+    text = _CJK_SYNONYM_RE.sub(lambda m: _CJK_SYNONYMS[m.group(0)], text)
+    return text
+
+
+def split_sections(text: str) -> list:
+    """
+    按常见标题把简历切成段落
+
+    Returns:
+        [(段落名, 段落文本), ...]，找不到标题时整篇作为一个段落
+    """
+    matches = list(_SECTION_RE.finditer(text))
+    if not matches:
+        return [('全文', text.strip())] if text.strip() else []
+
+    sections = []
+    head = text[:matches[0].start()].strip()
+    if head:
+        sections.append(('基本信息', head))
+
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.end():end].strip()
+        if body:
+            sections.append((match.group(1), body))
+
+    return sections
+
+
+class HashedNgramEncoder:
+    """哈希n-gram编码器：英文按词、中文按字符n-gram，使用crc32做稳定哈希"""
+
+    name = 'hash'
+
+    def __init__(self, dim: int = 512, ngram_range: tuple = (1, 3)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text: str):
+        min_n, max_n = self.ngram_range
+        for token in _TOKEN_RE.findall(normalize_text(text)):
+            if token.isascii():
+                # 英文/数字按整词计，权重略高
+                yield 'w:' + token, 2.0
+                continue
+            for n in range(min_n, max_n + 1):
+                for i in range(len(token) - n + 1):
+                    yield token[i:i + n], float(n)
+
+    def encode(self, texts: list) -> np.ndarray:
+        """批量编码，返回L2归一化的float32矩阵"""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                h = zlib.crc32(feature.encode('utf-8'))
+                sign = 1.0 if h & 0x80000000 else -1.0
+                matrix[row, h % self.dim] += sign * weight
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class LocalModelEncoder:
+    """本地CPU小模型编码器（需要安装sentence-transformers并提前下载好模型）"""
+
+    name = 'local'
+
+    def __init__(self, model_path: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_path, device='cpu')
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: list) -> np.ndarray:
+        vectors = self.model.encode([normalize_text(t) for t in texts], normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def get_encoder(kind: str = 'hash', dim: int = 512):
+    """
+    获取编码器
+
+    Args:
+        kind: 'hash' 使用哈希n-gram；'local' 使用 RESUME_EMBED_MODEL 指定的本地模型
+        dim: 哈希编码维度
+    """
+    if kind == 'local':
+        model_path = os.getenv('RESUME_EMBED_MODEL')
+        if not model_path:
+            raise ValueError("使用本地模型需要设置 RESUME_EMBED_MODEL 为本地模型目录")
+        return LocalModelEncoder(model_path)
+    return HashedNgramEncoder(dim=dim)
+
+
+_local_encoders = {}
+
+
+def encoder_from_env():
+    """设置了 RESUME_EMBED_MODEL 时使用本地模型（同一模型在进程内只加载一次），否则使用哈希n-gram"""
+    model_path = os.getenv('RESUME_EMBED_MODEL')
+    if not model_path:
+        return get_encoder('hash')
+    if model_path not in _local_encoders:
+        _local_encoders[model_path] = get_encoder('local')
+    return _local_encoders[model_path]
+
+
+def _kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """球面k-means，返回归一化的聚类中心"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(k):
+            members = vectors[assign == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+            else:
+                centroids[c] = vectors[rng.integers(len(vectors))]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+    return centroids.astype(np.float32)
+
+
+class SemanticIndex:
+    """
+    基于内存映射矩阵的IVF语义索引
+
+    目录结构:
+        vectors.f32   - float32 向量矩阵 (capacity x dim)，内存映射
+        rows.json     - 每一行对应的简历ID、段落名和是否有效
+        ivf.npz       - IVF 聚类中心和每行的聚类分配
+        meta.json     - 维度、行数、编码器等元信息
+        .lock         - 进程间互斥锁（见 locked）
+    """
+
+    def __init__(self, index_dir: str = "indexes/semantic", encoder=None,
+                 min_train_rows: int = 1024, nprobe: int = 16):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.encoder = encoder or HashedNgramEncoder()
+        self.dim = self.encoder.dim
+        self.min_train_rows = min_train_rows
+        self.nprobe = nprobe
+
+        self.count = 0
+        self.capacity = 0
+        self.doc_ids = []
+        self.sections = []
+        self.alive = np.zeros(0, dtype=bool)
+        self.centroids = None
+        self.assign = np.zeros(0, dtype=np.int32)
+        self.trained_rows = 0
+        self._lists = []
+        self._doc_rows = {}
+        self._vectors = None
+
+        self._load()
+
+    # ---------- 持久化 ----------
+
+    @property
+    def _vector_path(self) -> Path:
+        return self.index_dir / "vectors.f32"
+
+    def _load(self):
+        meta_file = self.index_dir / "meta.json"
+        if not meta_file.exists():
+            self._resize(1024)
+            return
+
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['dim'] != self.dim or meta['encoder'] != self.encoder.name:
+            raise ValueError(f"索引编码器不一致: {meta['encoder']}/{meta['dim']} vs {self.encoder.name}/{self.dim}")
+
+        with open(self.index_dir / "rows.json", 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+        # 行数以 rows.json 为准、容量以向量文件大小为准，写到一半中断时各文件仍能对上
+        self.count = len(rows['doc_ids'])
+        self.capacity = os.path.getsize(self._vector_path) // (self.dim * 4)
+        self.trained_rows = meta.get('trained_rows', 0)
+        self._vectors = np.memmap(self._vector_path, dtype=np.float32, mode='r+',
+                                  shape=(self.capacity, self.dim))
+
+        self.doc_ids = rows['doc_ids']
+        self.sections = rows['sections']
+        self.alive = np.zeros(self.capacity, dtype=bool)
+        self.alive[:self.count] = np.asarray(rows['alive'], dtype=bool)
+
+        self.assign = np.full(self.capacity, -1, dtype=np.int32)
+        ivf_file = self.index_dir / "ivf.npz"
+        ivf = np.load(ivf_file) if ivf_file.exists() else None
+        # 聚类分配与行数不一致（写 rows.json 前中断）时丢弃，下次添加时重新训练
+        if ivf is not None and len(ivf['assign']) == self.count:
+            self.centroids = ivf['centroids']
+            self.assign[:self.count] = ivf['assign']
+            self._rebuild_lists()
+
+        for row, doc_id in enumerate(self.doc_ids):
+            if self.alive[row]:
+                self._doc_rows.setdefault(doc_id, []).append(row)
+
+    def save(self):
+        """刷新向量矩阵并写入元数据；标记删除的行超过一半时先压缩"""
+        if self.count - int(self.alive[:self.count].sum()) > self.count // 2:
+            self.compact()
+        self._vectors.flush()
+        meta = {
+            'dim': self.dim,
+            'encoder': self.encoder.name,
+            'count': self.count,
+            'capacity': self.capacity,
+            'trained_rows': self.trained_rows,
+        }
+        rows = {
+            'doc_ids': self.doc_ids,
+            'sections': self.sections,
+            'alive': self.alive[:self.count].astype(int).tolist(),
+        }
+        # 每个文件都原子替换；meta.json 最后写
+        if self.centroids is not None:
+            buffer = io.BytesIO()
+            np.savez(buffer, centroids=self.centroids, assign=self.assign[:self.count])
+            output_writer.write_bytes(str(self.index_dir / "ivf.npz"), buffer.getvalue())
+        output_writer.write_json(str(self.index_dir / "rows.json"), rows, indent=False)
+        output_writer.write_json(str(self.index_dir / "meta.json"), meta)
+
+    def _resize(self, new_capacity: int):
+        """扩容内存映射矩阵（文件按需增长，原有数据保持不变）"""
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vector_path, 'ab') as f:
+            f.truncate(new_capacity * self.dim * 4)
+        self._vectors = np.memmap(self._vector_path, dtype=np.float32, mode='r+',
+                                  shape=(new_capacity, self.dim))
+
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:self.count] = self.alive[:self.count]
+        self.alive = alive
+        assign = np.full(new_capacity, -1, dtype=np.int32)
+        assign[:self.count] = self.assign[:self.count]
+        self.assign = assign
+        self.capacity = new_capacity
+
+    # ---------- IVF ----------
+
+    def _rebuild_lists(self):
+        self._lists = [[] for _ in range(len(self.centroids))]
+        for row in np.flatnonzero(self.alive[:self.count]):
+            c = self.assign[row]
+            if c >= 0:
+                self._lists[c].append(int(row))
+        self._lists = [np.asarray(lst, dtype=np.int64) for lst in self._lists]
+
+    def train(self, nlist: int = None, sample_size: int = 20000):
+        """在当前有效向量上训练IVF聚类中心并重新分配所有行"""
+        live_rows = np.flatnonzero(self.alive[:self.count])
+        if len(live_rows) == 0:
+            return
+        nlist = nlist or max(1, int(np.sqrt(len(live_rows))))
+        nlist = min(nlist, len(live_rows))
+
+        rng = np.random.default_rng(0)
+        sample = live_rows if len(live_rows) <= sample_size else rng.choice(live_rows, sample_size, replace=False)
+        self.centroids = _kmeans(np.asarray(self._vectors[np.sort(sample)]), nlist)
+
+        # 分块分配，避免一次性读入整个矩阵
+        for start in range(0, self.count, 8192):
+            block = np.asarray(self._vectors[start:min(start + 8192, self.count)])
+            self.assign[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        self.trained_rows = len(live_rows)
+        self._rebuild_lists()
+
+    def _maybe_train(self):
+        live = int(self.alive[:self.count].sum())
+        if self.centroids is None:
+            if live >= self.min_train_rows:
+                self.train()
+        elif live > 8 * max(self.trained_rows, 1):
+            # 数据量增长较多后重新训练，保持各聚类大小均衡
+            self.train()
+
+    # ---------- 增删 ----------
+
+    def add_vectors(self, doc_id: str, sections: list, vectors: np.ndarray):
+        """添加一份简历已编码好的段落向量（同一ID的旧行够用时原地覆盖，否则标记删除后追加）"""
+        old_rows = self._doc_rows.pop(doc_id, [])
+        n = len(vectors)
+        if len(old_rows) >= n:
+            rows = old_rows[:n]
+            self.alive[old_rows[n:]] = False
+            self._unlist(rows)
+        else:
+            self.alive[old_rows] = False
+            if self.count + n > self.capacity:
+                new_capacity = self.capacity
+                while self.count + n > new_capacity:
+                    new_capacity *= 2
+                self._resize(new_capacity)
+            rows = list(range(self.count, self.count + n))
+            self.doc_ids.extend([doc_id] * n)
+            self.sections.extend([None] * n)
+            self.count += n
+        if n == 0:
+            return
+
+        self._vectors[rows] = vectors
+        self.alive[rows] = True
+        for row, section in zip(rows, sections):
+            self.sections[row] = section
+        self._doc_rows[doc_id] = rows
+        self._list_rows(np.asarray(rows, dtype=np.int64), vectors)
+        self._maybe_train()
+
+    def _unlist(self, rows: list):
+        """把要覆盖的行从原来的IVF列表中移除"""
+        if self.centroids is None:
+            return
+        for c in np.unique(self.assign[rows]):
+            if c >= 0:
+                self._lists[c] = self._lists[c][~np.isin(self._lists[c], rows)]
+
+    def _list_rows(self, rows: np.ndarray, vectors: np.ndarray):
+        """把新写入的行分配到IVF列表（每个列表只拼接一次）"""
+        if self.centroids is None:
+            return
+        assign = np.argmax(vectors @ self.centroids.T, axis=1)
+        self.assign[rows] = assign
+        for c in np.unique(assign):
+            self._lists[c] = np.concatenate([self._lists[c], rows[assign == c]])
+
+    def add_resume(self, doc_id: str, text: str):
+        """按段落切分并编码一份简历后加入索引"""
+        sections = split_sections(text)
+        if not sections:
+            return 0
+        names = [name for name, _ in sections]
+        vectors = self.encoder.encode([f"{name} {body}" for name, body in sections])
+        self.add_vectors(doc_id, names, vectors)
+        return len(sections)
+
+    def delete(self, doc_id: str) -> bool:
+        """删除一份简历的全部段落（标记删除，IVF列表在检索时过滤，save 时按需压缩）"""
+        rows = self._doc_rows.pop(doc_id, None)
+        if not rows:
+            return False
+        self.alive[rows] = False
+        return True
+
+    def compact(self) -> int:
+        """去掉标记删除的行（有效行按顺序前移），返回回收的行数"""
+        live = np.flatnonzero(self.alive[:self.count])
+        removed = self.count - len(live)
+        if removed == 0:
+            return 0
+        # 目标位置不超过原位置，按块先读后写不会覆盖还没复制的行
+        for start in range(0, len(live), 8192):
+            block = live[start:start + 8192]
+            self._vectors[start:start + len(block)] = self._vectors[block]
+        self.doc_ids = [self.doc_ids[row] for row in live]
+        self.sections = [self.sections[row] for row in live]
+        self.assign[:len(live)] = self.assign[live]
+        self.assign[len(live):] = -1
+        self.alive[:] = False
+        self.alive[:len(live)] = True
+        self.count = len(live)
+        self._doc_rows = {}
+        for row, doc_id in enumerate(self.doc_ids):
+            self._doc_rows.setdefault(doc_id, []).append(row)
+        if self.centroids is not None:
+            self._rebuild_lists()
+        return removed
+
+    def __len__(self):
+        return len(self._doc_rows)
+
+    # ---------- 检索 ----------
+
+    def _candidate_rows(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        if self.centroids is None:
+            return np.flatnonzero(self.alive[:self.count])
+        probes = np.argsort(-(self.centroids @ query))[:nprobe]
+        rows = np.concatenate([self._lists[c] for c in probes]) if len(probes) else np.zeros(0, dtype=np.int64)
+        return rows[self.alive[rows]]
+
+    def search_vector(self, query: np.ndarray, k: int = 10, nprobe: int = None, exact: bool = False) -> list:
+        """
+        使用查询向量检索
+
+        Returns:
+            [(简历ID, 相似度, 命中段落), ...]，按相似度降序，每份简历只出现一次
+        """
+        if exact or self.centroids is None:
+            rows = np.flatnonzero(self.alive[:self.count])
+        else:
+            rows = self._candidate_rows(query, nprobe or self.nprobe)
+        if len(rows) == 0:
+            return []
+
+        rows = np.sort(rows)
+        scores = np.asarray(self._vectors[rows]) @ query
+
+        # 多取一些段落，再按简历聚合
+        top = min(len(rows), k * 4)
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+
+        results = []
+        seen = set()
+        for i in best:
+            row = int(rows[i])
+            doc_id = self.doc_ids[row]
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
+            results.append((doc_id, float(scores[i]), self.sections[row]))
+            if len(results) >= k:
+                break
+        return results
+
+    def search(self, query_text: str, k: int = 10, nprobe: int = None, exact: bool = False) -> list:
+        """使用自然语言查询检索候选人"""
+        query = self.encoder.encode([query_text])[0]
+        return self.search_vector(query, k=k, nprobe=nprobe, exact=exact)
+
+
+@contextlib.contextmanager
+def locked(index_dir: str):
+    """持有索引目录的进程间互斥锁（加载-修改-保存期间），并发的批处理进程不会互相覆盖"""
+    os.makedirs(index_dir, exist_ok=True)
+    with open(os.path.join(index_dir, '.lock'), 'ab') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def index_resume_file(text_file: str, index_dir: str = None) -> int:
+    """
+    把一份提取后的简历文本加入语义索引（供分析流程增量调用）
+
+    Args:
+        text_file: middles 下的 *_extracted.txt 文件
+        index_dir: 索引目录，默认读取 RESUME_SEMANTIC_INDEX 环境变量
+    """
+    index_dir = index_dir or os.getenv('RESUME_SEMANTIC_INDEX', 'indexes/semantic')
+    text = packed_corpus.read_text(text_file)
+
+    doc_id = Path(text_file).stem.replace("_extracted", "")
+    with locked(index_dir):
+        index = SemanticIndex(index_dir, encoder=encoder_from_env())
+        added = index.add_resume(doc_id, text)
+        index.save()
+    print(f"✓ 语义索引已更新: {doc_id} ({added} 个段落)")
+    return added
+
+
+def main():
+    """主函数"""
+    usage = (
+        "使用方法:\n"
+        "  python semantic_search.py add <文本文件>...       添加/更新简历\n"
+        "  python semantic_search.py delete <简历ID>...      删除简历\n"
+        "  python semantic_search.py search <查询> [top_k]   语义检索\n"
+        "  python semantic_search.py train                  重新训练IVF索引\n"
+        "索引目录通过 RESUME_SEMANTIC_INDEX 环境变量指定，默认 indexes/semantic；\n"
+        "设置 RESUME_EMBED_MODEL 为本地模型目录时改用本地模型编码"
+    )
+    if len(sys.argv) < 2:
+        print(usage)
+        sys.exit(1)
+
+    command = sys.argv[1]
+    index_dir = os.getenv('RESUME_SEMANTIC_INDEX', 'indexes/semantic')
+    with locked(index_dir):
+        index = SemanticIndex(index_dir, encoder=encoder_from_env())
+
+        if command == 'add':
+            for text_file in sys.argv[2:]:
+                text = packed_corpus.read_text(text_file)
+                doc_id = Path(text_file).stem.replace("_extracted", "")
+                added = index.add_resume(doc_id, text)
+                print(f"✓ 已添加: {doc_id} ({added} 个段落)")
+            index.save()
+        elif command == 'delete':
+            for doc_id in sys.argv[2:]:
+                if index.delete(doc_id):
+                    print(f"✓ 已删除: {doc_id}")
+                else:
+                    print(f"✗ 索引中不存在: {doc_id}")
+            index.save()
+        elif command == 'search' and len(sys.argv) >= 3:
+            top_k = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+            results = index.search(sys.argv[2], k=top_k)
+            print(f"查询: {sys.argv[2]} (索引中共 {len(index)} 份简历)")
+            for rank, (doc_id, score, section) in enumerate(results, 1):
+                print(f"{rank:2d}. {doc_id}  相似度={score:.3f}  命中段落={section}")
+        elif command == 'train':
+            index.train()
+            index.save()
+            print(f"✓ IVF索引训练完成，聚类数: {len(index.centroids) if index.centroids is not None else 0}")
+        else:
+            print(usage)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+本地 OpenAI 兼容的桩服务器
+功能: 模拟 DeepSeek/Qwen 的 /v1/chat/completions 接口，按 langextract 的提示格式
+     返回合法的抽取结果，可配置延迟、错误率、限流（429）和并发上限，
+     并模拟服务商的前缀上下文缓存（按块匹配已见过的提示前缀，返回 prompt_cache_hit_tokens），
+     用于基准测试和离线回归，无需API key和网络
+"""
+
+import re
+import json
+import hashlib
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_CLASS_RE = re.compile(r'"([^"\n]+)": "')
+
+# 前缀缓存的匹配粒度（字符），与 DeepSeek 按64 token 为单位缓存大致相当
+CACHE_BLOCK_CHARS = 128
+
+
+class StubConfig:
+    """桩服务器行为配置"""
+
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 20.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, max_concurrency: int = 0, timeout_rate: float = 0.0,
+                 hang_seconds: float = 30.0, slow_rate: float = 0.0, slow_ms: float = 0.0,
+                 drop_rate: float = 0.0, drop_models: tuple = (), seed: int = None):
+        self.latency_ms = latency_ms            # 平均响应延迟
+        self.jitter_ms = jitter_ms              # 延迟抖动（均匀分布）
+        self.error_rate = error_rate            # 返回500的概率
+        self.throttle_rate = throttle_rate      # 随机返回429的概率
+        self.max_concurrency = max_concurrency  # 超过该并发直接返回429，0表示不限制
+        self.timeout_rate = timeout_rate        # 挂起 hang_seconds 模拟超时的概率
+        self.hang_seconds = hang_seconds
+        self.slow_rate = slow_rate              # 偶发慢响应（长尾）的概率
+        self.slow_ms = slow_ms                  # 慢响应额外增加的延迟
+        self.drop_rate = drop_rate              # 返回不完整结果（只有一半抽取类别）的概率，模拟能力较弱的模型
+        self.drop_models = tuple(drop_models)   # 只对这些模型生效，为空时对所有模型生效
+        self.rng = random.Random(seed)
+
+
+class StubStats:
+    """桩服务器统计"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.responses = {}
+        self.prefix_blocks = set()
+        self.cache_hit_chars = 0
+        self.prompt_chars = 0
+
+    def record(self, status: int):
+        with self.lock:
+            self.responses[str(status)] = self.responses.get(str(status), 0) + 1
+
+    def prefix_cache_hit(self, prompt: str) -> int:
+        """
+        模拟前缀缓存: 返回与之前请求相同的最长前缀长度（按块对齐），并记录本次提示的所有前缀块
+        """
+        digest = hashlib.sha1()
+        hit, hashes = 0, []
+        for end in range(CACHE_BLOCK_CHARS, len(prompt) + 1, CACHE_BLOCK_CHARS):
+            digest.update(prompt[end - CACHE_BLOCK_CHARS:end].encode('utf-8'))
+            hashes.append(digest.copy().digest())
+        with self.lock:
+            for i, key in enumerate(hashes):
+                if key not in self.prefix_blocks:
+                    break
+                hit = (i + 1) * CACHE_BLOCK_CHARS
+            self.prefix_blocks.update(hashes)
+            self.cache_hit_chars += hit
+            self.prompt_chars += len(prompt)
+        return hit
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "responses": dict(self.responses),
+                "prompt_chars": self.prompt_chars,
+                "cache_hit_chars": self.cache_hit_chars,
+            }
+
+
+def build_extraction_payload(prompt: str, incomplete: bool = False) -> dict:
+    """
+    根据 langextract 的提示生成抽取结果
+
+    从示例答案中找出所有抽取类别，再从待抽取文本中取行作为值，
+    保证返回值能在原文中对齐；incomplete 为 True 时每隔一个类别丢弃一个。
+    """
+    question_start = prompt.rfind("\nQ: ")
+    answer_start = prompt.rfind("\nA: ")
+    chunk = prompt[question_start + 4:answer_start] if 0 <= question_start < answer_start else prompt[-2000:]
+    examples = prompt[:question_start] if question_start >= 0 else ""
+
+    classes = []
+    for name in _CLASS_RE.findall(examples):
+        if not name.endswith("_attributes") and name not in classes:
+            classes.append(name)
+
+    lines = [line.strip().lstrip('•-· ').strip() for line in chunk.split('\n')]
+    lines = [line[:40] for line in lines if len(line) >= 2]
+    if not lines:
+        lines = [chunk.strip()[:40] or "无"]
+
+    extractions = []
+    for i, name in enumerate(classes):
+        if incomplete and i % 2:
+            continue
+        extractions.append({name: lines[i % len(lines)], f"{name}_attributes": {}})
+    return {"extractions": extractions}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """处理 chat.completions 请求"""
+
+    config: StubConfig = None
+    stats: StubStats = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.stats.record(status)
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/stats'):
+            self._send_json(200, self.stats.snapshot())
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+
+        stats, config = self.stats, self.config
+        with stats.lock:
+            stats.requests += 1
+            stats.in_flight += 1
+            stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+            over_limit = config.max_concurrency and stats.in_flight > config.max_concurrency
+            roll = config.rng.random()
+            delay = max(0.0, config.latency_ms + config.rng.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+            if config.slow_rate and config.rng.random() < config.slow_rate:
+                delay += config.slow_ms / 1000
+            incomplete = bool(config.drop_rate and (not config.drop_models or request.get('model') in config.drop_models)
+                              and config.rng.random() < config.drop_rate)
+
+        try:
+            if over_limit or roll < config.throttle_rate:
+                self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                                headers={"Retry-After": "1"})
+                return
+            roll -= config.throttle_rate
+            if roll < config.timeout_rate:
+                time.sleep(config.hang_seconds)
+            roll -= config.timeout_rate
+
+            time.sleep(delay)
+            if roll < config.error_rate:
+                self._send_json(500, {"error": {"message": "Internal server error", "type": "server_error"}})
+                return
+
+            messages = request.get('messages', [{}])
+            prompt = messages[-1].get('content', '')
+            content = json.dumps(build_extraction_payload(prompt, incomplete), ensure_ascii=False)
+            full_prompt = '\n'.join(str(m.get('content', '')) for m in messages)
+            prompt_tokens = len(full_prompt) // 2
+            cache_hit_tokens = stats.prefix_cache_hit(full_prompt) // 2
+            completion_tokens = len(content) // 2
+            self._send_json(200, {
+                "id": f"stub-{stats.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get('model', 'stub'),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                    "prompt_cache_hit_tokens": cache_hit_tokens,
+                    "prompt_cache_miss_tokens": prompt_tokens - cache_hit_tokens,
+                },
+            })
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with stats.lock:
+                stats.in_flight -= 1
+
+
+def start_stub_server(config: StubConfig = None, host: str = "127.0.0.1", port: int = 0):
+    """
+    在后台线程启动桩服务器
+
+    Returns:
+        (server, base_url)，base_url 可直接作为 DEEPSEEK_BASE_URL 使用；
+        server.stats 为统计对象，用 server.shutdown() 停止
+    """
+    handler = type('BoundStubHandler', (StubHandler,), {
+        'config': config or StubConfig(),
+        'stats': StubStats(),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.stats = handler.stats
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="本地 OpenAI 兼容桩服务器")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=20.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--max-concurrency', type=int, default=0)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="偶发慢响应的概率")
+    parser.add_argument('--slow-ms', type=float, default=0.0, help="慢响应额外增加的延迟")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="返回不完整结果的概率")
+    parser.add_argument('--drop-models', default='', help="逗号分隔，只对这些模型返回不完整结果")
+    args = parser.parse_args()
+
+    config = StubConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                        throttle_rate=args.throttle_rate, max_concurrency=args.max_concurrency,
+                        timeout_rate=args.timeout_rate, slow_rate=args.slow_rate, slow_ms=args.slow_ms,
+                        drop_rate=args.drop_rate, drop_models=[m for m in args.drop_models.split(',') if m])
+    server, base_url = start_stub_server(config, port=args.port)
+    print(f"✓ 桩服务器已启动: {base_url}")
+    print(f"  使用方法: DEEPSEEK_API_KEY=stub DEEPSEEK_BASE_URL={base_url} python final_comprehensive_formatter.py <文本文件>")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
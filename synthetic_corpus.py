@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+合成简历语料生成器
+功能: 按照各格式化器中 example_text 的风格生成中文合成简历（文本和PDF），
+     用于基准测试和离线回归，不包含任何真实个人信息
+"""
+
+import sys
+import random
+from pathlib import Path
+
+SURNAMES = ['张', '王', '李', '赵', '刘', '陈', '杨', '黄', '周', '吴', '徐', '孙', '任', '马', '朱']
+GIVEN_NAMES = ['明华', '伟', '芳', '军', '磊', '洋', '静', '街平', '涛', '晨', '婷', '浩', '宇', '欣', '鹏']
+CITIES = ['成都', '北京', '上海', '深圳', '杭州', '武汉', '西安', '南京']
+COMPANIES = ['某科技公司', '某互联网公司', '某金融科技公司', '某电商平台', '某云计算公司', '某游戏公司', '某物流科技公司']
+TITLES = ['Python开发工程师', '高级Python开发工程师', 'Java开发工程师', '高级Java工程师', 'Go开发工程师',
+          '架构师', '技术经理', '技术总监', '后端开发工程师', '数据开发工程师']
+SCHOOLS = ['某理工大学', '某师范大学', '某科技大学', '某工业大学', '某财经大学']
+MAJORS = ['计算机科学与技术', '软件工程', '信息管理', '电子信息工程', '数学与应用数学']
+DEGREES = ['本科', '硕士', '专科', '博士']
+ADVANTAGES = [
+    '精通Python、go，了解shell，lua等脚本语言',
+    '熟练使用Django、Flask，fastAPI，gin等web框架进行开发',
+    '熟悉mysql，pg等常见数据库',
+    '熟悉redis，Mongo，ES等NoSQL',
+    '熟悉docker容器技术，熟悉k8s，k3s',
+    '熟悉numpy，pandas，matplotlib',
+    '熟练使用git进行代码管理',
+    '了解常见机器学习，深度学习相关模块，如sklearn，pytorch，TensorFlow',
+    '多次项目成功交付经验',
+    '良好的自我驱动力，追逐新技术',
+    '精通Java、Spring Cloud微服务体系',
+    '具备丰富的团队管理经验，带领10人以上团队',
+]
+DUTIES = [
+    '负责后端系统开发和优化',
+    '参与微服务架构设计',
+    '主导微服务架构改造，提升系统性能30%',
+    '带领3人小团队完成核心业务模块开发',
+    '参与技术选型和架构决策',
+    '负责数据处理和分析系统开发',
+    '优化算法性能，处理效率提升50%',
+    '负责技术团队管理，系统架构设计，技术决策',
+    '跨部门协作推进项目交付',
+    '搭建容器化部署平台，支撑日均千万级请求',
+]
+PROJECTS = [
+    ('新闻智能拆条项目', 'Python + PyTorch + Flask', '基于深度学习算法，实现新闻自动分割'),
+    ('数据标注平台', 'Python + Django + MySQL', '机器学习模型训练数据标注系统，标注效率提升40%'),
+    ('电商平台重构项目', 'Java + Spring Cloud + MySQL + Redis', '日活用户500万+，负责整体架构设计'),
+    ('实时风控系统', 'Go + Kafka + Redis', '毫秒级风险识别，拦截率提升20%'),
+    ('容器云平台', 'Kubernetes + Docker + Go', '支撑上千个服务的自动化部署'),
+]
+
+
+def generate_resume(rng: random.Random, size: str = 'medium') -> str:
+    """
+    生成一份合成简历文本
+
+    Args:
+        rng: 随机数生成器（固定种子保证可复现）
+        size: small/medium/large，控制工作经历和项目经历数量
+    """
+    jobs, projects = {'small': (1, 1), 'medium': (3, 2), 'large': (8, 6)}[size]
+    name = rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES)
+    age = rng.randint(24, 45)
+    years = max(1, age - 23 - rng.randint(0, 2))
+    phone = '1' + ''.join(str(rng.randint(0, 9)) for _ in range(10))
+
+    lines = [
+        name,
+        '',
+        f"{rng.choice(['男', '女'])}|{age}岁|籍贯：{rng.choice(CITIES)}",
+        '',
+        '联系方式',
+        f"电话:{phone}",
+        f"邮箱:user{rng.randint(1000, 99999)}@example.com",
+        '',
+        '求职信息',
+        f"工作时长：{years}年",
+        f"求职意向：{rng.choice(TITLES)}",
+        '',
+        '个人优势',
+    ]
+    lines.extend(rng.sample(ADVANTAGES, min(len(ADVANTAGES), 4 + jobs)))
+
+    lines.extend(['', '工作经历'])
+    end_year = 2024
+    for _ in range(jobs):
+        start_year = end_year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(COMPANIES)} {rng.choice(TITLES)} {start_year}.{rng.randint(1, 12):02d}-{end_year}.{rng.randint(1, 12):02d}")
+        lines.extend(f"• {duty}" for duty in rng.sample(DUTIES, 3))
+        lines.append('')
+        end_year = start_year
+
+    lines.append('项目经历')
+    for _ in range(projects):
+        project, stack, desc = rng.choice(PROJECTS)
+        lines.extend([f"{project}：", f"- 技术栈：{stack}", f"- {desc}", ''])
+
+    lines.extend([
+        '教育背景',
+        f"{rng.choice(SCHOOLS)} {rng.choice(MAJORS)} {rng.choice(DEGREES)} {end_year - 4}-{end_year}",
+    ])
+    return "\n".join(lines)
+
+
+def write_pdf(text: str, pdf_path: str) -> bool:
+    """
+    把文本写成带文本层的PDF（需要 reportlab，使用内置中文CID字体）
+
+    Returns:
+        是否成功生成
+    """
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+        from reportlab.pdfgen import canvas
+    except ImportError:
+        return False
+
+    if 'STSong-Light' not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(UnicodeCIDFont('STSong-Light'))
+
+    pdf = canvas.Canvas(pdf_path, pagesize=A4)
+    width, height = A4
+    y = height - 50
+    for line in text.split('\n'):
+        if y < 50:
+            pdf.showPage()
+            y = height - 50
+        pdf.setFont('STSong-Light', 11)
+        pdf.drawString(50, y, line)
+        y -= 18
+    pdf.save()
+    return True
+
+
+def generate_corpus(output_dir: str, count: int, seed: int = 42, with_pdf: bool = True) -> dict:
+    """
+    生成合成简历语料
+
+    Args:
+        output_dir: 输出目录，文本写入 middles/，PDF 写入 files/
+        count: 简历数量
+        seed: 随机种子
+        with_pdf: 是否同时生成PDF
+
+    Returns:
+        {"texts": [文本文件...], "pdfs": [PDF文件...]}
+    """
+    rng = random.Random(seed)
+    text_dir = Path(output_dir) / "middles"
+    pdf_dir = Path(output_dir) / "files"
+    text_dir.mkdir(parents=True, exist_ok=True)
+    pdf_dir.mkdir(parents=True, exist_ok=True)
+
+    texts, pdfs = [], []
+    for i in range(count):
+        # 大小混合：70% 中等，20% 小，10% 大
+        size = rng.choices(['small', 'medium', 'large'], weights=[2, 7, 1])[0]
+        text = generate_resume(rng, size)
+        stem = f"synthetic_{i:05d}"
+
+        text_file = text_dir / f"{stem}_extracted.txt"
+        with open(text_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+        texts.append(str(text_file))
+
+        if with_pdf:
+            pdf_file = pdf_dir / f"{stem}.pdf"
+            if write_pdf(text, str(pdf_file)):
+                pdfs.append(str(pdf_file))
+            else:
+                with_pdf = False
+                print("⚠️  未安装 reportlab，跳过PDF生成")
+
+    return {"texts": texts, "pdfs": pdfs}
+
+
+def main():
+    """主函数"""
+    if len(sys.argv) < 2:
+        print("使用方法: python synthetic_corpus.py <输出目录> [数量] [随机种子]")
+        sys.exit(1)
+
+    output_dir = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 42
+
+    corpus = generate_corpus(output_dir, count, seed)
+    print(f"✓ 生成文本简历 {len(corpus['texts'])} 份，PDF简历 {len(corpus['pdfs'])} 份: {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
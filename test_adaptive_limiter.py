@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+adaptive_limiter 测试：并发名额、interactive 保留名额、优先级让行和 AIMD 窗口调整
+
+运行: python -m pytest -q test_adaptive_limiter.py
+"""
+
+import time
+import threading
+
+import pytest
+
+from adaptive_limiter import AdaptiveLimiter
+
+
+def _acquire_in_thread(limiter: AdaptiveLimiter, priority: int, acquired: list):
+    thread = threading.Thread(target=lambda: acquired.append((priority, limiter.acquire(priority=priority))))
+    thread.start()
+    return thread
+
+
+def _wait_for_waiters(limiter: AdaptiveLimiter, count: int):
+    deadline = time.monotonic() + 5
+    while len(limiter._waiters) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(limiter._waiters) == count
+
+
+def test_window_limits_in_flight():
+    limiter = AdaptiveLimiter(initial=2, adaptive=False)
+    tickets = [limiter.acquire(), limiter.acquire()]
+    with pytest.raises(TimeoutError):
+        limiter.acquire(timeout=0.05)
+    limiter.release(tickets.pop())
+    tickets.append(limiter.acquire(timeout=0.05))
+    assert limiter.in_flight == 2
+
+
+def test_batch_uses_whole_window_without_interactive():
+    limiter = AdaptiveLimiter(initial=4, reserved=1, adaptive=False)
+    tickets = [limiter.acquire(priority=2, timeout=0.05) for _ in range(4)]
+    assert limiter.in_flight == 4
+    for ticket in tickets:
+        limiter.release(ticket)
+
+
+def test_reserved_slots_while_interactive_in_flight():
+    limiter = AdaptiveLimiter(initial=4, reserved=1, adaptive=False)
+    interactive = limiter.acquire(priority=0)
+    normal = [limiter.acquire(priority=1, timeout=0.05) for _ in range(2)]
+    with pytest.raises(TimeoutError):
+        limiter.acquire(priority=1, timeout=0.05)
+    # interactive 请求仍可使用保留的名额
+    normal.append(limiter.acquire(priority=0, timeout=0.05))
+    limiter.release(normal.pop())
+    limiter.release(interactive)
+    assert limiter.acquire(priority=1, timeout=0.05) is not None
+
+
+def test_higher_priority_waiter_goes_first():
+    limiter = AdaptiveLimiter(initial=1, adaptive=False)
+    held = limiter.acquire()
+    acquired = []
+    backfill = _acquire_in_thread(limiter, 2, acquired)
+    _wait_for_waiters(limiter, 1)
+    interactive = _acquire_in_thread(limiter, 0, acquired)
+    _wait_for_waiters(limiter, 2)
+
+    limiter.release(held)
+    interactive.join(5)
+    assert [priority for priority, _ in acquired] == [0]
+    limiter.release(acquired[0][1])
+    backfill.join(5)
+    assert [priority for priority, _ in acquired] == [0, 2]
+
+
+def test_congestion_halves_window_once_per_wave():
+    limiter = AdaptiveLimiter(initial=8, min_window=1, max_window=16)
+    tickets = [limiter.acquire() for _ in range(4)]
+    limiter.release(tickets.pop(), 'throttle', 0.1)
+    assert limiter.window == 4
+    limiter.release(tickets.pop(), 'server', 0.1)
+    assert limiter.window == 4
+
+
+def test_success_grows_window():
+    limiter = AdaptiveLimiter(initial=2, max_window=16)
+    for _ in range(10):
+        limiter.release(limiter.acquire(), 'ok', 0.1)
+    assert limiter.window > 2
+
+
+def test_cancelled_does_not_change_window():
+    limiter = AdaptiveLimiter(initial=4)
+    limiter.release(limiter.acquire(), 'cancelled')
+    assert limiter.window == 4
+    assert limiter.stats['ok'] == limiter.stats['errors'] == 0
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+date_normalization 测试：常见日期格式、时间段、无效日期和批量接口
+
+运行: python -m pytest -q test_date_normalization.py
+"""
+
+from datetime import date
+
+import pytest
+
+import date_normalization
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2022.07", date(2022, 7, 1)),
+    ("2022-07-15", date(2022, 7, 15)),
+    ("2022/7", date(2022, 7, 1)),
+    ("2022年7月", date(2022, 7, 1)),
+    ("2022年7月15日", date(2022, 7, 15)),
+    ("202207", date(2022, 7, 1)),
+    ("2022", date(2022, 1, 1)),
+    ("Jul 2020", date(2020, 7, 1)),
+])
+def test_parse_date(text, expected):
+    assert date_normalization.parse_date(text) == expected
+
+
+@pytest.mark.parametrize("text", ["2022.13", "2022-13", "2022年13月", "2022.02.30", "202213", "", "无", None])
+def test_invalid_dates(text):
+    assert date_normalization.parse_date(text) is None
+
+
+def test_present_is_today():
+    assert date_normalization.parse_date("至今") == date.today()
+
+
+@pytest.mark.parametrize("text, months", [
+    ("2022.07-2024.08", 25),
+    ("2022-07-2024-08", 25),
+    ("2022-07 ~ 2024-08", 25),
+    ("2020/3至2021/3", 12),
+    ("2020年3月-2021年9月", 18),
+    ("2024.08-2022.07", 0),
+])
+def test_range_months(text, months):
+    assert date_normalization.range_months(text) == months
+
+
+@pytest.mark.parametrize("text", ["2022.13-2023.01", "2022.07-2023.13", "2022-13", "2022-07-15", "工作经历"])
+def test_invalid_ranges(text):
+    assert date_normalization.parse_range(text) is None
+
+
+def test_range_until_present():
+    start, end = date_normalization.parse_range("2019年3月 至 今")
+    assert start == date(2019, 3, 1)
+    assert end == date.today()
+
+
+def test_batch_matches_single():
+    values = ["2022.07-2024.08", "2022.13-2023.01", "2022.07-2024.08", None]
+    assert date_normalization.range_months_batch(values) == [25, None, 25, None]
+    assert date_normalization.total_work_years(values) == 4.2
+    assert date_normalization.earliest_date(["2022.07", "2019年3月", "2022.13"]) == "2019-03-01"
+    assert date_normalization.extract_ints(["9年", "无", 3], default=0) == [9, 0, 3]
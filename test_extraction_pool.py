@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+extraction_pool 测试：工作进程中开启按页并行提取（RESUME_PDF_PARALLEL_PAGES）
+
+运行: python -m pytest -q test_extraction_pool.py
+"""
+
+import os
+import time
+import random
+
+import pytest
+
+import pdf_backends
+from extraction_pool import ExtractionPool
+from synthetic_corpus import generate_resume, write_pdf
+
+pytest.importorskip('reportlab')
+
+
+def _extract_parallel(pdf_path: str, output_dir: str) -> dict:
+    text, backend = pdf_backends.extract_text(pdf_path, 'pdfminer')
+    return {"text": text, "parallel": pdf_backends._pool is not None}
+
+
+def _extract_and_hang(pdf_path: str, output_dir: str):
+    """启动按页并行提取的子进程后卡住，记录子进程号"""
+    pdf_backends.extract_text(pdf_path, 'pdfminer')
+    with open(os.path.join(output_dir, 'children.txt'), 'w') as f:
+        f.write("\n".join(str(pid) for pid in pdf_backends._pool._processes))
+    time.sleep(600)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().split(')')[-1].split()[0] != 'Z'
+    except FileNotFoundError:
+        return False
+
+
+@pytest.fixture
+def large_pdf(tmp_path):
+    path = str(tmp_path / "large.pdf")
+    rng = random.Random(7)
+    write_pdf("\n".join(generate_resume(rng, 'large') for _ in range(10)), path)
+    return path
+
+
+@pytest.fixture
+def parallel_pages(monkeypatch):
+    monkeypatch.setenv('RESUME_PDF_PARALLEL_PAGES', '4')
+    monkeypatch.setenv('RESUME_PDF_WORKERS', '2')
+
+
+def test_parallel_pages_in_pool(large_pdf, parallel_pages, tmp_path):
+    pool = ExtractionPool(workers=1, timeout=60, quarantine_dir=str(tmp_path / 'q'), extract=_extract_parallel)
+    record, = pool.run([large_pdf], str(tmp_path))
+    assert record["status"] == "ok", record
+    assert record["result"]["parallel"]
+    assert record["result"]["text"] == pdf_backends.BACKENDS['pdfminer'].extract(large_pdf)
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/stat'), reason="需要 /proc")
+def test_timeout_kills_page_workers(large_pdf, parallel_pages, tmp_path):
+    pool = ExtractionPool(workers=1, timeout=5, quarantine_dir=str(tmp_path / 'q'), extract=_extract_and_hang)
+    record, = pool.run([large_pdf], str(tmp_path))
+    assert record["status"] == "timeout"
+    with open(tmp_path / 'children.txt') as f:
+        children = [int(pid) for pid in f.read().split()]
+    assert children
+    deadline = time.monotonic() + 5
+    while any(_alive(pid) for pid in children) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert not any(_alive(pid) for pid in children)
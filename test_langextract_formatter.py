@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+langextract_formatter 测试：列表分区按原文位置分组（_group_entries）
+
+运行: python -m pytest -q test_langextract_formatter.py
+"""
+
+from langextract_formatter import _group_entries
+
+TEXT = (
+    "工作经历\n"
+    "2020-2023  阿里巴巴  高级工程师\n"
+    "负责推荐系统\n"
+    "2018-2020  腾讯  工程师\n"
+    "负责支付系统\n"
+)
+
+
+def _at(value: str) -> int:
+    return TEXT.index(value)
+
+
+def test_groups_by_position_regardless_of_arrival_order():
+    # 并行分块时后一段的抽取可能先到达
+    anchors = [(_at("腾讯"), 0, "腾讯"), (_at("阿里巴巴"), 3, "阿里巴巴")]
+    fields = [
+        (_at("工程师\n负责支付"), 1, 0, "职位", "工程师"),
+        (_at("负责支付系统"), 2, 0, "工作描述", "负责支付系统"),
+        (_at("高级工程师"), 4, 1, "职位", "高级工程师"),
+        (_at("负责推荐系统"), 5, 1, "工作描述", "负责推荐系统"),
+    ]
+    entries = _group_entries("工作经历", anchors, fields, TEXT)
+    assert [(e["公司名称"], e["职位"], e["工作描述"]) for e in entries] == [
+        ("阿里巴巴", "高级工程师", "负责推荐系统"),
+        ("腾讯", "工程师", "负责支付系统"),
+    ]
+
+
+def test_field_before_anchor_on_same_line():
+    # 时间写在公司名称之前的行也归入该条目
+    anchors = [(_at("阿里巴巴"), 1, "阿里巴巴"), (_at("腾讯"), 2, "腾讯")]
+    fields = [(_at("2018-2020"), 0, -1, "工作时间", "2018-2020"), (_at("2020-2023"), 3, 1, "工作时间", "2020-2023")]
+    entries = _group_entries("工作经历", anchors, fields, TEXT)
+    assert [e["工作时间"] for e in entries] == ["2020-2023", "2018-2020"]
+
+
+def test_field_before_first_anchor_goes_to_first_entry():
+    anchors = [(_at("阿里巴巴"), 1, "阿里巴巴")]
+    fields = [(0, 0, -1, "职位", "工程师")]
+    assert _group_entries("工作经历", anchors, fields, TEXT)[0]["职位"] == "工程师"
+
+
+def test_unaligned_field_follows_its_anchor():
+    anchors = [(_at("腾讯"), 0, "腾讯"), (_at("阿里巴巴"), 2, "阿里巴巴")]
+    fields = [(None, 1, 0, "主要成果", "支付成功率提升"), (None, 3, -1, "主要成果", "无归属")]
+    entries = _group_entries("工作经历", anchors, fields, TEXT)
+    assert [e["主要成果"] for e in entries] == ["", "支付成功率提升"]
+
+
+def test_falls_back_to_arrival_order_without_positions():
+    anchors = [(None, 0, "清华大学"), (_at("腾讯"), 2, "北京大学")]
+    fields = [(None, 1, 0, "专业", "计算机"), (5, 3, 1, "专业", "数学")]
+    entries = _group_entries("教育背景", anchors, fields, TEXT)
+    assert [(e["学校名称"], e["专业"]) for e in entries] == [("清华大学", "计算机"), ("北京大学", "数学")]
+    assert set(entries[0]) == {"学校名称", "专业", "学历", "就读时间"}
+
+
+def test_no_anchors():
+    assert _group_entries("项目经历", [], [(0, 0, -1, "项目名称", "x")], TEXT) == []
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+llm_cassette 测试：录制、回放、严格模式未命中
+
+运行: python -m pytest -q test_llm_cassette.py
+"""
+
+import pytest
+
+from llm_cassette import Cassette, CassetteMiss, load_entries, request_key
+
+pytest.importorskip('openai')
+
+REQUEST = {'model': 'deepseek-chat', 'messages': [{'role': 'user', 'content': '张三 工作经历'}], 'timeout': 30}
+
+
+def _completion(content: str) -> dict:
+    return {
+        'id': 'chatcmpl-test', 'object': 'chat.completion', 'created': 0, 'model': 'deepseek-chat',
+        'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}],
+        'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15},
+    }
+
+
+class _Upstream:
+    """记录被调用次数的假 chat.completions.create"""
+
+    def __init__(self, content: str = '{"extractions": []}'):
+        self.calls = 0
+        self.content = content
+
+    def __call__(self, *args, **kwargs):
+        from openai.types.chat import ChatCompletion
+        self.calls += 1
+        return ChatCompletion.model_validate(_completion(self.content))
+
+
+def test_request_key_ignores_transport_kwargs():
+    assert request_key(REQUEST) == request_key({**REQUEST, 'timeout': 5, 'extra_headers': {'x': '1'}})
+    assert request_key(REQUEST) != request_key({**REQUEST, 'model': 'qwen-plus'})
+
+
+def test_record_then_replay(tmp_path):
+    path = str(tmp_path / 'run.jsonl')
+    upstream = _Upstream()
+    recorded = Cassette(path, 'record').wrap(upstream)(**REQUEST)
+    assert upstream.calls == 1
+    assert request_key(REQUEST) in load_entries(path)
+
+    cassette = Cassette(path, 'replay', strict=True)
+    replayed = []
+    response = cassette.wrap(upstream, lambda r: replayed.append(r) or r)(**REQUEST)
+    assert upstream.calls == 1
+    assert response.choices[0].message.content == recorded.choices[0].message.content
+    assert response.usage.prompt_tokens == 10
+    assert replayed == [response]
+    assert cassette.stats['hits'] == 1
+
+
+def test_strict_replay_miss_raises(tmp_path):
+    upstream = _Upstream()
+    cassette = Cassette(str(tmp_path / 'empty.jsonl'), 'replay', strict=True)
+    with pytest.raises(CassetteMiss):
+        cassette.wrap(upstream)(**REQUEST)
+    assert upstream.calls == 0
+    assert cassette.offline
+
+
+def test_replay_miss_falls_through_without_recording(tmp_path):
+    path = tmp_path / 'run.jsonl'
+    upstream = _Upstream()
+    Cassette(str(path), 'replay').wrap(upstream)(**REQUEST)
+    assert upstream.calls == 1
+    assert not path.exists()
+
+
+def test_auto_records_miss_and_replays_hit(tmp_path):
+    path = str(tmp_path / 'run.jsonl')
+    upstream = _Upstream()
+    create = Cassette(path, 'auto').wrap(upstream)
+    create(**REQUEST)
+    create(**REQUEST)
+    assert upstream.calls == 1
+
+
+def test_later_entry_overrides_and_bad_lines_skipped(tmp_path):
+    path = str(tmp_path / 'run.jsonl')
+    Cassette(path, 'record').wrap(_Upstream('first'))(**REQUEST)
+    Cassette(path, 'record').wrap(_Upstream('second'))(**REQUEST)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"k": "truncated"\n')
+    response = Cassette(path, 'replay', strict=True).wrap(_Upstream())(**REQUEST)
+    assert response.choices[0].message.content == 'second'
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+output_writer 测试：原子写入、NDJSON 输出与不完整行的读取
+
+运行: python -m pytest -q test_output_writer.py
+"""
+
+import os
+import json
+
+import pytest
+
+import output_writer
+
+RESULT = {"姓名": "张三", "工作年限": 5, "技能": ["Python", "Kubernetes"]}
+
+
+def test_write_json_matches_json_dump(tmp_path):
+    path = str(tmp_path / 'outs' / '张三_final_comprehensive.json')
+    assert output_writer.write_json(path, RESULT) == path
+    with open(path, 'rb') as f:
+        assert f.read() == json.dumps(RESULT, ensure_ascii=False, indent=2).encode('utf-8')
+    assert os.listdir(tmp_path / 'outs') == ['张三_final_comprehensive.json']
+
+
+def test_failed_write_keeps_old_file(tmp_path, monkeypatch):
+    path = str(tmp_path / 'result.json')
+    output_writer.write_json(path, RESULT)
+
+    def fail(src, dst):
+        raise OSError("磁盘已满")
+
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        output_writer.write_json(path, {"姓名": "李四"})
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == RESULT
+    assert os.listdir(tmp_path) == ['result.json']
+
+
+def test_unknown_serializer(monkeypatch):
+    monkeypatch.setenv('RESUME_JSON_SERIALIZER', 'yaml')
+    with pytest.raises(ValueError):
+        output_writer.serializer()
+
+
+def test_save_result_to_ndjson(tmp_path, monkeypatch):
+    target = str(tmp_path / 'results.ndjson')
+    monkeypatch.setenv('RESUME_OUTPUT_NDJSON', target)
+    assert output_writer.save_result(str(tmp_path / '张三.json'), RESULT) == target
+    output_writer.save_result(str(tmp_path / '李四.json'), {"姓名": "李四"})
+    assert not (tmp_path / '张三.json').exists()
+    assert [row["output"] for row in output_writer.read_ndjson(target)] == ['张三.json', '李四.json']
+
+
+def test_read_ndjson_skips_truncated_last_line(tmp_path, capsys):
+    path = str(tmp_path / 'results.ndjson')
+    with output_writer.NdjsonWriter(path) as stream:
+        stream.write(RESULT)
+        stream.write({"姓名": "李四"})
+    with open(path, 'ab') as f:
+        f.write(b'{"\xe5\xa7\x93\xe5\x90\x8d": "\xe7\x8e')
+    assert list(output_writer.read_ndjson(path)) == [RESULT, {"姓名": "李四"}]
+    assert '不完整' in capsys.readouterr().err
+
+
+def test_read_ndjson_rejects_corrupt_middle_line(tmp_path):
+    path = tmp_path / 'results.ndjson'
+    path.write_bytes(b'{"a": 1}\nnot json\n{"a": 2}\n')
+    with pytest.raises(ValueError):
+        list(output_writer.read_ndjson(str(path)))
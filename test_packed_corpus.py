@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+packed_corpus 测试：追加与覆盖、中断后修复（索引落后、数据末尾不完整）、压缩
+
+运行: python -m pytest -q test_packed_corpus.py
+"""
+
+import os
+
+import pytest
+
+import packed_corpus
+from packed_corpus import INDEX_ENTRY, PackedCorpus
+
+
+@pytest.fixture
+def pack(tmp_path):
+    return str(tmp_path / 'corpus.pack')
+
+
+def test_append_and_overwrite(pack):
+    corpus = PackedCorpus(pack)
+    corpus.append('张三', '工作经历\n阿里巴巴')
+    corpus.append('李四', '教育背景\n清华大学')
+    corpus.append('张三', '工作经历\n腾讯')
+    assert corpus.get('张三') == '工作经历\n腾讯'
+    assert corpus.size_of('李四') == len('教育背景\n清华大学'.encode('utf-8'))
+    assert len(corpus) == 2 and '王五' not in corpus
+    assert corpus.names() == ['李四', '张三']
+    with pytest.raises(KeyError):
+        corpus.get('王五')
+    corpus.close()
+
+
+def test_other_instance_sees_appends(pack):
+    writer, reader = PackedCorpus(pack), PackedCorpus(pack)
+    writer.append('张三', 'a')
+    assert reader.get('张三') == 'a'
+    writer.append('李四', 'b')
+    assert reader.get('李四') == 'b'
+
+
+def test_repair_missing_index_entries(pack):
+    corpus = PackedCorpus(pack)
+    corpus.append('张三', 'a')
+    corpus.append('李四', 'b')
+    corpus.close()
+    # 写完数据后、写索引前中断：索引少一项
+    with open(pack + '.idx', 'r+b') as f:
+        f.truncate(INDEX_ENTRY.size)
+    reopened = PackedCorpus(pack)
+    assert reopened.get('李四') == 'b'
+    assert os.path.getsize(pack + '.idx') == 2 * INDEX_ENTRY.size
+
+
+def test_repair_truncated_record_and_index(pack):
+    corpus = PackedCorpus(pack)
+    corpus.append('张三', 'a')
+    corpus.append('李四', '教育背景')
+    corpus.close()
+    size = os.path.getsize(pack)
+    # 最后一条记录只写了一半，索引项也只写了一半
+    with open(pack, 'r+b') as f:
+        f.truncate(size - 3)
+    with open(pack + '.idx', 'r+b') as f:
+        f.truncate(INDEX_ENTRY.size + 5)
+    reopened = PackedCorpus(pack)
+    assert reopened.get('张三') == 'a'
+    assert '李四' not in reopened
+    reopened.append('李四', 'b')
+    assert PackedCorpus(pack).get('李四') == 'b'
+
+
+def test_rejects_non_pack_file(pack):
+    with open(pack, 'wb') as f:
+        f.write(b'not a pack file')
+    with pytest.raises(ValueError):
+        PackedCorpus(pack)
+
+
+def test_compact_keeps_latest_records(pack):
+    corpus = PackedCorpus(pack)
+    for i in range(5):
+        corpus.append('张三', f'版本{i}')
+    corpus.append('李四', 'b')
+    assert corpus.stats()['reclaimable_bytes'] > 0
+    result = packed_corpus.compact(pack)
+    assert result['resumes'] == 2 and result['bytes_after'] < result['bytes_before']
+    # 已打开的实例发现文件被替换后重新加载
+    assert corpus.get('张三') == '版本4'
+    reopened = PackedCorpus(pack)
+    assert reopened.stats()['reclaimable_bytes'] == 0
+    assert reopened.get('李四') == 'b'
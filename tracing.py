@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+轻量级链路追踪
+功能: 为流水线各阶段（PDF提取、文本分区、基础信息、LLM调用、标签生成、文件写入）记录耗时span，
+     以JSON Lines格式输出事件，并在批次结束时汇总各阶段 p50/p95/p99 和最慢的简历
+
+通过环境变量控制:
+    RESUME_TRACE=1                      开启追踪（默认关闭，关闭时span为空操作）
+    RESUME_TRACE_FILE=traces/trace.jsonl 事件输出文件
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import functools
+import threading
+import contextvars
+from pathlib import Path
+
+from metrics import track_resume
+
+ENABLED = os.getenv('RESUME_TRACE', '').lower() not in ('', '0', 'false', 'no')
+TRACE_FILE = os.getenv('RESUME_TRACE_FILE', 'traces/trace.jsonl')
+
+_current_resume = contextvars.ContextVar('resume_id', default=None)
+_current_span = contextvars.ContextVar('span_id', default=None)
+
+_lock = threading.Lock()
+_file = None
+_span_counter = 0
+_stage_durations = {}
+_resume_durations = {}
+
+
+class _NoopSpan:
+    """追踪关闭时使用的空span"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def _emit(event: dict):
+    global _file
+    line = json.dumps(event, ensure_ascii=False)
+    with _lock:
+        if _file is None:
+            Path(TRACE_FILE).parent.mkdir(parents=True, exist_ok=True)
+            _file = open(TRACE_FILE, 'a', encoding='utf-8', buffering=1)
+        _file.write(line + '\n')
+
+
+class _Span:
+    """记录一个阶段的耗时和属性"""
+
+    __slots__ = ('name', 'attrs', 'span_id', 'parent_id', 'start', 'wall_start', 'tracker', '_token', '_resume_token')
+
+    def __init__(self, name: str, attrs: dict, resume_id: str = None, tracker=None):
+        global _span_counter
+        with _lock:
+            _span_counter += 1
+            self.span_id = f"{os.getpid()}-{_span_counter}"
+        self.name = name
+        self.attrs = attrs
+        self.parent_id = _current_span.get()
+        self.tracker = tracker
+        self._resume_token = _current_resume.set(resume_id) if resume_id else None
+
+    def set(self, **attrs):
+        """补充span属性（如token数、重试次数）"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._token = _current_span.set(self.span_id)
+        if self.tracker is not None:
+            self.tracker.__enter__()
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self.start) * 1000
+        if self.tracker is not None:
+            self.tracker.__exit__(exc_type, exc, tb)
+        _current_span.reset(self._token)
+        resume_id = _current_resume.get()
+        if self._resume_token is not None:
+            _current_resume.reset(self._resume_token)
+
+        event = {
+            "ts": round(self.wall_start, 6),
+            "span": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "resume": resume_id,
+            "duration_ms": round(duration_ms, 3),
+            "status": "error" if exc_type else "ok",
+        }
+        if exc_type:
+            event["error"] = exc_type.__name__
+        if self.attrs:
+            event["attrs"] = self.attrs
+        _emit(event)
+
+        with _lock:
+            _stage_durations.setdefault(self.name, []).append(duration_ms)
+            if self.name == 'resume' and resume_id:
+                _resume_durations[resume_id] = _resume_durations.get(resume_id, 0.0) + duration_ms
+        return False
+
+
+def span(name: str, **attrs):
+    """
+    创建一个span，用法: with span("extract.pdf_text", pages=3) as s: ...
+
+    追踪关闭时返回共享的空对象，开销只有一次布尔判断
+    """
+    if not ENABLED:
+        return _NOOP
+    return _Span(name, attrs)
+
+
+def resume_scope(resume_id: str, **attrs):
+    """
+    标记一份简历的处理范围，内部所有span都会带上该简历ID
+
+    无论是否开启追踪，都会计入 metrics 的简历吞吐量和耗时；
+    已处于同一份简历的范围内时，只作为普通span记录
+    """
+    tracker = track_resume(attrs.get('stage', ''))
+    if not ENABLED:
+        return tracker
+    if _current_resume.get() == resume_id:
+        return _Span('resume.nested', attrs)
+    return _Span('resume', attrs, resume_id=resume_id, tracker=tracker)
+
+
+def traced_resume(stage: str):
+    """
+    装饰器：把第一个参数为文本文件路径的格式化函数包在 resume_scope 中
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(text_file, *args, **kwargs):
+            if not ENABLED:
+                with track_resume(stage):
+                    return func(text_file, *args, **kwargs)
+            with resume_scope(Path(str(text_file)).stem.replace("_extracted", ""), stage=stage):
+                return func(text_file, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_resume() -> str:
+    """当前正在处理的简历ID"""
+    return _current_resume.get()
+
+
+def percentile(values: list, p: float) -> float:
+    """线性插值分位数（各基准测试和统计报告共用），values 为空时返回 0.0"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def summarize(stage_durations: dict, resume_durations: dict, slowest: int = 5) -> dict:
+    """按阶段汇总耗时分位数，并列出最慢的简历"""
+    stages = {}
+    for name, values in sorted(stage_durations.items()):
+        stages[name] = {
+            "count": len(values),
+            "total_ms": round(sum(values), 1),
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+        }
+    slow = sorted(resume_durations.items(), key=lambda item: item[1], reverse=True)[:slowest]
+    return {
+        "stages": stages,
+        "slowest_resumes": [{"resume": rid, "duration_ms": round(ms, 1)} for rid, ms in slow],
+    }
+
+
+def summarize_file(trace_file: str, slowest: int = 5) -> dict:
+    """汇总一个（可能由多个进程写入的）JSON Lines 事件文件"""
+    stage_durations, resume_durations = {}, {}
+    with open(trace_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            stage_durations.setdefault(event["span"], []).append(event["duration_ms"])
+            if event["span"] == "resume" and event.get("resume"):
+                rid = event["resume"]
+                resume_durations[rid] = resume_durations.get(rid, 0.0) + event["duration_ms"]
+    return summarize(stage_durations, resume_durations, slowest)
+
+
+def print_summary(summary: dict, out=sys.stdout):
+    """打印汇总表"""
+    print("\n=== 链路追踪汇总 ===", file=out)
+    print(f"{'阶段':<36}{'次数':>6}{'p50(ms)':>12}{'p95(ms)':>12}{'p99(ms)':>12}{'总计(ms)':>14}", file=out)
+    for name, stats in summary["stages"].items():
+        print(f"{name:<36}{stats['count']:>6}{stats['p50_ms']:>12}{stats['p95_ms']:>12}"
+              f"{stats['p99_ms']:>12}{stats['total_ms']:>14}", file=out)
+    if summary["slowest_resumes"]:
+        print("最慢的简历:", file=out)
+        for item in summary["slowest_resumes"]:
+            print(f"  {item['resume']}: {item['duration_ms']}ms", file=out)
+
+
+def _print_batch_summary():
+    if _stage_durations:
+        print_summary(summarize(_stage_durations, _resume_durations))
+    if _file is not None:
+        _file.close()
+
+
+if ENABLED:
+    atexit.register(_print_batch_summary)
+
+
+def main():
+    """主函数"""
+    if len(sys.argv) < 3 or sys.argv[1] != 'summary':
+        print("使用方法: python tracing.py summary <trace.jsonl> [最慢简历数]")
+        sys.exit(1)
+
+    slowest = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    summary = summarize_file(sys.argv[2], slowest)
+    print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,16 @@ import os
 import sys
 from pathlib import Path
 
+import line_classifier
+import metrics
+import packed_corpus
+import pdf_backends
+from tracing import span, resume_scope
+
 def extract_pdf_with_unstructured(pdf_path: str, output_dir: str = "middles") -> str:
     """
     使用 unstructured 混合方法提取 PDF 内容并保存到文件
-    方法：pdfminer提取 + unstructured文本分区处理
+    方法：pdfminer（或 pdf_backends 中的其他后端）提取 + unstructured文本分区处理
     
     Args:
         pdf_path: PDF 文件路径
@@ -21,6 +27,11 @@ def extract_pdf_with_unstructured(pdf_path: str, output_dir: str = "middles") ->
     Returns:
         保存的文本文件路径
     """
+    with resume_scope(Path(pdf_path).stem, stage="extract"):
+        return _extract_pdf(pdf_path, output_dir)
+
+def _extract_pdf(pdf_path: str, output_dir: str) -> str:
+    """提取流程的具体实现"""
     print(f"使用 unstructured 混合方法提取 PDF: {pdf_path}")
     
     # 确保输出目录存在
@@ -31,60 +42,41 @@ def extract_pdf_with_unstructured(pdf_path: str, output_dir: str = "middles") ->
     output_file = Path(output_dir) / f"{pdf_name}_extracted.txt"
     
     try:
-        # 步骤1: 使用pdfminer提取原始文本
-        print("  步骤1: 使用pdfminer提取原始文本...")
-        from pdfminer.high_level import extract_text
-        raw_text = extract_text(pdf_path)
-        
-        if not raw_text or len(raw_text) < 50:
-            raise ValueError("pdfminer提取的内容过少")
+        # 步骤1: 提取原始文本（默认pdfminer，RESUME_PDF_BACKEND 可选更快的后端或 auto 按文档自动选择）
+        print(f"  步骤1: 提取原始文本（{pdf_backends.backend_mode()}）...")
+        with span("extract.pdf_text") as s:
+            raw_text, backend = pdf_backends.extract_text(pdf_path)
+            s.set(chars=len(raw_text), backend=backend)
         
-        print(f"  ✓ pdfminer 提取成功，共 {len(raw_text)} 字符")
+        print(f"  ✓ {backend} 提取成功，共 {len(raw_text)} 字符")
         
-        # 步骤2: 使用unstructured进行文本分区和结构化
-        print("  步骤2: 使用unstructured进行文本分区...")
-        from unstructured.partition.text import partition_text
-        elements = partition_text(text=raw_text)
+        # 步骤2: 文本分区和结构化（RESUME_PARTITIONER=lines 使用内置的轻量行分类器，不导入unstructured）
+        partitioner = os.getenv('RESUME_PARTITIONER', 'unstructured')
+        if partitioner == 'lines':
+            print("  步骤2: 使用轻量行分类器进行文本分区...")
+            with span("extract.partition", partitioner=partitioner) as s:
+                elements = line_classifier.partition_lines(raw_text)
+                s.set(elements=len(elements))
+        else:
+            print("  步骤2: 使用unstructured进行文本分区...")
+            from unstructured.partition.text import partition_text
+            with span("extract.partition", partitioner=partitioner) as s:
+                elements = [(type(element).__name__, str(element).strip())
+                            for element in partition_text(text=raw_text)]
+                s.set(elements=len(elements))
         
         # 步骤3: 处理和优化文本结构
         print("  步骤3: 优化文本结构...")
-        processed_parts = []
-        
-        for element in elements:
-            element_text = str(element).strip()
-            if element_text:
-                element_type = type(element).__name__
-                
-                # 根据元素类型进行不同处理
-                if element_type in ['Title', 'Header']:
-                    # 标题类元素，前后加空行强调
-                    processed_parts.append(f"\n{element_text}\n")
-                elif element_type == 'NarrativeText':
-                    # 正文文本，保持原样
-                    processed_parts.append(element_text)
-                elif element_type == 'ListItem':
-                    # 列表项，添加适当缩进
-                    processed_parts.append(f"• {element_text}")
-                else:
-                    # 其他类型，保持原样
-                    processed_parts.append(element_text)
-        
-        # 合并处理后的文本
-        processed_text = "\n".join(processed_parts)
-        
-        # 清理多余的空行和格式
-        import re
-        processed_text = re.sub(r'\n\s*\n\s*\n+', '\n\n', processed_text)
-        processed_text = processed_text.strip()
+        processed_text = line_classifier.render_elements(elements)
         
-        print(f"  ✓ unstructured 处理成功，分区为 {len(elements)} 个元素")
+        print(f"  ✓ {partitioner} 处理成功，分区为 {len(elements)} 个元素")
         print(f"  ✓ 最终文本长度: {len(processed_text)} 字符")
         
-        # 保存到文件
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(processed_text)
+        # 保存到文件（设置 RESUME_CORPUS_PACK 时追加到打包语料，output_file 仍作为后续步骤读取时的名称）
+        with span("extract.write", packed=bool(packed_corpus.pack_path())):
+            packed_corpus.write_text(output_file, processed_text)
         
-        print(f"✓ 保存到: {output_file}")
+        print(f"✓ 保存到: {packed_corpus.pack_path() or output_file}")
         return str(output_file)
         
     except ImportError as e:
@@ -99,6 +91,7 @@ def main():
     print("=" * 60)
     print("PDF内容提取器 - 使用unstructured")
     print("=" * 60)
+    metrics.start_from_env()
     
     # 可以选择不同的PDF文件进行处理
     available_files = [